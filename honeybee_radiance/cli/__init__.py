@@ -3,36 +3,72 @@ import click
 import sys
 import logging
 import json
+import importlib
 
 from honeybee.cli import main
 from ..config import folders
-from .setconfig import set_config
-from .edit import edit
-from .translate import translate
-from .lib import lib
-from .sky import sky
-from .grid import grid
-from .view import view
-from .sunpath import sunpath
-from .octree import octree
-from .raytrace import raytrace
-from .rpict import rpict
-from .dc import dc
-from .viewfactor import view_factor
-from .postprocess import post_process
-from .mtx import mtxop
-from .multiphase import multi_phase
-from .glare import dcglare
-from .schedule import schedule
-from .study import study
-from .modifier import modifier
 
 
 _logger = logging.getLogger(__name__)
 
 
+# sub-command names with the module and the name of the group in the module
+_SUB_COMMANDS = {
+    'set-config': ('setconfig', 'set_config'),
+    'edit': ('edit', 'edit'),
+    'translate': ('translate', 'translate'),
+    'lib': ('lib', 'lib'),
+    'sky': ('sky', 'sky'),
+    'grid': ('grid', 'grid'),
+    'view': ('view', 'view'),
+    'sunpath': ('sunpath', 'sunpath'),
+    'octree': ('octree', 'octree'),
+    'raytrace': ('raytrace', 'raytrace'),
+    'rpict': ('rpict', 'rpict'),
+    'dc': ('dc', 'dc'),
+    'view-factor': ('viewfactor', 'view_factor'),
+    'post-process': ('postprocess', 'post_process'),
+    'mtxop': ('mtx', 'mtxop'),
+    'multi-phase': ('multiphase', 'multi_phase'),
+    'dcglare': ('glare', 'dcglare'),
+    'schedule': ('schedule', 'schedule'),
+    'study': ('study', 'study'),
+    'modifier': ('modifier', 'modifier')
+}
+
+
+class LazyGroup(click.Group):
+    """A click Group that imports the module of a sub-command when it is first used.
+
+    This keeps the start of the command line interface fast since the modules of
+    the sub-commands and their dependencies are only imported for the sub-command
+    that is called.
+
+    Args:
+        lazy_commands: A dictionary with the names of the sub-commands as keys and
+            tuples of the module name (relative to this package) and the name of
+            the command in the module as values.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.lazy_commands = kwargs.pop('lazy_commands', {})
+        super(LazyGroup, self).__init__(*args, **kwargs)
+
+    def list_commands(self, ctx):
+        commands = super(LazyGroup, self).list_commands(ctx)
+        return sorted(set(commands).union(self.lazy_commands))
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name in self.lazy_commands and cmd_name not in self.commands:
+            module_name, command_name = self.lazy_commands[cmd_name]
+            module = importlib.import_module('.' + module_name, __name__)
+            self.add_command(getattr(module, command_name), cmd_name)
+        return super(LazyGroup, self).get_command(ctx, cmd_name)
+
+
 # command group for all radiance extension commands.
-@click.group(help='honeybee radiance commands.')
+@click.group(cls=LazyGroup, lazy_commands=_SUB_COMMANDS,
+             help='honeybee radiance commands.')
 @click.version_option()
 def radiance():
     pass
@@ -62,27 +98,5 @@ def config(output_file):
         sys.exit(0)
 
 
-# add sub-commands to radiance
-radiance.add_command(set_config, name='set-config')
-radiance.add_command(edit)
-radiance.add_command(translate)
-radiance.add_command(lib)
-radiance.add_command(sky)
-radiance.add_command(grid)
-radiance.add_command(view)
-radiance.add_command(sunpath)
-radiance.add_command(octree)
-radiance.add_command(raytrace)
-radiance.add_command(rpict)
-radiance.add_command(dc)
-radiance.add_command(view_factor)
-radiance.add_command(post_process, name='post-process')
-radiance.add_command(mtxop)
-radiance.add_command(multi_phase)
-radiance.add_command(dcglare)
-radiance.add_command(schedule)
-radiance.add_command(study)
-radiance.add_command(modifier)
-
 # add radiance sub-commands to honeybee CLI
 main.add_command(radiance)
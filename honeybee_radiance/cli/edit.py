@@ -78,6 +78,45 @@ def reset_resource_ids(
         sys.exit(0)
 
 
+@edit.command('deduplicate-modifiers')
+@click.argument('model-file', type=click.Path(
+    exists=True, file_okay=True, dir_okay=False, resolve_path=True))
+@click.option(
+    '--output-file', '-f', help='Optional hbjson file to output the JSON '
+    'string of the converted model. By default this will be printed out to '
+    'stdout', type=click.File('w'), default='-', show_default=True
+)
+@click.option(
+    '--log-file', '-log', help='Optional file to output the number of modifiers '
+    'that were replaced with another modifier of the same content. By default, '
+    'the number will not be written.', type=click.File('w'), default=None
+)
+def deduplicate_modifiers(model_file, output_file, log_file):
+    """Replace the modifiers of a Model that have the same content with one modifier.
+
+    Modifiers are duplicates of one another when they have the same type, values,
+    modifier and dependencies, regardless of their identifiers. This is useful
+    for models that are assembled from several sources since it reduces the number
+    of primitives in the Radiance folder and the number of modifiers in
+    simulations that compute contributions for each modifier.
+
+    \b
+    Args:
+        model_file: Full path to a Honeybee Model (HBJSON) file.
+    """
+    try:
+        model = Model.from_file(model_file)
+        count = model.properties.radiance.deduplicate_modifiers()
+        output_file.write(json.dumps(model.to_dict()))
+        if log_file is not None:
+            log_file.write('{} duplicate modifiers were collapsed.'.format(count))
+    except Exception as e:
+        _logger.exception('Deduplicating modifiers failed.\n{}'.format(e))
+        sys.exit(1)
+    else:
+        sys.exit(0)
+
+
 @edit.command('add-room-sensors')
 @click.argument('model-file', type=click.Path(
     exists=True, file_okay=True, dir_okay=False, resolve_path=True))
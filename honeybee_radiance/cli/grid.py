@@ -14,6 +14,8 @@ from honeybee.units import parse_distance_string
 from honeybee.typing import clean_rad_string, clean_and_id_rad_string
 
 from honeybee_radiance.sensorgrid import SensorGrid
+from honeybee_radiance.gridutil import redistribute_sensors_by_cost, \
+    load_sensor_weights, write_room_sensor_grids, restore_sensor_order
 from honeybee_radiance_folder.gridutil import redistribute_sensors, \
     restore_original_distribution
 
@@ -138,9 +140,18 @@ def merge_grid(input_folder, base_name, extension, folder, name):
     'the sensor grids to be split. If unspecified, it will be assumed that this '
     'JSON already exists in the input-folder with the name _info.json', default=None,
     type=click.Path(file_okay=True, dir_okay=False, resolve_path=True))
+@click.option(
+    '--weights-file', '-w', help='Optional JSON file with the estimated cost of the '
+    'sensors. The keys are the full_id of the grids and the values are either a '
+    'number for the cost of each sensor in the grid or a list with the cost of each '
+    'sensor. These can come from a cheap pre-pass with a low number of ambient '
+    'bounces or from the timings of a previous run. When specified, the sensors will '
+    'be split into grids of roughly equal cost instead of equal sensor count.',
+    default=None,
+    type=click.Path(exists=True, file_okay=True, dir_okay=False, resolve_path=True))
 def split_grid_folder(
     input_folder, output_folder, grid_count, extension,
-    grid_divisor, min_sensor_count, grid_info_file
+    grid_divisor, min_sensor_count, grid_info_file, weights_file
 ):
     """Create new sensor grids folder with evenly distribute sensors.
 
@@ -149,6 +160,10 @@ def split_grid_folder(
     original input files from this folder and the results generated based on the grids
     in this folder.
 
+    If a weights file is provided, the sensors are distributed so that each new grid
+    has roughly the same estimated cost instead of the same number of sensors. The
+    sensors keep their original order and the folder can be merged back the same way.
+
     ``_dist_info.json`` file includes an array of JSON objects. Each object has the
     ``id`` or the original file and the distribution information. The distribution
     information includes the id of the new files that the sensors has been distributed
@@ -193,10 +208,17 @@ def split_grid_folder(
                 shutil.copyfile(grid_info_file, info_file)
             grid_count = int(grid_count / grid_divisor)
             grid_count = 1 if grid_count < 1 else grid_count
-            redistribute_sensors(
-                input_folder, output_folder, grid_count, min_sensor_count,
-                extension=extension.replace('.', '')
-            )
+            if weights_file is not None:
+                redistribute_sensors_by_cost(
+                    input_folder, output_folder, grid_count,
+                    load_sensor_weights(weights_file), min_sensor_count,
+                    extension=extension.replace('.', '')
+                )
+            else:
+                redistribute_sensors(
+                    input_folder, output_folder, grid_count, min_sensor_count,
+                    extension=extension.replace('.', '')
+                )
     except Exception:
         _logger.exception('Failed to distribute sensor grids in folder.')
         sys.exit(1)
@@ -241,6 +263,80 @@ def merge_grid_folder(input_folder, output_folder, extension, dist_info):
         sys.exit(0)
 
 
+@grid.command('sort')
+@click.argument('grid-file', type=click.Path(
+    exists=True, file_okay=True, dir_okay=False, resolve_path=True))
+@click.option(
+    '--tolerance', '-t', help='An optional number for the distance within which '
+    'sensors with the same direction are considered duplicates. Only the first of '
+    'the duplicated sensors will be kept. Use 0 to only remove exact duplicates. By '
+    'default, no sensor will be removed.', type=float, default=None)
+@click.option(
+    '--mapping-file', '-m', help='Optional path to a JSON file for the index of each '
+    'original sensor in the sorted grid, which can be used to restore the original '
+    'order of the results with the restore-order command. By default, it will be '
+    'written next to the grid-file with an _order.json suffix.', default=None,
+    type=click.Path(file_okay=True, dir_okay=False, resolve_path=True))
+@click.option(
+    '--output-file', '-f', help='Optional file to output the sorted sensor grid. By '
+    'default this will be printed to stdout.', type=click.File('w'), default='-')
+def sort_grid(grid_file, tolerance, mapping_file, output_file):
+    """Sort the sensors of a grid along a Hilbert curve and remove duplicates.
+
+    Sensors that are close to each other in space will be close to each other in
+    the output grid, which improves the reuse of the ambient cache when the grid is
+    run with rtrace using irradiance caching.
+
+    \b
+    Args:
+        grid_file: Full path to a sensor grid file.
+    """
+    try:
+        grid = SensorGrid.from_file(grid_file)
+        mapping = grid.sort_by_hilbert_curve(tolerance)
+        if mapping_file is None:
+            mapping_file = '%s_order.json' % os.path.splitext(grid_file)[0]
+        with open(mapping_file, 'w') as outf:
+            json.dump(mapping, outf)
+        if grid.count:
+            output_file.write(grid.to_radiance() + '\n')
+    except Exception:
+        _logger.exception('Failed to sort the sensor grid.')
+        sys.exit(1)
+    else:
+        sys.exit(0)
+
+
+@grid.command('restore-order')
+@click.argument('input-file', type=click.Path(
+    exists=True, file_okay=True, dir_okay=False, resolve_path=True))
+@click.argument('mapping-file', type=click.Path(
+    exists=True, file_okay=True, dir_okay=False, resolve_path=True))
+@click.option(
+    '--output-file', '-f', help='Optional file to output the results in the original '
+    'order. By default this will be printed to stdout.', type=click.File('w'),
+    default='-')
+def restore_order(input_file, mapping_file, output_file):
+    """Restore the original sensor order of the results of a sorted sensor grid.
+
+    \b
+    Args:
+        input_file: Full path to a text file with a row for each sensor of the sorted
+            grid (eg. a .ill or .res file). Radiance headers are supported.
+        mapping_file: Full path to the JSON file that was written by the sort
+            command.
+    """
+    try:
+        with open(mapping_file) as inf:
+            mapping = json.load(inf)
+        restore_sensor_order(input_file, mapping, output_file)
+    except Exception:
+        _logger.exception('Failed to restore the order of the results.')
+        sys.exit(1)
+    else:
+        sys.exit(0)
+
+
 @grid.command('mirror')
 @click.argument('grid-file', type=click.Path(
     exists=True, file_okay=True, dir_okay=False, resolve_path=True))
@@ -368,8 +464,12 @@ def mirror_grid(grid_file, vector, name, suffix, folder, log_file):
 @click.option('--output-file', '-f', help='Optional file to output the JSON or CSV '
               'string of the sensor grids. By default this will be printed '
               'to stdout', type=click.File('w'), default='-', show_default=True)
+@click.option('--workers', '-n', help='An integer for the number of processes '
+              'to be used to generate the sensor grids of the rooms in parallel. Each '
+              'grid is written as soon as it is generated. Use 0 to use all CPUs.',
+              type=int, default=1, show_default=True)
 def from_rooms(model_file, grid_size, offset, include_mesh, keep_out, wall_offset,
-               room, write_json, folder, output_file):
+               room, write_json, folder, output_file, workers):
     """Generate SensorGrids from the Room floors of a honeybee model.
 
     \b
@@ -385,31 +485,14 @@ def from_rooms(model_file, grid_size, offset, include_mesh, keep_out, wall_offse
         offset = parse_distance_string(offset, model.units)
         wall_offset = parse_distance_string(wall_offset, model.units)
 
-        # loop through the rooms and generate sensor grids
-        sensor_grids = []
-        remove_out = not keep_out
-        for room in rooms:
-            sg = room.properties.radiance.generate_sensor_grid(
-                grid_size, offset=offset, remove_out=remove_out, wall_offset=wall_offset)
-            if sg is not None:
-                sensor_grids.append(sg)
-        if not include_mesh:
-            for sg in sensor_grids:
-                sg.mesh = None
-
-        # write the sensor grids to the output file or folder
-        if folder is None:
-            if write_json:
-                output_file.write(json.dumps([sg.to_dict() for sg in sensor_grids]))
-            else:
-                output_file.write('\n'.join([sg.to_radiance() for sg in sensor_grids]))
-        else:
-            if write_json:
-                for sg in sensor_grids:
-                    sg.to_json(folder)
-            else:
-                for sg in sensor_grids:
-                    sg.to_file(folder)
+        # generate the sensor grids and write them to the output file or folder
+        grid_args = {
+            'x_dim': grid_size, 'offset': offset, 'remove_out': not keep_out,
+            'wall_offset': wall_offset
+        }
+        write_room_sensor_grids(
+            rooms, 'generate_sensor_grid', grid_args, folder, output_file,
+            write_json, include_mesh, workers)
     except Exception as e:
         _logger.exception('Grid generation failed.\n{}'.format(e))
         sys.exit(1)
@@ -473,9 +556,14 @@ def from_rooms(model_file, grid_size, offset, include_mesh, keep_out, wall_offse
 @click.option('--output-file', '-f', help='Optional file to output the JSON or CSV '
               'string of the sensor grids. By default this will be printed '
               'to stdout', type=click.File('w'), default='-', show_default=True)
+@click.option('--workers', '-n', help='An integer for the number of processes '
+              'to be used to generate the sensor grids of the rooms in parallel. Each '
+              'grid is written as soon as it is generated. Use 0 to use all CPUs.',
+              type=int, default=1, show_default=True)
 def from_rooms_radial(
         model_file, grid_size, offset, include_mesh, keep_out, wall_offset,
-        dir_count, start_vector, mesh_radius, room, write_json, folder, output_file):
+        dir_count, start_vector, mesh_radius, room, write_json, folder, output_file,
+        workers):
     """Generate SensorGrids of radial directions around positions from room floors.
 
     \b
@@ -493,32 +581,15 @@ def from_rooms_radial(
         vec = [float(v) for v in start_vector.split()]
         st_vec = Vector3D(*vec)
 
-        # loop through the rooms and generate sensor grids
-        sensor_grids = []
-        remove_out = not keep_out
-        for room in rooms:
-            sg = room.properties.radiance.generate_sensor_grid_radial(
-                grid_size, offset=offset, remove_out=remove_out, wall_offset=wall_offset,
-                dir_count=dir_count, start_vector=st_vec, mesh_radius=mesh_radius)
-            if sg is not None:
-                sensor_grids.append(sg)
-        if not include_mesh:
-            for sg in sensor_grids:
-                sg.mesh = None
-
-        # write the sensor grids to the output file or folder
-        if folder is None:
-            if write_json:
-                output_file.write(json.dumps([sg.to_dict() for sg in sensor_grids]))
-            else:
-                output_file.write('\n'.join([sg.to_radiance() for sg in sensor_grids]))
-        else:
-            if write_json:
-                for sg in sensor_grids:
-                    sg.to_json(folder)
-            else:
-                for sg in sensor_grids:
-                    sg.to_file(folder)
+        # generate the sensor grids and write them to the output file or folder
+        grid_args = {
+            'x_dim': grid_size, 'offset': offset, 'remove_out': not keep_out,
+            'wall_offset': wall_offset, 'dir_count': dir_count,
+            'start_vector': st_vec, 'mesh_radius': mesh_radius
+        }
+        write_room_sensor_grids(
+            rooms, 'generate_sensor_grid_radial', grid_args, folder, output_file,
+            write_json, include_mesh, workers)
     except Exception as e:
         _logger.exception('Grid generation failed.\n{}'.format(e))
         sys.exit(1)
@@ -568,9 +639,13 @@ def from_rooms_radial(
 @click.option('--output-file', '-f', help='Optional file to output the JSON or CSV '
               'string of the sensor grids. By default this will be printed '
               'to stdout', type=click.File('w'), default='-', show_default=True)
+@click.option('--workers', '-n', help='An integer for the number of processes '
+              'to be used to generate the sensor grids of the rooms in parallel. Each '
+              'grid is written as soon as it is generated. Use 0 to use all CPUs.',
+              type=int, default=1, show_default=True)
 def from_exterior_faces(
         model_file, grid_size, offset, face_type, full_geometry, include_mesh,
-        room, write_json, folder, output_file):
+        room, write_json, folder, output_file, workers):
     """Generate SensorGrids from the exterior Faces of a honeybee model.
 
     \b
@@ -586,37 +661,27 @@ def from_exterior_faces(
         offset = parse_distance_string(offset, model.units)
         punched_geometry = not full_geometry
 
-        # loop through the rooms and generate sensor grids
-        sensor_grids = []
-        if rooms is None:
+        if rooms is None:  # generate a single sensor grid for the whole model
             sg = model.properties.radiance.generate_exterior_face_sensor_grid(
                 grid_size, offset=offset, face_type=face_type,
                 punched_geometry=punched_geometry)
-            sensor_grids.append(sg)
-        else:
-            for room in rooms:
-                sg = room.properties.radiance.generate_exterior_face_sensor_grid(
-                    grid_size, offset=offset, face_type=face_type,
-                    punched_geometry=punched_geometry)
-                if sg is not None:
-                    sensor_grids.append(sg)
-        if not include_mesh:
-            for sg in sensor_grids:
+            if not include_mesh:
                 sg.mesh = None
-
-        # write the sensor grids to the output file or folder
-        if folder is None:
-            if write_json:
-                output_file.write(json.dumps([sg.to_dict() for sg in sensor_grids]))
-            else:
-                output_file.write('\n'.join([sg.to_radiance() for sg in sensor_grids]))
-        else:
-            if write_json:
-                for sg in sensor_grids:
-                    sg.to_json(folder)
+            if folder is None:
+                output_file.write(
+                    json.dumps([sg.to_dict()]) if write_json else sg.to_radiance())
+            elif write_json:
+                sg.to_json(folder)
             else:
-                for sg in sensor_grids:
-                    sg.to_file(folder)
+                sg.to_file(folder)
+        else:  # generate the grids of the rooms and write them as they are generated
+            grid_args = {
+                'dimension': grid_size, 'offset': offset, 'face_type': face_type,
+                'punched_geometry': punched_geometry
+            }
+            write_room_sensor_grids(
+                rooms, 'generate_exterior_face_sensor_grid', grid_args, folder,
+                output_file, write_json, include_mesh, workers)
     except Exception as e:
         _logger.exception('Grid generation failed.\n{}'.format(e))
         sys.exit(1)
@@ -662,9 +727,13 @@ def from_exterior_faces(
 @click.option('--output-file', '-f', help='Optional file to output the JSON or CSV '
               'string of the sensor grids. By default this will be printed '
               'to stdout', type=click.File('w'), default='-', show_default=True)
+@click.option('--workers', '-n', help='An integer for the number of processes '
+              'to be used to generate the sensor grids of the rooms in parallel. Each '
+              'grid is written as soon as it is generated. Use 0 to use all CPUs.',
+              type=int, default=1, show_default=True)
 def from_exterior_apertures(
         model_file, grid_size, offset, aperture_type, include_mesh,
-        room, write_json, folder, output_file):
+        room, write_json, folder, output_file, workers):
     """Generate SensorGrids from the exterior Faces of a honeybee model.
 
     \b
@@ -679,35 +748,26 @@ def from_exterior_apertures(
         grid_size = parse_distance_string(grid_size, model.units)
         offset = parse_distance_string(offset, model.units)
 
-        # loop through the rooms and generate sensor grids
-        sensor_grids = []
-        if rooms is None:
+        if rooms is None:  # generate a single sensor grid for the whole model
             sg = model.properties.radiance.generate_exterior_aperture_sensor_grid(
                 grid_size, offset=offset, aperture_type=aperture_type)
-            sensor_grids.append(sg)
-        else:
-            for room in rooms:
-                sg = room.properties.radiance.generate_exterior_aperture_sensor_grid(
-                    grid_size, offset=offset, aperture_type=aperture_type)
-                if sg is not None:
-                    sensor_grids.append(sg)
-        if not include_mesh:
-            for sg in sensor_grids:
+            if not include_mesh:
                 sg.mesh = None
-
-        # write the sensor grids to the output file or folder
-        if folder is None:
-            if write_json:
-                output_file.write(json.dumps([sg.to_dict() for sg in sensor_grids]))
+            if folder is None:
+                output_file.write(
+                    json.dumps([sg.to_dict()]) if write_json else sg.to_radiance())
+            elif write_json:
+                sg.to_json(folder)
             else:
-                output_file.write('\n'.join([sg.to_radiance() for sg in sensor_grids]))
-        else:
-            if write_json:
-                for sg in sensor_grids:
-                    sg.to_json(folder)
-            else:
-                for sg in sensor_grids:
-                    sg.to_file(folder)
+                sg.to_file(folder)
+        else:  # generate the grids of the rooms and write them as they are generated
+            grid_args = {
+                'dimension': grid_size, 'offset': offset,
+                'aperture_type': aperture_type
+            }
+            write_room_sensor_grids(
+                rooms, 'generate_exterior_aperture_sensor_grid', grid_args, folder,
+                output_file, write_json, include_mesh, workers)
     except Exception as e:
         _logger.exception('Grid generation failed.\n{}'.format(e))
         sys.exit(1)
@@ -5,7 +5,7 @@ import os
 import logging
 import json
 
-from honeybee_radiance.sensorgrid import SensorGrid
+from honeybee_radiance.reader import sensor_count_from_file
 
 
 _logger = logging.getLogger(__name__)
@@ -70,8 +70,7 @@ def split_modifiers(
     """
     try:
         if grid_file:
-            sg = SensorGrid.from_file(grid_file)
-            sensor_count = sg.count
+            sensor_count = sensor_count_from_file(grid_file)
         sensor_count *= sensor_multiplier
 
         with open(modifier_file, 'r') as file:
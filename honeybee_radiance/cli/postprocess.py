@@ -23,7 +23,11 @@ from honeybee_radiance.postprocess.annualirradiance import annual_irradiance_to_
 from honeybee_radiance.postprocess.electriclight import daylight_control_schedules
 from honeybee_radiance.postprocess.leed import leed_illuminance_to_folder
 from honeybee_radiance.postprocess.solartracking import post_process_solar_tracking
-from honeybee_radiance.cli.util import get_compare_func, remove_header
+from honeybee_radiance.postprocess.thresholdindex import threshold_index_to_folder, \
+    metrics_from_threshold_index
+from honeybee_radiance.postprocess.matrix import matrix_rows, matrix_header, \
+    packed_rows, packed_header, pack_row, count_bits, PACKED_FORMAT
+from honeybee_radiance.cli.util import get_compare_func
 
 _logger = logging.getLogger(__name__)
 
@@ -62,15 +66,23 @@ def post_process():
     'This is useful for cases that you want to all the values outside a certain range '
     'to be converted to 1. By default the input logic will be used as is.', default=True
 )
+@click.option(
+    '--ascii/--packed', 'ascii_format', is_flag=True, default=True, help='Switch '
+    'between an ASCII output with a 0 or 1 value for each column and a bit-packed '
+    'output with one bit for each column. Bit-packed matrices are 16 times smaller '
+    'and they can be used as the input to the count, sum-row and average-row '
+    'commands.'
+)
 def convert_matrix_to_binary(
-    input_matrix, output, minimum, maximum, include_max, include_min, comply
+    input_matrix, output, minimum, maximum, include_max, include_min, comply,
+    ascii_format
 ):
     """Postprocess a Radiance matrix and convert it to 0-1 values.
 
     \b
     This command is useful for translating Radiance results to outputs like sunlight
-    hours. Input matrix must be in ASCII format. The header in the input file will be
-    ignored.
+    hours. Input matrix can be in ASCII, float or double format. The header in the
+    input file will be ignored.
 
     """
 
@@ -78,26 +90,28 @@ def convert_matrix_to_binary(
     minimum = float(minimum)
     maximum = float(maximum)
     try:
-        first_line, input_file = remove_header(input_matrix)
-        values = [
-            '1' if compare(float(v), minimum, maximum) else '0'
-            for v in first_line.split()
-        ]
-        output.write('\t'.join(values) + '\n')
-        for line in input_file:
-            # write binary values to new file
-            values = [
-                '1' if compare(float(v), minimum, maximum) else '0'
-                for v in line.split()
-            ]
-            output.write('\t'.join(values) + '\n')
+        if not ascii_format:
+            # write the header with the number of columns and the packed bits
+            output.flush()
+            out_bytes = getattr(output, 'buffer', output)
+            for count, row in enumerate(matrix_rows(input_matrix)):
+                if count == 0:
+                    out_bytes.write(packed_header(len(row)))
+                out_bytes.write(pack_row(compare(v, minimum, maximum) for v in row))
+            out_bytes.flush()
+        else:
+            for row in matrix_rows(input_matrix):
+                # write binary values to new file
+                values = [
+                    '1' if compare(v, minimum, maximum) else '0'
+                    for v in row
+                ]
+                output.write('\t'.join(values) + '\n')
     except Exception:
         _logger.exception('Failed to convert the input file to binary format.')
         sys.exit(1)
     else:
         sys.exit(0)
-    finally:
-        input_file.close()
 
 
 @post_process.command('count')
@@ -136,33 +150,38 @@ def count_values(
 
     \b
     This command is useful for post processing results like the number of sensors
-    which receive more than X lux at any timestep.
+    which receive more than X lux at any timestep. Input matrix can be in ASCII,
+    float, double or bit-packed format. The values of bit-packed matrices are
+    counted without unpacking the bits.
 
     """
     compare = get_compare_func(include_min, include_max, comply)
     minimum = float(minimum)
     maximum = float(maximum)
     try:
-        first_line, input_file = remove_header(input_matrix)
-        value = sum(
-            1 if compare(float(v), minimum, maximum) else 0
-            for v in first_line.split()
-        )
-        output.write('%d\n' % value)
-        for line in input_file:
-            # write binary values to new file
-            value = sum(
-                1 if compare(float(v), minimum, maximum) else 0
-                for v in line.split()
-            )
-            output.write('%d\n' % value)
+        header = matrix_header(input_matrix)
+        if header['format'] == PACKED_FORMAT:
+            # each value is either 0 or 1 so only two comparisons are needed
+            ncols = header['ncols'] * header['ncomp']
+            count_one = 1 if compare(1.0, minimum, maximum) else 0
+            count_zero = 1 if compare(0.0, minimum, maximum) else 0
+            for row in packed_rows(input_matrix):
+                ones = count_bits(row)
+                value = ones * count_one + (ncols - ones) * count_zero
+                output.write('%d\n' % value)
+        else:
+            for row in matrix_rows(input_matrix):
+                # write the count of values to new file
+                value = sum(
+                    1 if compare(v, minimum, maximum) else 0
+                    for v in row
+                )
+                output.write('%d\n' % value)
     except Exception:
         _logger.exception('Failed to convert the input file to binary format.')
         sys.exit(1)
     else:
         sys.exit(0)
-    finally:
-        input_file.close()
 
 
 @post_process.command('sum-row')
@@ -184,24 +203,23 @@ def sum_matrix_rows(input_matrix, divisor, output):
 
     \b
     This command is useful for translating Radiance results to outputs like radiation
-    to total radiation. Input matrix must be in ASCII format. The header in the input
-    file will be ignored.
+    to total radiation. Input matrix can be in ASCII, float, double or bit-packed
+    format. The header in the input file will be ignored.
     """
     try:
-        first_line, input_file = remove_header(input_matrix)
-        value = sum(float(v) for v in first_line.split()) / divisor
-        output.write('%s\n' % value)
-        for line in input_file:
-            # write sum to a new file
-            value = sum(float(v) for v in line.split()) / divisor
-            output.write('%s\n' % value)
+        if matrix_header(input_matrix)['format'] == PACKED_FORMAT:
+            for row in packed_rows(input_matrix):
+                output.write('%s\n' % (float(count_bits(row)) / divisor))
+        else:
+            for row in matrix_rows(input_matrix):
+                # write sum to a new file
+                value = sum(row) / divisor
+                output.write('%s\n' % value)
     except Exception:
         _logger.exception('Failed to sum numbers in each row.')
         sys.exit(1)
     else:
         sys.exit(0)
-    finally:
-        input_file.close()
 
 
 @post_process.command('average-row')
@@ -217,30 +235,24 @@ def average_matrix_rows(input_matrix, output):
 
     \b
     This command is useful for translating Radiance results to outputs like radiation
-    to average radiation. Input matrix must be in ASCII format. The header in the input
-    file will be ignored.
+    to average radiation. Input matrix can be in ASCII, float, double or bit-packed
+    format. The header in the input file will be ignored.
     """
     try:
-        first_line, input_file = remove_header(input_matrix)
-
-        # calculate the values for the first line
-        values = [float(v) for v in first_line.split()]
-        count = len(values)
-        output.write('%s\n' % sum(values) / count)
-
-        # write rest of the lines
-        for line in input_file:
-            # write sum to a new file
-            value = sum(float(v) for v in line.split())
-            output.write('%s\n' % value / count)
-
+        header = matrix_header(input_matrix)
+        if header['format'] == PACKED_FORMAT:
+            ncols = header['ncols'] * header['ncomp']
+            for row in packed_rows(input_matrix):
+                output.write('%s\n' % (float(count_bits(row)) / ncols))
+        else:
+            for row in matrix_rows(input_matrix):
+                # write average to a new file
+                output.write('%s\n' % (sum(row) / len(row)))
     except Exception:
         _logger.exception('Failed to average the numbers in each row.')
         sys.exit(1)
     else:
         sys.exit(0)
-    finally:
-        input_file.close()
 
 
 @post_process.command('cumulative-radiation')
@@ -264,7 +276,7 @@ def cumulative_radiation(average_irradiance, wea, timestep, output):
     \b
     Args:
         average_irradiance: A single-column matrix of average irradiance values.
-            This input matrix must be in ASCII format.
+            This input matrix can be in ASCII, float or double format.
         wea: The .wea file that was used in the irradiance simulation. This
             will be used to determine the duration of the analysis for computing
             cumulative radiation. This can also be an .epw file.
@@ -278,19 +290,13 @@ def cumulative_radiation(average_irradiance, wea, timestep, output):
             wea = Wea.from_epw_file(wea, timestep).write(_wea_file)
         # parse the Wea and the average_irradiance matrix
         conversion = Wea.count_timesteps(wea) / (timestep * 1000)
-        first_line, input_file = remove_header(average_irradiance)
-        # calculate the value for the first line
-        output.write('%s\n' % (float(first_line) * conversion))
-        # write rest of the lines
-        for line in input_file:
-            output.write('%s\n' % (float(line) * conversion))
+        for row in matrix_rows(average_irradiance):
+            output.write('%s\n' % (row[0] * conversion))
     except Exception:
         _logger.exception('Failed to compute cumulative radiation.')
         sys.exit(1)
     else:
         sys.exit(0)
-    finally:
-        input_file.close()
 
 
 @post_process.command('annual-irradiance')
@@ -310,7 +316,12 @@ def cumulative_radiation(average_irradiance, wea, timestep, output):
     '--sub-folder', '-sf', help='Optional relative path for subfolder to write output '
     'metric files.', default='metrics'
 )
-def annual_irradiance(folder, wea, timestep, sub_folder):
+@click.option(
+    '--workers', '-w', help='Number of processes that will be used to post-process '
+    'the sensor grids in parallel. Use 0 to use all of the available CPUs.',
+    default=1, type=int, show_default=True
+)
+def annual_irradiance(folder, wea, timestep, sub_folder, workers):
     """Compute irradiance metrics in a folder and write them in a subfolder.
 
     \b
@@ -333,7 +344,7 @@ def annual_irradiance(folder, wea, timestep, sub_folder):
         if not is_wea:
             _wea_file = os.path.join(os.path.dirname(wea), 'epw_to_wea.wea')
             wea = Wea.from_epw_file(wea, timestep).write(_wea_file)
-        annual_irradiance_to_folder(folder, wea, timestep, sub_folder)
+        annual_irradiance_to_folder(folder, wea, timestep, sub_folder, workers)
     except Exception:
         _logger.exception('Failed to compute irradiance metrics.')
         sys.exit(1)
@@ -373,9 +384,14 @@ def annual_irradiance(folder, wea, timestep, sub_folder):
     '--sub_folder', '-sf', help='Optional relative path for subfolder to write output '
     'metric files.', default='metrics'
 )
+@click.option(
+    '--workers', '-w', help='Number of processes that will be used to post-process '
+    'the sensor grids in parallel. Use 0 to use all of the available CPUs.',
+    default=1, type=int, show_default=True
+)
 def annual_metrics(
     folder, schedule, threshold, lower_threshold, upper_threshold, grids_filter,
-    sub_folder
+    sub_folder, workers
 ):
     """Compute annual metrics in a folder and write them in a subfolder.
 
@@ -404,7 +420,7 @@ def annual_metrics(
     try:
         metrics_to_folder(
             folder, schedule, threshold, lower_threshold, upper_threshold,
-            grids_filter, sub_folder
+            grids_filter, sub_folder, workers
         )
     except Exception:
         _logger.exception('Failed to calculate annual metrics.')
@@ -430,8 +446,13 @@ def annual_metrics(
     '--sub_folder', '-sf', help='Optional relative path for subfolder to write output '
     'metric files.', default='metrics'
 )
+@click.option(
+    '--workers', '-w', help='Number of processes that will be used to post-process '
+    'the sensor grids in parallel. Use 0 to use all of the available CPUs.',
+    default=1, type=int, show_default=True
+)
 def annual_en17037_metrics(
-    folder, schedule, grids_filter, sub_folder
+    folder, schedule, grids_filter, sub_folder, workers
 ):
     """Compute annual EN 17037 metrics in a folder and write them in a subfolder.
 
@@ -452,7 +473,7 @@ def annual_en17037_metrics(
     with open(schedule) as hourly_schedule:
         schedule = [int(float(v)) for v in hourly_schedule]
     try:
-        en17037_to_folder(folder, schedule, grids_filter, sub_folder)
+        en17037_to_folder(folder, schedule, grids_filter, sub_folder, workers)
     except Exception:
         _logger.exception('Failed to calculate annual EN 17037 metrics.')
         sys.exit(1)
@@ -483,8 +504,13 @@ def annual_en17037_metrics(
     '--sub_folder', '-sf', help='Optional relative path for subfolder to write output '
     'metric files.', default='metrics'
 )
+@click.option(
+    '--workers', '-w', help='Number of processes that will be used to post-process '
+    'the sensor grids in parallel. Use 0 to use all of the available CPUs.',
+    default=1, type=int, show_default=True
+)
 def annual_glare(
-    folder, schedule, glare_threshold, grids_filter, sub_folder
+    folder, schedule, glare_threshold, grids_filter, sub_folder, workers
 ):
     """Compute annual glare autonomy in a folder and write them in a subfolder.
 
@@ -508,7 +534,7 @@ def annual_glare(
 
     try:
         glare_autonomy_to_folder(
-            folder, schedule, glare_threshold, grids_filter, sub_folder
+            folder, schedule, glare_threshold, grids_filter, sub_folder, workers
         )
     except Exception:
         _logger.exception('Failed to calculate annual glare autonomy.')
@@ -517,6 +543,141 @@ def annual_glare(
         sys.exit(0)
 
 
+@post_process.command('threshold-index')
+@click.argument(
+    'folder',
+    type=click.Path(exists=True, file_okay=False, dir_okay=True, resolve_path=True)
+)
+@click.option(
+    '--schedule', '-sch', help='Path to an annual schedule file. Values should be 0-1 '
+    'separated by new line. If not provided an 8-5 annual schedule will be created.',
+    type=click.Path(exists=False, file_okay=True, dir_okay=False, resolve_path=True)
+)
+@click.option(
+    '--min-value', '-min', help='A positive number for the lowest bin edge.',
+    default=1, type=float, show_default=True
+)
+@click.option(
+    '--max-value', '-max', help='A number for the highest bin edge.',
+    default=100000, type=float, show_default=True
+)
+@click.option(
+    '--bin-count', '-b', help='Number of log-spaced bins between the lowest and '
+    'the highest bin edges.', default=100, type=int, show_default=True
+)
+@click.option(
+    '--binned/--exact', is_flag=True, default=True, help='Switch between a binned '
+    'index and an exact index. The exact index also stores the sorted occupied '
+    'values of each sensor to get exact results for any threshold.',
+    show_default=True
+)
+@click.option(
+    '--extension', '-e', help='Extension of the result files. Use dgp to build the '
+    'index of an imageless annual glare study.', default='ill', show_default=True
+)
+@click.option(
+    '--grids-filter', '-gf', help='A pattern to filter the grids.', default='*',
+    show_default=True
+)
+@click.option(
+    '--sub_folder', '-sf', help='Optional relative path for subfolder to write the '
+    'index files.', default='threshold_index', show_default=True
+)
+@click.option(
+    '--workers', '-w', help='Number of processes that will be used to post-process '
+    'the sensor grids in parallel. Use 0 to use all of the available CPUs.',
+    default=1, type=int, show_default=True
+)
+def threshold_index(
+    folder, schedule, min_value, max_value, bin_count, binned, extension,
+    grids_filter, sub_folder, workers
+):
+    """Build a threshold index for each grid in a folder to re-evaluate metrics.
+
+    \b
+    The index stores a histogram of the occupied hours of each sensor. Once the
+    index is built, the annual-daylight-from-index command can compute the annual
+    daylight metrics for any threshold without reading the result files again.
+
+    \b
+    Args:
+        folder: Results folder. This folder is an output folder of annual
+        daylight or imageless annual glare recipe. Folder should include
+        grids_info.json and sun-up-hours.txt.
+    """
+    # optional input - only check if the file exist otherwise ignore
+    if schedule and os.path.isfile(schedule):
+        with open(schedule) as hourly_schedule:
+            schedule = [int(float(v)) for v in hourly_schedule]
+    else:
+        schedule = None
+
+    try:
+        threshold_index_to_folder(
+            folder, schedule, grids_filter, sub_folder, min_value, max_value,
+            bin_count, not binned, extension, workers
+        )
+    except Exception:
+        _logger.exception('Failed to build the threshold index.')
+        sys.exit(1)
+    else:
+        sys.exit(0)
+
+
+@post_process.command('annual-daylight-from-index')
+@click.argument(
+    'index-folder',
+    type=click.Path(exists=True, file_okay=False, dir_okay=True, resolve_path=True)
+)
+@click.option(
+    '--threshold', '-t', help='Threshold illuminance level for daylight autonomy.',
+    default=300, type=float, show_default=True
+)
+@click.option(
+    '--lower-threshold', '-lt',
+    help='Minimum threshold for useful daylight illuminance.', default=100,
+    type=float, show_default=True
+)
+@click.option(
+    '--upper-threshold', '-ut',
+    help='Maximum threshold for useful daylight illuminance.', default=3000,
+    type=float, show_default=True
+)
+@click.option(
+    '--output-folder', '-o', help='Optional path to an output folder for the metric '
+    'files. By default the files will be written to a metrics_from_index folder '
+    'next to the index folder such that the metrics folder of the results is not '
+    'overwritten.', default=None,
+    type=click.Path(file_okay=False, dir_okay=True, resolve_path=True)
+)
+def annual_metrics_from_index(
+    index_folder, threshold, lower_threshold, upper_threshold, output_folder
+):
+    """Compute annual daylight metrics from a threshold index folder.
+
+    \b
+    This command generates the same 5 files for each grid as the annual-daylight
+    command.
+
+    \b
+    Args:
+        index_folder: A folder of threshold index files that is created by the
+            threshold-index command.
+    """
+    if output_folder is None:
+        output_folder = os.path.join(
+            os.path.dirname(index_folder), 'metrics_from_index')
+    try:
+        metrics_from_threshold_index(
+            index_folder, output_folder, threshold, lower_threshold, upper_threshold
+        )
+    except Exception:
+        _logger.exception('Failed to calculate annual metrics from the index.')
+        sys.exit(1)
+    else:
+        sys.exit(0)
+
+
 @post_process.command('electric-lighting')
 @click.argument(
     'folder',
@@ -560,9 +721,14 @@ def annual_glare(
     'By default this will be printed out to stdout',
     type=click.File('w'), default='-', show_default=True
 )
+@click.option(
+    '--workers', '-w', help='Number of processes that will be used to post-process '
+    'the sensor grids in parallel. Use 0 to use all of the available CPUs.',
+    default=1, type=int, show_default=True
+)
 def electric_lighting(
     folder, base_schedule, ill_setpoint, min_power_in, min_light_out, on_at_min,
-    output_file
+    output_file, workers
 ):
     """Generate electric lighting schedules from annual daylight results.
 
@@ -595,7 +761,8 @@ def electric_lighting(
 
         off_at_min = not on_at_min
         schedules, _ = daylight_control_schedules(
-            folder, schedule, ill_setpoint, min_power_in, min_light_out, off_at_min
+            folder, schedule, ill_setpoint, min_power_in, min_light_out, off_at_min,
+            workers
         )
 
         for line in zip(*schedules):
@@ -680,7 +847,14 @@ def leed_illuminance(folder, glare_control, grids_filter, sub_folder, output_fil
     '--sub-folder', '-sf', help='Optional relative path for subfolder to write output '
     '.ill files of the dynamic tracking system.', default='final'
 )
-def solar_tracking(folder, sun_up_hours, wea, north, tracking_increment, sub_folder):
+@click.option(
+    '--workers', '-w', help='Number of processes that will be used to post-process '
+    'the sensor grids in parallel. Use 0 to use all of the available CPUs.',
+    default=1, type=int, show_default=True
+)
+def solar_tracking(
+    folder, sun_up_hours, wea, north, tracking_increment, sub_folder, workers
+):
     """Postprocess a list of result folders to account for dynamic solar tracking.
 
     \b
@@ -718,7 +892,7 @@ def solar_tracking(folder, sun_up_hours, wea, north, tracking_increment, sub_fol
             wea_obj = Wea.from_file(wea)
             post_process_solar_tracking(
                 models, sun_up_hours, wea_obj.location, north,
-                tracking_increment, dest_folder)
+                tracking_increment, dest_folder, workers)
     except Exception:
         _logger.exception('Failed to compute irradiance metrics.')
         sys.exit(1)
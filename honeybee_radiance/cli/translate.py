@@ -8,8 +8,10 @@ import zipfile
 import shutil
 
 from ladybug.commandutil import process_content_to_output
-from honeybee_radiance.reader import string_to_dicts
+from honeybee_radiance.reader import file_to_dicts
 from honeybee_radiance.mutil import dict_to_modifier, modifier_class_from_type_string
+from honeybee_radiance.roomindex import RoomIndex
+from honeybee_radiance.writer import model_to_rad_file, precision_from_tolerance
 
 from honeybee.model import Model
 from ladybug.futil import preparedir, unzip_file
@@ -71,13 +73,38 @@ def translate():
     'This will only create sensor grids for rooms if there are no sensor grids '
     'in the model.'
 )
+@click.option(
+    '--incremental/--full', help='Flag to note whether only the files that have '
+    'changed since the last translation to the same folder should be rewritten. '
+    'A _manifest.json with the lists of the changed files and objects will be '
+    'written to the model folder.', default=False, show_default=True)
+@click.option(
+    '--rtm-face-count', '-rtm', help='An optional integer for the number of faces '
+    'above which a ShadeMesh is written as a Radiance mesh primitive with a compiled '
+    '.rtm file instead of one polygon per face. This requires the obj2mesh command '
+    'of Radiance. By default, all ShadeMeshes are written as polygons.',
+    type=int, default=None, show_default=True)
+@click.option(
+    '--instance-count', '-ic', help='An optional integer for the minimum number of '
+    'congruent copies of a shade group for the group to be written once as an octree '
+    'and each copy to be written as a Radiance instance. A shade group is either the '
+    'Shades of one parent object or a ShadeMesh. This requires the oconv command of '
+    'Radiance. By default, all shades are written as polygons.',
+    type=int, default=None, show_default=True)
+@click.option(
+    '--tolerance-precision/--full-precision', '-tp/-fp', help='Flag to note '
+    'whether the vertices of the geometry and the positions of the sensors and '
+    'views should be rounded to the number of decimal places of the model '
+    'tolerance, which makes the files smaller and faster to parse. By default, '
+    'all values are written with full precision.', default=False, show_default=True)
 @click.option(
     '--log-file', help='Optional log file to output the path of the radiance '
     'folder generated from the model. By default this will be printed '
     'to stdout', type=click.File('w'), default='-')
 def model_to_rad_folder_cli(
         model_file, folder, view, grid, full_match, config_file, minimal,
-        no_grid_check, no_view_check, create_grids, log_file):
+        no_grid_check, no_view_check, create_grids, incremental, rtm_face_count,
+        instance_count, tolerance_precision, log_file):
     """Translate a Model file into a Radiance Folder.
 
     \b
@@ -92,7 +119,9 @@ def model_to_rad_folder_cli(
         view_check = not no_view_check
         model_to_rad_folder(
             model_file, folder, view, grid, full_match, config_file,
-            minimal, grid_check, view_check, log_file, create_grids=create_grids)
+            minimal, grid_check, view_check, log_file, create_grids=create_grids,
+            incremental=incremental, rtm_face_count=rtm_face_count,
+            instance_count=instance_count, tolerance_precision=tolerance_precision)
     except Exception as e:
         _logger.exception('Model translation failed.\n{}'.format(e))
         sys.exit(1)
@@ -104,7 +133,8 @@ def model_to_rad_folder(
         model_file, folder=None, view=None, grid=None, full_match=False, config_file=None,
         minimal=False, grid_check=False, view_check=False, log_file=None,
         no_full_match=True, maximal=True, no_grid_check=False, no_view_check=False,
-        create_grids=False):
+        create_grids=False, incremental=False, rtm_face_count=None,
+        instance_count=None, tolerance_precision=False, full_precision=True):
     """Translate a Model file into a Radiance Folder.
 
     Args:
@@ -142,6 +172,22 @@ def model_to_rad_folder(
             an explicit error will be raised. (Default: False).
         log_file: Optional log file to output the path of the radiance folder
             generated from the model. If None, it will be returned from this method.
+        create_grids: Boolean to note whether sensor grids should be created if
+            none exists. (Default: False).
+        incremental: Boolean to note whether only the files that have changed
+            since the last translation to the same folder should be rewritten.
+            (Default: False).
+        rtm_face_count: An optional integer for the number of faces above which
+            a ShadeMesh is written as a Radiance mesh primitive with a compiled
+            .rtm file. If None, all ShadeMeshes are written as polygons.
+            (Default: None).
+        instance_count: An optional integer for the minimum number of congruent
+            copies of a shade group for the copies to be written as Radiance
+            instances of one octree. If None, all shades are written as polygons.
+            (Default: None).
+        tolerance_precision: Boolean to note whether the vertices of the geometry
+            and the positions of the sensors and views should be rounded to the
+            number of decimal places of the model tolerance. (Default: False).
     """
     # set the default folder if it's not specified
     if folder is None:
@@ -199,7 +245,10 @@ def model_to_rad_folder(
         # translate the model to a radiance folder
         rad_fold = model.to.rad_folder(
             model, folder, config_file, minimal, views=view, grids=grid,
-            full_match=full_match
+            full_match=full_match, incremental=incremental,
+            rtm_face_count=rtm_face_count, instance_count=instance_count,
+            precision=precision_from_tolerance(model.tolerance)
+            if tolerance_precision else None
         )
 
         if log_file is None:
@@ -221,7 +270,12 @@ def model_to_rad_folder(
 @click.option('--output-file', help='Optional RAD file to output the RAD string of the '
               'translation. By default this will be printed out to stdout',
               type=click.File('w'), default='-', show_default=True)
-def model_to_rad_cli(model_file, blk, minimal, output_file):
+@click.option('--tolerance-precision/--full-precision', '-tp/-fp', help='Flag to '
+              'note whether the vertices of the geometry should be rounded to the '
+              'number of decimal places of the model tolerance. By default, the '
+              'vertices are written with full precision.',
+              default=False, show_default=True)
+def model_to_rad_cli(model_file, blk, minimal, output_file, tolerance_precision):
     """Translate a Model file to a Radiance string.
 
     The resulting strings will include all geometry (Rooms, Faces, Shades, Apertures,
@@ -234,7 +288,8 @@ def model_to_rad_cli(model_file, blk, minimal, output_file):
         model_file: Full path to a Model JSON file (HBJSON) or a Model pkl (HBpkl) file.
     """
     try:
-        model_to_rad(model_file, blk, minimal, output_file)
+        model_to_rad(model_file, blk, minimal, output_file,
+                     tolerance_precision=tolerance_precision)
     except Exception as e:
         _logger.exception('Model translation failed.\n{}'.format(e))
         sys.exit(1)
@@ -242,7 +297,8 @@ def model_to_rad_cli(model_file, blk, minimal, output_file):
         sys.exit(0)
 
 
-def model_to_rad(model_file, blk=False, minimal=False, output_file=None, maximal=True):
+def model_to_rad(model_file, blk=False, minimal=False, output_file=None, maximal=True,
+                 tolerance_precision=False, full_precision=True):
     """Translate a Model file to a Radiance string.
 
     The resulting strings will include all geometry (Rooms, Faces, Shades, Apertures,
@@ -259,10 +315,29 @@ def model_to_rad(model_file, blk=False, minimal=False, output_file=None, maximal
             in a minimal format (with spaces instead of line breaks).
         output_file: Optional RAD file to output the RAD string of the translation.
             If None, the string will be returned from this method. (Default: None).
+        tolerance_precision: Boolean to note whether the vertices of the geometry
+            should be rounded to the number of decimal places of the model
+            tolerance. (Default: False).
     """
-    # re-serialize the Model and translate the model to a rad string
+    # re-serialize the Model
     model = Model.from_file(model_file)
-    model_str, modifier_str = model.to.rad(model, blk, minimal)
+    precision = precision_from_tolerance(model.tolerance) \
+        if tolerance_precision else None
+
+    # stream the rad string to the output file if it is not returned
+    if output_file is not None and sys.version_info >= (3, 0):
+        if isinstance(output_file, str):
+            dir_name = os.path.dirname(os.path.abspath(output_file))
+            if not os.path.isdir(dir_name):
+                os.makedirs(dir_name)
+            with open(output_file, 'w', encoding='utf-8') as of:
+                model_to_rad_file(model, of, blk, minimal, precision)
+        else:
+            model_to_rad_file(model, output_file, blk, minimal, precision)
+        return
+
+    # translate the model to a rad string
+    model_str, modifier_str = model.to.rad(model, blk, minimal, precision)
     rad_str_list = ['# ========  MODEL MODIFIERS ========', modifier_str,
                     '# ========  MODEL GEOMETRY ========', model_str]
     rad_str = '\n\n'.join(rad_str_list)
@@ -306,9 +381,10 @@ def model_radiant_enclosure_info(model_file, folder, log_file):
 
         # loop through sensor grids and build up the radiant enclosure dicts
         grids_info = []
+        room_index = RoomIndex.from_model(model)
         for grid in model.properties.radiance.sensor_grids:
             # write an enclosure JSON for each grid
-            enc_dict = grid.enclosure_info_dict(model)
+            enc_dict = grid.enclosure_info_dict(model, room_index=room_index)
             enclosure_file = os.path.join(folder, '{}.json'.format(grid.identifier))
             with open(enclosure_file, 'w') as fp:
                 json.dump(enc_dict, fp)
@@ -386,10 +462,8 @@ def modifier_from_rad(modifier_rad, output_file):
     try:
         # re-serialize the Modifiers to Python
         mod_objs = []
-        with open(modifier_rad) as f:
-            rad_dicts = string_to_dicts(f.read())
-            for mod_dict in rad_dicts:
-                mod_objs.append(dict_to_modifier(mod_dict))
+        for mod_dict in file_to_dicts(modifier_rad):
+            mod_objs.append(dict_to_modifier(mod_dict))
 
         # create the honeybee dictionaries
         json_dicts = [mod.to_dict() for mod in mod_objs]
@@ -19,6 +19,8 @@ import subprocess
 import json
 import re
 
+_VERSION_CACHE = '.radiance_version_cache.json'  # file name of cached versions
+
 
 class Folders(object):
     """Honeybee_radiance folders.
@@ -250,7 +252,12 @@ class Folders(object):
         self.defaults_file = default_path["defaults_file"]
 
     def _radiance_version_from_cli(self):
-        """Get the Radiance version properties by making a call to a Radiance command."""
+        """Get the Radiance version properties by making a call to a Radiance command.
+
+        The output of the command is cached in the ladybug_tools folder together
+        with the modified time and size of the executable. So, the command is only
+        called again when the Radiance installation changes.
+        """
         # check mkpmap version since this avoids interference with Accelerad
         # more information about this is here: https://discourse.ladybug.tools/t/
         # is-it-possible-to-get-lbt-1-2-0-working-with-accelerad/13789/9
@@ -259,11 +266,14 @@ class Folders(object):
         if not os.path.isfile(rad_exe):  # old Radiance without the mkpmap executable
             rad_exe = os.path.join(self.radbin_path, 'rtrace.exe') if os.name == 'nt' \
                 else os.path.join(self.radbin_path, 'rtrace')
-        cmds = [rad_exe, '-version']
-        use_shell = True if os.name == 'nt' else False
-        process = subprocess.Popen(cmds, stdout=subprocess.PIPE, shell=use_shell)
-        stdout = process.communicate()
-        base_str = str(stdout[0]).replace("b'", '').replace(r"\r\n'", '')
+        base_str = self._cached_radiance_version(rad_exe)
+        if base_str is None:
+            cmds = [rad_exe, '-version']
+            use_shell = True if os.name == 'nt' else False
+            process = subprocess.Popen(cmds, stdout=subprocess.PIPE, shell=use_shell)
+            stdout = process.communicate()
+            base_str = str(stdout[0]).replace("b'", '').replace(r"\r\n'", '')
+            self._cache_radiance_version(rad_exe, base_str)
         self._radiance_version_str = base_str  # set the version string
         if 'NREL' in base_str:  # parse using NREL's version conventions
             try:  # try to parse the version into a list of integers
@@ -310,6 +320,57 @@ class Folders(object):
             except Exception:
                 pass  # failed to parse the date into values; possibly a custom build
 
+    @staticmethod
+    def _version_cache_file():
+        """Get the path to the file where the Radiance versions are cached."""
+        lb_install = lb_config.folders.ladybug_tools_folder
+        if lb_install and os.path.isdir(lb_install):
+            return os.path.join(lb_install, _VERSION_CACHE)
+
+    @staticmethod
+    def _executable_key(rad_exe):
+        """Get a list for the modified time and size of a Radiance executable."""
+        try:
+            stat = os.stat(rad_exe)
+        except OSError:  # the executable does not exist
+            return None
+        return [stat.st_mtime, stat.st_size]
+
+    def _cached_radiance_version(self, rad_exe):
+        """Get the cached version string of a Radiance executable if it is valid."""
+        cache_file = self._version_cache_file()
+        if cache_file is None:
+            return None
+        try:
+            with open(cache_file) as inf:
+                cache = json.load(inf)
+            exe_key, version_str = cache[rad_exe]
+        except (IOError, OSError, ValueError, KeyError, TypeError):
+            return None  # the cache does not exist or it is not valid
+        if exe_key != self._executable_key(rad_exe):
+            return None  # the Radiance installation has changed
+        return version_str
+
+    def _cache_radiance_version(self, rad_exe, version_str):
+        """Write the version string of a Radiance executable to the cache file."""
+        cache_file = self._version_cache_file()
+        exe_key = self._executable_key(rad_exe)
+        if cache_file is None or exe_key is None:
+            return
+        try:
+            with open(cache_file) as inf:
+                cache = json.load(inf)
+        except (IOError, OSError, ValueError):
+            cache = {}
+        if not isinstance(cache, dict):
+            cache = {}
+        cache[rad_exe] = [exe_key, version_str]
+        try:
+            with open(cache_file, 'w') as outf:
+                json.dump(cache, outf)
+        except (IOError, OSError):
+            pass  # the ladybug_tools folder is read-only
+
     @staticmethod
     def _find_radiance_folder():
         """Find the Radiance installation in its default location.
@@ -0,0 +1,316 @@
+"""Utilities to generate sensor grids and to distribute the sensors of grid folders."""
+from __future__ import division
+
+import os
+import sys
+import json
+
+from honeybee.room import Room
+
+
+def load_sensor_weights(weights_file):
+    """Load the cost weights of the sensors from a JSON file.
+
+    The JSON file must be a dictionary with the full_id of the grids as keys. The
+    value for each grid can either be a single number for the cost of each sensor
+    in the grid or a list of numbers with the cost of each sensor. For instance,
+    these values can be the time per sensor from a previous run or the results of
+    a cheap simulation with a low number of ambient bounces.
+
+    .. code-block:: python
+
+        {
+          "room_1": 2.5,  # each sensor in room_1 costs 2.5
+          "room_2": [1, 1, 3.2, 4]  # a cost for each sensor in room_2
+        }
+
+    Args:
+        weights_file: Path to a JSON file with the cost weights.
+
+    Returns:
+        A dictionary with the full_id of the grids as keys and the weights as values.
+    """
+    with open(weights_file) as inf:
+        weights = json.load(inf)
+    assert isinstance(weights, dict), \
+        'Sensor weights must be a dictionary. Got {}.'.format(type(weights).__name__)
+    return weights
+
+
+def redistribute_sensors_by_cost(
+    input_folder, output_folder, grid_count, weights, min_sensor_count=1,
+    extension='pts', grid_info=None
+):
+    """Create new sensor grids folder with sensors distributed by their cost.
+
+    This function works like redistribute_sensors from honeybee-radiance-folder but
+    it splits the sensors into grids of roughly equal estimated cost instead of
+    equal sensor count. The sensors keep their original order and each output grid
+    gets the sensors until its share of the total cost is reached. This makes it
+    possible to restore the results with restore_original_distribution using the
+    ``_redist_info.json`` file that is written to the output folder.
+
+    The same weights will always give the same distribution and so the function can
+    also be used to split other files that are aligned with the sensor grids
+    (eg. csv files).
+
+    Args:
+        input_folder: Input sensor grids folder.
+        output_folder: A new folder to write the newly created files.
+        grid_count: Number of output sensor grids to be created. This number
+            is usually equivalent to the number of processes that will be used to run
+            the simulations in parallel.
+        weights: A dictionary with the full_id of the grids as keys and either a
+            number for the cost of each sensor in the grid or a list with the cost of
+            each sensor as values. The sensors of the grids that are not in the
+            dictionary will have a cost of 1.
+        min_sensor_count: Minimum average number of sensors in each output grid.
+            This value takes precedence over grid_count. (Default: 1).
+        extension: Extension of the files to collect data from. (Default: pts).
+        grid_info: Optional list of dictionaries with grid information. Use this
+            instead of the expected _info.json file in the input_folder.
+
+    Returns:
+        A tuple with three elements
+
+        - grid_count: Number of output sensor grids. This number can be smaller
+          than the input grid_count based on the min_sensor_count or if a few
+          sensors have a very high cost.
+
+        - grid_costs: A list with the estimated cost of each output sensor grid.
+
+        - out_grid_info: Grid information as written to _info.json.
+    """
+    if grid_info is None:
+        info_file = os.path.join(input_folder, '_info.json')
+        assert os.path.isfile(info_file), \
+            'Failed to find the _info.json file. This file should be located inside ' \
+            'the input folder.'
+        with open(info_file) as inf:
+            grid_info = json.load(inf)
+
+    # get the cost of each sensor in each grid
+    grid_weights = []
+    for grid in grid_info:
+        weight = weights.get(grid['full_id'], 1)
+        if isinstance(weight, (list, tuple)):
+            assert len(weight) == grid['count'], 'The number of sensor weights for ' \
+                '"{}" ({}) does not match the sensor count ({}).'.format(
+                    grid['full_id'], len(weight), grid['count'])
+        else:
+            weight = [weight] * grid['count']
+        assert all(w >= 0 for w in weight), \
+            'Sensor weights for "{}" must not be negative.'.format(grid['full_id'])
+        grid_weights.append(weight)
+    total_count = sum(grid['count'] for grid in grid_info)
+    total_cost = sum(sum(weight) for weight in grid_weights)
+    if total_cost == 0:  # all sensors are free. distribute them by count
+        grid_weights = [[1] * grid['count'] for grid in grid_info]
+        total_cost = total_count
+
+    if total_count / grid_count < min_sensor_count:
+        grid_count = int(round(total_count / min_sensor_count)) or 1
+    target_cost = total_cost / grid_count
+
+    if not os.path.isdir(output_folder):
+        os.mkdir(output_folder)
+
+    # write the sensors to the output grid that includes the middle of their cost
+    dist_info, grid_costs, out_counts = [], [], []
+    outf, cost, shard = None, 0, None
+    for grid, weight in zip(grid_info, grid_weights):
+        grid_dist = {'identifier': grid['full_id'], 'dist_info': []}
+        dist_info.append(grid_dist)
+        input_file = os.path.join(
+            input_folder, '%s.%s' % (grid['full_id'], extension))
+        with open(input_file) as inf:
+            for line, w in zip(inf, weight):
+                index = min(int((cost + w / 2) / target_cost), grid_count - 1)
+                cost += w
+                if index != shard:
+                    # start a new output grid. the grids that would have no sensors
+                    # because of a few expensive sensors are skipped
+                    shard = index
+                    if outf is not None:
+                        outf.close()
+                    out_counts.append(0)
+                    grid_costs.append(0)
+                    outf = open(os.path.join(
+                        output_folder, '%d.%s' % (len(out_counts) - 1, extension)),
+                        'w')
+                if not grid_dist['dist_info'] or \
+                        grid_dist['dist_info'][-1]['identifier'] != len(out_counts) - 1:
+                    grid_dist['dist_info'].append(
+                        {'identifier': len(out_counts) - 1, 'st_ln': out_counts[-1]})
+                outf.write(line)
+                grid_dist['dist_info'][-1]['end_ln'] = out_counts[-1]
+                out_counts[-1] += 1
+                grid_costs[-1] += w
+    if outf is not None:
+        outf.close()
+
+    out_grid_info = [
+        {'name': str(i), 'identifier': str(i), 'full_id': str(i), 'group': '',
+         'count': count}
+        for i, count in enumerate(out_counts)
+    ]
+
+    dist_info_file = os.path.join(output_folder, '_redist_info.json')
+    with open(dist_info_file, 'w') as dist_out_file:
+        json.dump(dist_info, dist_out_file, indent=2)
+
+    info_file = os.path.join(output_folder, '_info.json')
+    with open(info_file, 'w') as dist_out_file:
+        json.dump(out_grid_info, dist_out_file, indent=2)
+
+    return len(out_counts), grid_costs, out_grid_info
+
+
+def write_room_sensor_grids(
+    rooms, method='generate_sensor_grid', method_args=None, folder=None,
+    output_file=None, write_json=True, include_mesh=True, workers=1, chunk_size=100
+):
+    """Generate a sensor grid for each room and stream the grids to files.
+
+    The grids are generated by a pool of processes and each grid is written as soon
+    as it is generated. The rooms are sent to the processes in chunks so that the
+    memory in use is bounded by one chunk of rooms and grids. Processes are never
+    used in IronPython, where the rooms are always processed one after another.
+
+    Args:
+        rooms: A list of honeybee Rooms.
+        method: Text for the name of the method of RoomRadianceProperties that is
+            used to generate the sensor grid of each room (eg. generate_sensor_grid,
+            generate_sensor_grid_radial, generate_exterior_face_sensor_grid).
+            (Default: generate_sensor_grid).
+        method_args: An optional dictionary with the keyword arguments of the method.
+        folder: An optional folder to write each sensor grid into its own .json or
+            .pts file. An _info.json with the information of all of the grids will
+            also be written to this folder. If None, the grids will be written to
+            the output_file. (Default: None).
+        output_file: An optional file object to write all of the grids when the
+            folder is None. The JSON array or the Radiance string of the grids are
+            the same as the ones for a list of grids. (Default: None).
+        write_json: Boolean to note whether the grids should be written as JSON or
+            in the format of Radiance .pts files. (Default: True).
+        include_mesh: Boolean to note whether the mesh of the grids should be
+            included in the JSON output. (Default: True).
+        workers: An integer for the number of processes to be used. If 1, all rooms
+            will be processed in the current process. If 0 or None, the number of
+            CPUs will be used. (Default: 1).
+        chunk_size: An integer for the number of rooms that are sent to the
+            processes together. (Default: 100).
+
+    Returns:
+        A list of dictionaries with the information of each generated sensor grid.
+    """
+    method_args = method_args or {}
+    grids_info = []
+    first_grid = True
+    if folder is None and write_json:
+        output_file.write('[')
+    pool = None
+    if workers != 1 and len(rooms) > 1 and sys.platform != 'cli':
+        import multiprocessing
+        workers = min(workers or multiprocessing.cpu_count(), len(rooms))
+        pool = multiprocessing.Pool(processes=workers)
+    try:
+        for st in range(0, len(rooms), chunk_size):
+            chunk = rooms[st:st + chunk_size]
+            if pool is not None:  # only serialize the rooms sent to other processes
+                tasks = [
+                    (room.to_dict(), method, method_args, folder, write_json,
+                     include_mesh)
+                    for room in chunk
+                ]
+                results = pool.imap(_room_dict_sensor_grid, tasks)
+            else:
+                results = (
+                    _room_sensor_grid(room, method, method_args, folder, write_json,
+                                      include_mesh)
+                    for room in chunk
+                )
+            for result in results:
+                if result is None:  # the room did not generate a grid
+                    continue
+                grid_info, content = result
+                grids_info.append(grid_info)
+                if folder is None:
+                    if not first_grid:
+                        output_file.write(', ' if write_json else '\n')
+                    output_file.write(content)
+                first_grid = False
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    if folder is None:
+        if write_json:
+            output_file.write(']')
+    else:
+        info_file = os.path.join(folder, '_info.json')
+        with open(info_file, 'w') as outf:
+            json.dump(grids_info, outf, indent=2)
+    return grids_info
+
+
+def _room_dict_sensor_grid(task):
+    """Generate and write the sensor grid of a room from its dictionary.
+
+    This function must be defined at the top level of the module so that it can be
+    used by other processes.
+    """
+    room_dict, method, method_args, folder, write_json, include_mesh = task
+    return _room_sensor_grid(Room.from_dict(room_dict), method, method_args,
+                             folder, write_json, include_mesh)
+
+
+def _room_sensor_grid(room, method, method_args, folder, write_json, include_mesh):
+    """Generate and write the sensor grid of a room.
+
+    It returns the info dictionary of the grid and the content of the grid if there
+    is no folder to write the grid to.
+    """
+    sensor_grid = getattr(room.properties.radiance, method)(**method_args)
+    if sensor_grid is None:
+        return None
+    if not include_mesh:
+        sensor_grid.mesh = None
+    content = None
+    if folder is not None:
+        if write_json:
+            sensor_grid.to_json(folder)
+        else:
+            sensor_grid.to_file(folder)
+    else:
+        content = json.dumps(sensor_grid.to_dict()) if write_json \
+            else sensor_grid.to_radiance()
+    return sensor_grid.info_dict(), content
+
+
+def restore_sensor_order(input_file, mapping, output_file):
+    """Restore the original sensor order of a result file from a sorted sensor grid.
+
+    Args:
+        input_file: Path to a text file with a row for each sensor of the sorted grid
+            (eg. a .ill or .res file). The file can have a Radiance header, which
+            will be copied to the output file with an updated NROWS.
+        mapping: A list with the index of each original sensor in the sorted grid
+            as returned by the SensorGrid.sort_by_hilbert_curve method.
+        output_file: A file object to write the rows in the original order.
+    """
+    with open(input_file) as inf:
+        first_line = next(inf, '')
+        if first_line[:10] == '#?RADIANCE':
+            output_file.write(first_line)
+            for line in inf:
+                if line[:6] == 'NROWS=':
+                    line = 'NROWS=%d\n' % len(mapping)
+                output_file.write(line)
+                if not line.strip():  # the header ends with an empty line
+                    break
+            rows = list(inf)
+        else:
+            rows = [first_line] + list(inf) if first_line else []
+    for row_i in mapping:
+        output_file.write(rows[row_i])
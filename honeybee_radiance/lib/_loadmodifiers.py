@@ -1,14 +1,42 @@
-"""Load all modifiers from the IDF libraries."""
+"""Load all modifiers from the IDF libraries.
+
+The default modifiers are loaded when this module is imported. The modifiers of
+the user-supplied files are only indexed by identifier when they are first needed
+and each of them is created on its first lookup. The index is cached next to the
+library folder such that it is not parsed again until the files change.
+"""
 from honeybee_radiance.config import folders
-from honeybee_radiance.reader import string_to_dicts
+from honeybee_radiance.reader import file_to_dicts
 from honeybee_radiance.mutil import dict_to_modifier, modifier_class_from_type_string
 
 import os
 import json
+import warnings
+
+
+class _ModifierLibrary(dict):
+    """Dictionary of loaded modifiers that creates the user modifiers on lookup."""
+
+    def __missing__(self, key):
+        try:
+            file_type, mod_dict = _user_modifier_dicts()[key]
+        except TypeError:  # not a hashable identifier
+            raise KeyError(key)
+        try:
+            if file_type == 'json':
+                m_class = modifier_class_from_type_string(mod_dict['type'])
+                mod = m_class.from_dict(mod_dict)
+            else:
+                mod = dict_to_modifier(mod_dict)
+        except (TypeError, KeyError, ValueError):
+            raise KeyError(key)  # not a valid modifier
+        mod.lock()
+        self[key] = mod
+        return mod
 
 
 # empty dictionary to hold loaded modifiers
-_loaded_modifiers = {}
+_loaded_modifiers = _ModifierLibrary()
 
 
 # first load the honeybee defaults
@@ -48,15 +76,14 @@ def load_modifiers_from_folder(modifier_lib_folder):
         f_path = os.path.join(modifier_lib_folder, f)
         if os.path.isfile(f_path):
             if f_path.endswith('.mat') or f_path.endswith('.rad'):
-                with open(f_path) as f:
-                    try:
-                        rad_dicts = string_to_dicts(f.read())
-                        for mod_dict in rad_dicts:
-                            mod = dict_to_modifier(mod_dict)
-                            mod.lock()
-                            user_modifiers[mod.identifier] = mod
-                    except ValueError:
-                        pass  # empty rad file with no modifiers in them
+                try:
+                    rad_dicts = file_to_dicts(f_path)
+                    for mod_dict in rad_dicts:
+                        mod = dict_to_modifier(mod_dict)
+                        mod.lock()
+                        user_modifiers[mod.identifier] = mod
+                except ValueError:
+                    pass  # empty rad file with no modifiers in them
             if f_path.endswith('.json'):
                 with open(f_path) as json_file:
                     data = json.load(json_file)
@@ -68,5 +95,105 @@ def load_modifiers_from_folder(modifier_lib_folder):
     return user_modifiers
 
 
-user_mods = load_modifiers_from_folder(folders.modifier_lib)
-_loaded_modifiers.update(user_mods)
+def index_modifiers_from_folder(modifier_lib_folder):
+    """Get the dictionaries of all modifiers in a modifier standards folder.
+
+    Unlike load_modifiers_from_folder, this function does not create any modifier
+    objects, which makes it much faster for folders with a lot of modifiers.
+
+    Args:
+        modifier_lib_folder: Path to a modifiers sub-folder within a
+            honeybee standards folder.
+
+    Returns:
+        A dictionary with the identifiers of the modifiers as keys and a list
+        with the type of the source file (either rad or json) and the modifier
+        dictionary as values.
+    """
+    mod_dicts = {}
+    for f in os.listdir(modifier_lib_folder):
+        f_path = os.path.join(modifier_lib_folder, f)
+        if os.path.isfile(f_path):
+            if f_path.endswith('.mat') or f_path.endswith('.rad'):
+                try:
+                    for mod_dict in file_to_dicts(f_path):
+                        _add_to_index(mod_dicts, mod_dict, 'rad', f_path)
+                except ValueError:
+                    pass  # empty rad file with no modifiers in them
+            if f_path.endswith('.json'):
+                with open(f_path) as json_file:
+                    data = json.load(json_file)
+                objs = [data] if 'type' in data else \
+                    [data[mod_identifier] for mod_identifier in data]
+                for mod_dict in objs:
+                    if not isinstance(mod_dict, dict) or 'type' not in mod_dict \
+                            or 'identifier' not in mod_dict:
+                        continue  # not a Honeybee Modifier JSON; possibly a comment
+                    _add_to_index(mod_dicts, mod_dict, 'json', f_path)
+    return mod_dicts
+
+
+def _add_to_index(mod_dicts, mod_dict, file_type, file_path):
+    """Add a modifier dictionary to an index unless it clashes with a default."""
+    identifier = mod_dict['identifier']
+    if identifier in _default_mods:
+        warnings.warn('Cannot overwrite default modifier "{}". The modifier in '
+                      '"{}" will be ignored.'.format(identifier, file_path))
+        return
+    mod_dicts[identifier] = [file_type, mod_dict]
+
+
+def cached_folder_index(lib_folder, index_function):
+    """Get the index of a library folder from a cache file if it is up to date.
+
+    The cache is a JSON file next to the library folder with the name, modified
+    time and size of each file in the folder. If these do not match the files in
+    the folder, the index is rebuilt with the index_function and the cache file
+    is rewritten. The index is still returned if the cache file cannot be written.
+
+    Args:
+        lib_folder: Path to a sub-folder within a honeybee standards folder.
+        index_function: A function that takes the lib_folder and returns a
+            JSON-serializable dictionary for the index of the folder.
+    """
+    files = []
+    for f in sorted(os.listdir(lib_folder)):
+        f_path = os.path.join(lib_folder, f)
+        if os.path.isfile(f_path):
+            stat = os.stat(f_path)
+            files.append([f, stat.st_mtime, stat.st_size])
+    folder, folder_name = os.path.split(os.path.normpath(lib_folder))
+    cache_file = os.path.join(folder, '.{}_cache.json'.format(folder_name))
+    try:
+        with open(cache_file) as inf:
+            cache = json.load(inf)
+        if cache['files'] == files:
+            return cache['index']
+    except (IOError, OSError, ValueError, KeyError, TypeError):
+        pass  # the cache does not exist or it is not valid
+    index = index_function(lib_folder)
+    try:
+        with open(cache_file, 'w') as outf:
+            json.dump({'files': files, 'index': index}, outf)
+    except (IOError, OSError):
+        pass  # the standards folder is read-only
+    return index
+
+
+_user_mod_dicts = None  # dictionary of user modifiers that is set on first use
+
+
+def _user_modifier_dicts():
+    """Get the dictionaries of the modifiers in the user library by identifier."""
+    global _user_mod_dicts
+    if _user_mod_dicts is None:
+        _user_mod_dicts = cached_folder_index(
+            folders.modifier_lib, index_modifiers_from_folder)
+    return _user_mod_dicts
+
+
+def _modifier_identifiers():
+    """Get a tuple of the identifiers of all modifiers in the library."""
+    user_ids = (mod_id for mod_id in _user_modifier_dicts()
+                if mod_id not in _loaded_modifiers)
+    return tuple(_loaded_modifiers.keys()) + tuple(user_ids)
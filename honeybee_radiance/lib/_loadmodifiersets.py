@@ -1,15 +1,40 @@
-"""Load all modifier sets from the JSON libraries."""
+"""Load all modifier sets from the JSON libraries.
+
+The default modifier sets are loaded when this module is imported while the
+modifier sets of the user-supplied files are created on their first lookup.
+"""
 from honeybee_radiance.config import folders
 from honeybee_radiance.modifierset import ModifierSet
 
-from ._loadmodifiers import _loaded_modifiers
+from ._loadmodifiers import _loaded_modifiers, cached_folder_index
 
 import os
 import json
+import warnings
+
+
+class _ModifierSetLibrary(dict):
+    """Dictionary of loaded modifier sets that creates the user sets on lookup."""
+
+    def __missing__(self, key):
+        try:
+            mset_dict = _user_modifier_set_dicts()[key]
+        except TypeError:  # not a hashable identifier
+            raise KeyError(key)
+        try:
+            if mset_dict['type'] == 'ModifierSetAbridged':
+                modifierset = ModifierSet.from_dict_abridged(mset_dict, _loaded_modifiers)
+            else:
+                modifierset = ModifierSet.from_dict(mset_dict)
+        except (TypeError, KeyError, ValueError):
+            raise KeyError(key)  # not a valid modifier set
+        modifierset.lock()
+        self[key] = modifierset
+        return modifierset
 
 
 # empty dictionary to hold loaded modifier sets
-_loaded_modifier_sets = {}
+_loaded_modifier_sets = _ModifierSetLibrary()
 
 
 # first load the honeybee defaults
@@ -64,6 +89,56 @@ def load_modifiersets_from_folder(modifierset_lib_folder, loaded_modifiers):
     return mod_sets, misc_mods
 
 
-loaded_m_sets, misc_m = \
-    load_modifiersets_from_folder(folders.modifierset_lib, _loaded_modifiers)
-_loaded_modifier_sets.update(loaded_m_sets)
+def index_modifiersets_from_folder(modifierset_lib_folder):
+    """Get the dictionaries of all ModifierSets in a modifierset standards folder.
+
+    Unlike load_modifiersets_from_folder, this function does not create any
+    ModifierSet objects.
+
+    Args:
+        modifierset_lib_folder: Path to a modifiersets sub-folder within a
+            honeybee standards folder.
+
+    Returns:
+        A dictionary with the identifiers of the ModifierSets as keys and the
+        ModifierSet dictionaries as values.
+    """
+    mset_dicts = {}
+    for f in os.listdir(modifierset_lib_folder):
+        f_path = os.path.join(modifierset_lib_folder, f)
+        if os.path.isfile(f_path) and f_path.endswith('.json'):
+            with open(f_path, 'r') as json_file:
+                mod_set_dict = json.load(json_file)
+            objs = [mod_set_dict] if 'type' in mod_set_dict else \
+                [mod_set_dict[mod_set_id] for mod_set_id in mod_set_dict]
+            for mset_dict in objs:
+                if not isinstance(mset_dict, dict) or 'type' not in mset_dict \
+                        or 'identifier' not in mset_dict:
+                    continue  # not a Honeybee ModifierSet JSON; possibly a comment
+                identifier = mset_dict['identifier']
+                if identifier in _default_mod_sets:
+                    warnings.warn(
+                        'Cannot overwrite default modifier set "{}". The modifier set '
+                        'in "{}" will be ignored.'.format(identifier, f_path))
+                    continue
+                mset_dicts[identifier] = mset_dict
+    return mset_dicts
+
+
+_user_mset_dicts = None  # dictionary of user modifier sets that is set on first use
+
+
+def _user_modifier_set_dicts():
+    """Get the dictionaries of the modifier sets in the user library by identifier."""
+    global _user_mset_dicts
+    if _user_mset_dicts is None:
+        _user_mset_dicts = cached_folder_index(
+            folders.modifierset_lib, index_modifiersets_from_folder)
+    return _user_mset_dicts
+
+
+def _modifier_set_identifiers():
+    """Get a tuple of the identifiers of all modifier sets in the library."""
+    user_ids = (mset_id for mset_id in _user_modifier_set_dicts()
+                if mset_id not in _loaded_modifier_sets)
+    return tuple(_loaded_modifier_sets.keys()) + tuple(user_ids)
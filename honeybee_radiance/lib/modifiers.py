@@ -4,7 +4,9 @@ Default values are generic values to set the initial visible / solar reflectance
 transmittance values in your model. There is no guarantee that these values exactly
 match what you are trying to model.
 """
-from ._loadmodifiers import _loaded_modifiers
+from ._loadmodifiers import _loaded_modifiers, _modifier_identifiers
+
+import sys
 
 
 # establish variables for the default modifiers used across the library
@@ -41,7 +43,15 @@ white_glow = _loaded_modifiers['white_glow']
 
 
 # make lists of modifier identifiers to look up items in the library
-MODIFIERS = tuple(_loaded_modifiers.keys())
+# the user library is only indexed when the list is first accessed
+if sys.version_info >= (3, 7):
+    def __getattr__(name):
+        if name == 'MODIFIERS':
+            return _modifier_identifiers()
+        raise AttributeError(
+            'module {!r} has no attribute {!r}'.format(__name__, name))
+else:  # modules have no __getattr__
+    MODIFIERS = _modifier_identifiers()
 
 
 def modifier_by_identifier(modifier_identifier):
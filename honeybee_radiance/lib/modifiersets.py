@@ -1,7 +1,8 @@
 """Collection of modifier sets."""
 from honeybee_radiance.modifierset import ModifierSet
-from ._loadmodifiersets import _loaded_modifier_sets
+from ._loadmodifiersets import _loaded_modifier_sets, _modifier_set_identifiers
 
+import sys
 import honeybee_radiance.lib.modifiers as _m
 
 
@@ -17,7 +18,15 @@ generic_modifier_set_solar_exterior = \
 
 
 # make lists of modifier sets to look up items in the library
-MODIFIER_SETS = tuple(_loaded_modifier_sets.keys())
+# the user library is only indexed when the list is first accessed
+if sys.version_info >= (3, 7):
+    def __getattr__(name):
+        if name == 'MODIFIER_SETS':
+            return _modifier_set_identifiers()
+        raise AttributeError(
+            'module {!r} has no attribute {!r}'.format(__name__, name))
+else:  # modules have no __getattr__
+    MODIFIER_SETS = _modifier_set_identifiers()
 
 
 def modifier_set_by_identifier(modifier_set_identifier):
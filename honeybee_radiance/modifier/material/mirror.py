@@ -161,6 +161,12 @@ class Mirror(Material):
         return self._dependencies if not self.alternate_material \
             else self._dependencies + [self.alternate_material]
 
+    def _cached(self, key, function):
+        """Get a cached value after syncing the alternate material identifier."""
+        if self._alternate_material is not None:
+            self._values[0] = [self._alternate_material.identifier]
+        return Material._cached(self, key, function)
+
     @classmethod
     def from_single_reflectance(
         cls, identifier, rgb_reflectance=0.0, modifier=None, alternate_material=None,
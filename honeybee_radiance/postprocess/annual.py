@@ -1,8 +1,5 @@
 """Shared functions for post-processing annual results."""
-import json
-import os
-
-from ..writer import _filter_by_pattern
+import sys
 
 
 def generate_default_schedule(weekday=None, weekend=None):
@@ -74,23 +71,45 @@ def filter_schedule_by_hours(sun_up_hours, schedule=None):
     return occ_pattern, sum(schedule), sum(sun_down_sch)
 
 
-def _process_input_folder(folder, filter_pattern):
-    """Process an annual daylight results folder.
+def _run_grid_task(task):
+    """Run a (function, arguments) task for a single sensor grid."""
+    func, args = task
+    return func(*args)
 
-    This returns grids_info and sun-up-hours.
-    """
-    suh_fp = os.path.join(folder, 'sun-up-hours.txt')
-    with open(suh_fp) as suh_file:
-        sun_up_hours = [float(hour) for hour in suh_file.readlines()]
 
-    info = os.path.join(folder, 'grids_info.json')
-    with open(info) as data_f:
-        data = json.load(data_f)
+def map_grids(func, grid_args, workers=1):
+    """Run a function for each sensor grid with an optional pool of processes.
+
+    The results are always returned in the order of the input grid_args. Each
+    process handles one grid at a time so the memory in use is bounded by the number
+    of workers. Processes are never used in IronPython, where this function always
+    runs the grids one after another in the current process.
 
-    # filter grids if there is a filtering pattern
-    grids = _filter_by_pattern(data, filter=filter_pattern)
+    Args:
+        func: A function that is defined at the top level of a module so that it
+            can be used by other processes. This function will be called once for
+            each item in grid_args.
+        grid_args: A list of tuples with the arguments of func for each grid.
+        workers: An integer for the number of processes to be used. If 1, all grids
+            will be processed one after another in the current process. If 0 or
+            None, the number of CPUs will be used. (Default: 1).
 
-    return grids, sun_up_hours
+    Returns:
+        A list with the result of func for each item in grid_args.
+    """
+    tasks = [(func, args) for args in grid_args]
+    if workers == 1 or len(tasks) <= 1 or sys.platform == 'cli':  # no processes
+        return [_run_grid_task(task) for task in tasks]
+
+    import multiprocessing
+    workers = min(workers or multiprocessing.cpu_count(), len(tasks))
+    pool = multiprocessing.Pool(processes=workers)
+    try:
+        results = list(pool.imap(_run_grid_task, tasks, chunksize=1))
+    finally:
+        pool.close()
+        pool.join()
+    return results
 
 
 def remove_header(input_file):
@@ -1,5 +1,8 @@
 """Functions for post-processing annual daylight outputs.
 
+The metrics are computed with the single-pass functions of the annualmetrics module,
+which process blocks of sensors at once if numpy is installed.
+
 Note: These functions will most likely be moved to a separate package in the near future.
 """
 import json
@@ -8,57 +11,21 @@ import os
 from ladybug.datatype.fraction import Fraction
 from ladybug.legend import LegendParameters
 
-from .annual import filter_schedule_by_hours, _process_input_folder
-
-
-def _metrics(values, occ_pattern, threshold, min_t, max_t, total_hours,
-             sun_down_occ_hours):
-    """Calculate annual metrics for a sensor.
+from .annual import filter_schedule_by_hours, map_grids
+from .results import ResultsFolder
+from .annualmetrics import DaylightAutonomy, ContinuousDaylightAutonomy, \
+    UsefulDaylightIlluminance, annual_metrics, annual_metrics_to_files
 
-    Args:
-        values: Hourly illuminance values as numbers.
-        occ_pattern: A list of 0 and 1 values for hours of occupancy.
-        threshold: Threshold value for daylight autonomy. Default: 300.
-        min_t: Minimum threshold for useful daylight illuminance. Default: 100.
-        max_t: Maximum threshold for useful daylight illuminance. Default: 3000.
-        total_hours: An integer for the total number of occupied hours,
-            which can be used to avoid having to sum occ pattern each time.
-        sun_down_occ_hours: An integer for the total number of occupied hours where
-            the sun is down. This is often needed to properly tally all hours that
-            have illuminance below the threshold.
 
-    Returns:
-        Tuple -- daylight autonomy, continuous daylight autonomy, lower useful daylight
-            illuminance, useful daylight illuminance, higher useful daylight illuminance
-    """
-    def _percentage(in_v, occ_hours):
-        return round(100.0 * in_v / occ_hours, 2)
-
-    da = 0
-    cda = 0
-    udi_lower = sun_down_occ_hours
-    udi = 0
-    udi_upper = 0
-
-    for is_occ, value in zip(occ_pattern, values):
-        if is_occ == 0:
-            continue
-        if value > threshold:
-            da += 1
-            cda += 1
-        else:
-            cda += value / threshold
-
-        if min_t > value:
-            udi_lower += 1
-        elif value > max_t:
-            udi_upper += 1
-        else:
-            udi += 1
-
-    return _percentage(da, total_hours), _percentage(cda, total_hours), \
-        _percentage(udi_lower, total_hours), _percentage(udi, total_hours), \
-        _percentage(udi_upper, total_hours)
+def _daylight_metrics(threshold, min_t, max_t):
+    """Get the list of metric objects for the 5 annual daylight metrics."""
+    return [
+        DaylightAutonomy(threshold),
+        ContinuousDaylightAutonomy(threshold),
+        UsefulDaylightIlluminance(min_t, max_t, 'lower'),
+        UsefulDaylightIlluminance(min_t, max_t, 'udi'),
+        UsefulDaylightIlluminance(min_t, max_t, 'upper')
+    ]
 
 
 def metrics(ill_file, occ_pattern, threshold=300, min_t=100, max_t=3000,
@@ -66,9 +33,10 @@ def metrics(ill_file, occ_pattern, threshold=300, min_t=100, max_t=3000,
     """Compute annual metrics for a given result file.
 
     Args:
-        ill_file: Path to an ill file generated by Radiance. The ill file should be
-            tab separated and shot NOT have a header. The results for each sensor point
-            should be available in a row and and each column should be the illuminance
+        ill_file: Path to an ill file generated by Radiance. The ill file can be
+            a headerless ASCII file or a binary float or double matrix with
+            a Radiance header. The results for each sensor point should be
+            available in a row and and each column should be the illuminance
             value for a sun_up_hour. The number of columns should match the number of
             sun up hours.
         occ_pattern: A list of 0 and 1 values for hours of occupancy.
@@ -90,26 +58,10 @@ def metrics(ill_file, occ_pattern, threshold=300, min_t=100, max_t=3000,
         Number of results in each list matches the number of lines in ill input file.
 
     """
-    da = []
-    cda = []
-    udi = []
-    udi_lower = []
-    udi_upper = []
-    total_occupied_hours = sum(occ_pattern) if total_hours is None else total_hours
-    with open(ill_file) as results:
-        for pt_res in results:
-            values = (float(res) for res in pt_res.split())
-            da_v, cda_v, udi_lower_v, udi_v, udi_upper_v = _metrics(
-                values, occ_pattern, threshold, min_t, max_t,
-                total_occupied_hours, sun_down_occ_hours
-            )
-            da.append(da_v)
-            cda.append(cda_v)
-            udi_lower.append(udi_lower_v)
-            udi.append(udi_v)
-            udi_upper.append(udi_upper_v)
-
-    return da, cda, udi_lower, udi, udi_upper
+    return annual_metrics(
+        ill_file, occ_pattern, _daylight_metrics(threshold, min_t, max_t),
+        total_hours, sun_down_occ_hours
+    )
 
 
 def metrics_to_files(ill_file, occ_pattern, output_folder, threshold=300,
@@ -122,9 +74,10 @@ def metrics_to_files(ill_file, occ_pattern, output_folder, threshold=300,
     higher than useful daylight illuminance.
 
     Args:
-        ill_file: Path to an ill file generated by Radiance. The ill file should be
-            tab separated and shot NOT have a header. The results for each sensor point
-            should be available in a row and and each column should be the illuminance
+        ill_file: Path to an ill file generated by Radiance. The ill file can be
+            a headerless ASCII file or a binary float or double matrix with
+            a Radiance header. The results for each sensor point should be
+            available in a row and and each column should be the illuminance
             value for a sun_up_hour. The number of columns should match the number of
             sun up hours.
         occ_pattern: A list of 0 and 1 values for hours of occupancy.
@@ -159,27 +112,10 @@ def metrics_to_files(ill_file, occ_pattern, output_folder, threshold=300,
     udi_upper = \
         os.path.join(output_folder, 'udi_upper', '%s.udi' % grid_name).replace('\\', '/')
 
-    for file_path in [da, cda, udi, udi_upper, udi_lower]:
-        folder = os.path.dirname(file_path)
-        if not os.path.isdir(folder):
-            os.makedirs(folder)
-
-    total_occupied_hours = sum(occ_pattern) if total_hours is None else total_hours
-
-    with open(ill_file) as results, open(da, 'w') as daf, open(cda, 'w') as cdaf, \
-            open(udi, 'w') as udif, open(udi_lower, 'w') as udi_lowerf, \
-            open(udi_upper, 'w') as udi_upperf:
-        for pt_res in results:
-            values = (float(res) for res in pt_res.split())
-            dar, cdar, udi_lowerr, udir, udi_upperr = _metrics(
-                values, occ_pattern, threshold, min_t, max_t,
-                total_occupied_hours, sun_down_occ_hours
-            )
-            daf.write(str(dar) + '\n')
-            cdaf.write(str(cdar) + '\n')
-            udi_lowerf.write(str(udi_lowerr) + '\n')
-            udif.write(str(udir) + '\n')
-            udi_upperf.write(str(udi_upperr) + '\n')
+    annual_metrics_to_files(
+        ill_file, occ_pattern, _daylight_metrics(threshold, min_t, max_t),
+        [da, cda, udi_lower, udi, udi_upper], total_hours, sun_down_occ_hours
+    )
 
     return da, cda, udi_lower, udi, udi_upper
 
@@ -216,12 +152,13 @@ def metrics_from_folder(results_folder, schedule=None, threshold=300,
     udi_lower = []
     udi_upper = []
 
-    grids, sun_up_hours = _process_input_folder(results_folder, grids_filter)
+    results = ResultsFolder(results_folder)
+    grids, sun_up_hours = results.filter_grids(grids_filter), results.sun_up_hours
     occ_pattern, total_occ, sun_down_occ_hours = \
         filter_schedule_by_hours(sun_up_hours=sun_up_hours, schedule=schedule)
 
     for grid in grids:
-        ill_file = os.path.join(results_folder, '%s.ill' % grid['full_id'])
+        ill_file = results.grid_file(grid['full_id'])
         da_r, cda_r, udi_lower_r, udi_r, udi_upper_r = \
             metrics(ill_file, occ_pattern, threshold, min_t, max_t,
                     total_occ, sun_down_occ_hours)
@@ -237,7 +174,7 @@ def metrics_from_folder(results_folder, schedule=None, threshold=300,
 # TODO - support a list of schedules/schedule folder to match the input grids
 def metrics_to_folder(
     results_folder, schedule=None, threshold=300, min_t=100, max_t=3000,
-    grids_filter='*', sub_folder='metrics'
+    grids_filter='*', sub_folder='metrics', workers=1
 ):
     """Compute annual metrics in a folder and write them in a subfolder.
 
@@ -255,12 +192,16 @@ def metrics_to_folder(
             processed.
         sub_folder: An optional relative path for subfolder to copy results files.
             Default: metrics
+        workers: An integer for the number of processes that will be used to
+            process the grids in parallel. If 0 or None, the number of CPUs will
+            be used. (Default: 1).
 
     Returns:
         str -- Path to results folder.
 
     """
-    grids, sun_up_hours = _process_input_folder(results_folder, grids_filter)
+    results = ResultsFolder(results_folder)
+    grids, sun_up_hours = results.filter_grids(grids_filter), results.sun_up_hours
     occ_pattern, total_occ, sun_down_occ_hours = \
         filter_schedule_by_hours(sun_up_hours=sun_up_hours, schedule=schedule)
 
@@ -268,12 +209,13 @@ def metrics_to_folder(
     if not os.path.isdir(metrics_folder):
         os.makedirs(metrics_folder)
 
-    for grid in grids:
-        ill_file = os.path.join(results_folder, '%s.ill' % grid['full_id'])
-        metrics_to_files(
-            ill_file, occ_pattern, metrics_folder, threshold, min_t,
-            max_t, grid['full_id'], total_occ, sun_down_occ_hours
-        )
+    grid_args = [
+        (results.grid_file(grid['full_id']), occ_pattern,
+         metrics_folder, threshold, min_t, max_t, grid['full_id'], total_occ,
+         sun_down_occ_hours)
+        for grid in grids
+    ]
+    map_grids(metrics_to_files, grid_args, workers)
 
     # copy info.json to all results folders
     for folder_name in ['da', 'cda', 'udi_lower', 'udi', 'udi_upper']:
@@ -5,7 +5,9 @@ Note: These functions will most likely be moved to a separate package in the nea
 import json
 import os
 
-from .annual import filter_schedule_by_hours, _process_input_folder
+from .annual import filter_schedule_by_hours, map_grids
+from .results import ResultsFolder
+from .annualmetrics import GlareAutonomy, annual_metrics, annual_metrics_to_files
 
 
 def glare_autonomy_to_file(dgp_file, occ_pattern, output_folder, glare_threshold=0.4,
@@ -15,9 +17,10 @@ def glare_autonomy_to_file(dgp_file, occ_pattern, output_folder, glare_threshold
     This function generates 1 file for glare autonomy.
 
     Args:
-        dgp_file: Path to an dgp file generated by Radiance. The dgp file should be
-            tab separated and shot NOT have a header. The results for each sensor point
-            should be available in a row and and each column should be the daylight
+        dgp_file: Path to an dgp file generated by Radiance. The dgp file can be
+            a headerless ASCII file or a binary float or double matrix with
+            a Radiance header. The results for each sensor point should be
+            available in a row and and each column should be the daylight
             glare probability value for a sun_up_hour. The number of columns should
             match the number of sun up hours.
         occ_pattern: A list of 0 and 1 values for hours of occupancy.
@@ -42,15 +45,8 @@ def glare_autonomy_to_file(dgp_file, occ_pattern, output_folder, glare_threshold
     grid_name = grid_name or os.path.split(dgp_file)[-1][-4:]
     ga = os.path.join(output_folder, 'ga', '%s.ga' % grid_name).replace('\\', '/')
 
-    folder = os.path.dirname(ga)
-    if not os.path.isdir(folder):
-        os.makedirs(folder)
-
-    with open(dgp_file) as results, open(ga, 'w') as gaf:
-        for pt_res in results:
-            values = (float(res) for res in pt_res.split())
-            gar = _glare_autonomy(values, occ_pattern, glare_threshold, total_hours)
-            gaf.write(str(gar) + '\n')
+    annual_metrics_to_files(
+        dgp_file, occ_pattern, [GlareAutonomy(glare_threshold)], [ga], total_hours)
 
     return ga
 
@@ -59,9 +55,10 @@ def glare_autonomy(dgp_file, occ_pattern, glare_threshold=0.4, total_hours=None)
     """Compute glare autonomy for a given result file.
 
     Args:
-        dgp_file: Path to a dgp file generated by Radiance. The dgp file should be
-            tab separated and shot NOT have a header. The results for each sensor point
-            should be available in a row and and each column should be the DGP value for
+        dgp_file: Path to a dgp file generated by Radiance. The dgp file can be
+            a headerless ASCII file or a binary float or double matrix with
+            a Radiance header. The results for each sensor point should be
+            available in a row and and each column should be the DGP value for
             a sun_up_hour. The number of columns should match the number of sun up hours.
         occ_pattern: A list of 0 and 1 values for hours of occupancy.
         glare_threshold: Threshold DGP level for glare autonomy. Default: 0.4.
@@ -75,17 +72,8 @@ def glare_autonomy(dgp_file, occ_pattern, glare_threshold=0.4, total_hours=None)
         number of lines in dgp input file.
 
     """
-    ga = []
-    total_occupied_hours = sum(occ_pattern) if total_hours is None else total_hours
-    with open(dgp_file) as results:
-        for pt_res in results:
-            values = (float(res) for res in pt_res.split())
-            ga_v = _glare_autonomy(
-                values, occ_pattern, glare_threshold, total_occupied_hours
-            )
-            ga.append(ga_v)
-
-    return ga
+    return annual_metrics(
+        dgp_file, occ_pattern, [GlareAutonomy(glare_threshold)], total_hours)[0]
 
 
 # TODO - support a list of schedules/schedule folder to match the input grids
@@ -111,12 +99,13 @@ def glare_autonomy_from_folder(results_folder, schedule=None, glare_threshold=0.
     """
     ga = []
 
-    grids, sun_up_hours = _process_input_folder(results_folder, grids_filter)
+    results = ResultsFolder(results_folder, 'dgp')
+    grids, sun_up_hours = results.filter_grids(grids_filter), results.sun_up_hours
     occ_pattern, total_occ, sun_down_occ_hours = \
         filter_schedule_by_hours(sun_up_hours=sun_up_hours, schedule=schedule)
 
     for grid in grids:
-        dgp_file = os.path.join(results_folder, '%s.dgp' % grid['full_id'])
+        dgp_file = results.grid_file(grid['full_id'])
         ga_r = glare_autonomy(dgp_file, occ_pattern, glare_threshold, total_occ)
         ga.append(ga_r)
 
@@ -125,7 +114,7 @@ def glare_autonomy_from_folder(results_folder, schedule=None, glare_threshold=0.
 
 def glare_autonomy_to_folder(
     results_folder, schedule=None, glare_threshold=0.4, grids_filter='*',
-    sub_folder='metrics'
+    sub_folder='metrics', workers=1
         ):
     """Compute annual glare autonomy in a folder and write them in a subfolder.
 
@@ -142,12 +131,16 @@ def glare_autonomy_to_folder(
             processed.
         sub_folder: An optional relative path for subfolder to copy results files.
             Default: metrics
+        workers: An integer for the number of processes that will be used to
+            process the grids in parallel. If 0 or None, the number of CPUs will
+            be used. (Default: 1).
 
     Returns:
         str -- Path to results folder.
 
     """
-    grids, sun_up_hours = _process_input_folder(results_folder, grids_filter)
+    results = ResultsFolder(results_folder, 'dgp')
+    grids, sun_up_hours = results.filter_grids(grids_filter), results.sun_up_hours
     occ_pattern, total_occ, sun_down_occ_hours = \
         filter_schedule_by_hours(sun_up_hours=sun_up_hours, schedule=schedule)
 
@@ -155,12 +148,12 @@ def glare_autonomy_to_folder(
     if not os.path.isdir(metrics_folder):
         os.makedirs(metrics_folder)
 
-    for grid in grids:
-        dgp_file = os.path.join(results_folder, '%s.dgp' % grid['full_id'])
-        glare_autonomy_to_file(
-            dgp_file, occ_pattern, metrics_folder, glare_threshold,
-            grid['full_id'], total_occ
-        )
+    grid_args = [
+        (results.grid_file(grid['full_id']), occ_pattern,
+         metrics_folder, glare_threshold, grid['full_id'], total_occ)
+        for grid in grids
+    ]
+    map_grids(glare_autonomy_to_file, grid_args, workers)
 
     # copy info.json to all results folders
     grid_info = os.path.join(metrics_folder, 'ga', 'grids_info.json')
@@ -168,34 +161,3 @@ def glare_autonomy_to_folder(
         json.dump(grids, outf)
 
     return metrics_folder
-
-
-def _glare_autonomy(values, occ_pattern, glare_threshold, total_hours):
-    """Calculate annual glare autonomy for a sensor.
-
-    Args:
-        values: Hourly illuminance values as numbers.
-        occ_pattern: A list of 0 and 1 values for hours of occupancy.
-        glare_threshold: A fractional number for the threshold of DGP above which
-            conditions are considered to induce glare. Default: 0.4.
-        total_hours: An integer for the total number of occupied hours, which can be used
-            to avoid having to sum occ pattern each time.
-
-    Returns:
-        glare autonomy
-    """
-    def _percentage(in_v, occ_hours):
-        return round(100.0 * in_v / occ_hours, 2)
-
-    ga_above = 0
-    # count hours above glare threshold
-    for is_occ, value in zip(occ_pattern, values):
-        if is_occ == 0:
-            continue
-        if value > glare_threshold:
-            ga_above += 1
-
-    # get the number of glare free hours
-    ga = total_hours - ga_above
-
-    return _percentage(ga, total_hours)
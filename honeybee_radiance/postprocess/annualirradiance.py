@@ -3,7 +3,6 @@
 Note: These functions will most likely be moved to a separate package in the near future.
 """
 import os
-import shutil
 import json
 
 from ladybug.wea import Wea
@@ -11,10 +10,13 @@ from ladybug.datatype.energyflux import EnergyFlux
 from ladybug.datatype.energyintensity import EnergyIntensity
 from ladybug.legend import LegendParameters
 
-from .annual import remove_header
+from .annual import map_grids
+from .results import ResultsFolder
+from .matrix import matrix_rows
 
 
-def annual_irradiance_to_folder(folder, wea, timestep=1, sub_folder='metrics'):
+def annual_irradiance_to_folder(
+        folder, wea, timestep=1, sub_folder='metrics', workers=1):
     """Compute irradiance metrics in a folder and write them in a subfolder.
 
     This command generates 3 files for each input grid.
@@ -24,7 +26,8 @@ def annual_irradiance_to_folder(folder, wea, timestep=1, sub_folder='metrics'):
         * cumulative_radiation/{grid-name}.res -- Cumulative Radiation (kWh/m2)
 
     Args:
-        folder: Results folder from an annual irradiance recipe.
+        folder: Results folder from an annual irradiance recipe. The folder should
+            include a grids_info.json and an .ill file for each sensor grid.
         wea: The .wea file that was used in the annual irradiance simulation. This
             will be used to determine the duration of the analysis for computing
             cumulative radiation.
@@ -33,14 +36,17 @@ def annual_irradiance_to_folder(folder, wea, timestep=1, sub_folder='metrics'):
             of the Wea. (Default: 1).
         sub_folder: An optional relative path for subfolder to copy results
             files. (Default: metrics).
+        workers: An integer for the number of processes that will be used to
+            process the grids in parallel. If 0 or None, the number of CPUs will
+            be used. (Default: 1).
 
     Returns:
         str -- Path to results folder.
     """
     # get the time length of the Wea and the list of grids
     wea_len = Wea.count_timesteps(wea) * timestep
-    grids = [g.replace('.ill', '') for g in os.listdir(folder) if g.endswith('.ill')]
-    grid_info = os.path.join(folder, 'grids_info.json')
+    results = ResultsFolder(folder)
+    grids = results.grids_info
 
     # write a record of the timestep into the result folder for result processing
     t_step_f = os.path.join(folder, 'timestep.txt')
@@ -55,34 +61,17 @@ def annual_irradiance_to_folder(folder, wea, timestep=1, sub_folder='metrics'):
         metrics_folders.append(m_path)
         if not os.path.isdir(m_path):
             os.makedirs(m_path)
-        grid_info_copy = os.path.join(m_path, 'grids_info.json')
-        shutil.copyfile(grid_info, grid_info_copy)
+        with open(os.path.join(m_path, 'grids_info.json'), 'w') as outf:
+            json.dump(grids, outf)
 
     # loop through the grids and compute metrics
+    grid_args = []
     for grid in grids:
-        input_matrix = os.path.join(folder, '{}.ill'.format(grid))
-        first_line, input_file = remove_header(input_matrix)
-        avg = os.path.join(metrics_folders[0], '{}.res'.format(grid))
-        pk = os.path.join(metrics_folders[1], '{}.res'.format(grid))
-        cml = os.path.join(metrics_folders[2], '{}.res'.format(grid))
-        with open(avg, 'w') as avg_i, open(pk, 'w') as pk_i, open(cml, 'w') as cml_r:
-            # calculate the values for the first line
-            values = [float(v) for v in first_line.split()]
-            total_val = sum(values)
-            avg_i.write('{}\n'.format(total_val / wea_len))
-            pk_i.write('{}\n'.format(max(values)))
-            cml_r.write('{}\n'.format(total_val / (timestep * 1000)))
-
-            # write rest of the lines
-            for line in input_file:
-                try:
-                    values = [float(v) for v in line.split()]
-                    total_val = sum(values)
-                    pk_i.write('{}\n'.format(max(values)))
-                    avg_i.write('{}\n'.format(total_val / wea_len))
-                    cml_r.write('{}\n'.format(total_val / (timestep * 1000)))
-                except ValueError:
-                    pass  # last line of the file
+        output_files = [os.path.join(m_f, '{}.res'.format(grid['full_id']))
+                        for m_f in metrics_folders]
+        grid_args.append(
+            (results.grid_file(grid['full_id']), output_files, wea_len, timestep))
+    map_grids(_irradiance_metrics_to_files, grid_args, workers)
 
     metric_info_dict = _annual_irradiance_vis_metadata()
     for metric, data in metric_info_dict.items():
@@ -93,6 +82,18 @@ def annual_irradiance_to_folder(folder, wea, timestep=1, sub_folder='metrics'):
     return metrics_folder
 
 
+def _irradiance_metrics_to_files(input_matrix, output_files, wea_len, timestep):
+    """Write the average, peak and cumulative values of a matrix into files."""
+    avg, pk, cml = output_files
+    with open(avg, 'w') as avg_i, open(pk, 'w') as pk_i, open(cml, 'w') as cml_r:
+        for values in matrix_rows(input_matrix):
+            total_val = sum(values)
+            avg_i.write('{}\n'.format(total_val / wea_len))
+            pk_i.write('{}\n'.format(max(values)))
+            cml_r.write('{}\n'.format(total_val / (timestep * 1000)))
+    return output_files
+
+
 def _annual_irradiance_vis_metadata():
     """Return visualization metadata for annual irradiance."""
     cumulative_radiation_lpar = LegendParameters(min=0)
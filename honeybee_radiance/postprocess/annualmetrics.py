@@ -0,0 +1,317 @@
+"""Single-pass computation of threshold-based metrics from annual result matrices.
+
+Any number of metrics can be computed together by passing a list of metric objects
+to the annual_metrics functions. Each row of the input matrix is read and parsed only
+once and the occupied hours of the row are then passed to every metric. For instance,
+the following computes daylight autonomy at three thresholds and useful daylight
+illuminance with a single pass over the .ill file.
+
+.. code-block:: python
+
+    metrics = [
+        DaylightAutonomy(100), DaylightAutonomy(300), DaylightAutonomy(500),
+        UsefulDaylightIlluminance(100, 3000)
+    ]
+    da_100, da_300, da_500, udi = annual_metrics(ill_file, occ_pattern, metrics)
+
+If numpy is installed, the rows are processed in blocks of sensors with masked numpy
+reductions. Otherwise, the values of each sensor are processed in pure Python. Both
+engines produce identical results.
+"""
+from __future__ import division
+import os
+
+from .matrix import matrix_rows, matrix_blocks
+
+try:
+    import numpy as np
+except ImportError:  # numpy is not available (eg. IronPython)
+    np = None
+
+
+def _percentage(in_v, occ_hours):
+    return round(100.0 * in_v / occ_hours, 2)
+
+
+class _AnnualMetric(object):
+    """Base class for metrics computed from the occupied hours of each sensor.
+
+    Metrics are computed in two steps. First, the count method returns the number
+    of occupied hours (or the weighted number of hours) that meet the metric's
+    criteria. Then, this number is converted to a percentage of the total occupied
+    hours.
+    """
+    __slots__ = ()
+
+    def count(self, values, total_hours, sun_down_occ_hours):
+        """Get the number of hours meeting the metric's criteria for one sensor.
+
+        Args:
+            values: A list of numbers for the occupied sun-up hours of a sensor.
+            total_hours: An integer for the total number of occupied hours.
+            sun_down_occ_hours: An integer for the number of occupied hours where
+                the sun is down.
+        """
+        raise NotImplementedError(
+            '{} does not implement count.'.format(self.__class__.__name__))
+
+    def count_block(self, values, total_hours, sun_down_occ_hours):
+        """Get the number of hours meeting the metric's criteria for many sensors.
+
+        Args:
+            values: A 2D numpy array where each row is a sensor and each column
+                is an occupied sun-up hour.
+            total_hours: An integer for the total number of occupied hours.
+            sun_down_occ_hours: An integer for the number of occupied hours where
+                the sun is down.
+
+        Returns:
+            A 1D numpy array with a value for each sensor.
+        """
+        raise NotImplementedError(
+            '{} does not implement count_block.'.format(self.__class__.__name__))
+
+    def __repr__(self):
+        return '{}: [{}]'.format(
+            self.__class__.__name__,
+            ', '.join(str(getattr(self, s)) for s in self.__slots__))
+
+
+class DaylightAutonomy(_AnnualMetric):
+    """Percentage of occupied hours where the value is above a threshold.
+
+    Args:
+        threshold: Threshold value for daylight autonomy. (Default: 300).
+    """
+    __slots__ = ('threshold',)
+
+    def __init__(self, threshold=300):
+        self.threshold = threshold
+
+    def count(self, values, total_hours, sun_down_occ_hours):
+        threshold = self.threshold
+        return sum(1 for v in values if v > threshold)
+
+    def count_block(self, values, total_hours, sun_down_occ_hours):
+        return np.count_nonzero(values > self.threshold, axis=1)
+
+
+class ContinuousDaylightAutonomy(_AnnualMetric):
+    """Continuous daylight autonomy, which gives partial credit below the threshold.
+
+    Args:
+        threshold: Threshold value for continuous daylight autonomy. (Default: 300).
+    """
+    __slots__ = ('threshold',)
+
+    def __init__(self, threshold=300):
+        self.threshold = threshold
+
+    def count(self, values, total_hours, sun_down_occ_hours):
+        threshold = self.threshold
+        cda = 0
+        for v in values:
+            if v > threshold:
+                cda += 1
+            else:
+                cda += v / threshold
+        return cda
+
+    def count_block(self, values, total_hours, sun_down_occ_hours):
+        if values.shape[1] == 0:
+            return np.zeros(values.shape[0])
+        # cumsum adds the hours in the same order as the pure Python engine, which
+        # guarantees identical floating point results before rounding
+        hourly = np.where(values > self.threshold, 1.0, values / self.threshold)
+        return np.cumsum(hourly, axis=1)[:, -1]
+
+
+class UsefulDaylightIlluminance(_AnnualMetric):
+    """Percentage of occupied hours in one of the bands of useful daylight illuminance.
+
+    Args:
+        min_t: Minimum threshold for useful daylight illuminance. (Default: 100).
+        max_t: Maximum threshold for useful daylight illuminance. (Default: 3000).
+        band: Text for the band of useful daylight illuminance to be computed.
+            Choose from the following options. (Default: udi).
+
+            * lower - hours below min_t, including the occupied hours when
+                the sun is down.
+            * udi - hours between min_t and max_t.
+            * upper - hours above max_t.
+    """
+    __slots__ = ('min_t', 'max_t', 'band')
+    BANDS = ('lower', 'udi', 'upper')
+
+    def __init__(self, min_t=100, max_t=3000, band='udi'):
+        assert band in self.BANDS, \
+            'UDI band must be one of {}. Got "{}".'.format(self.BANDS, band)
+        self.min_t = min_t
+        self.max_t = max_t
+        self.band = band
+
+    def count(self, values, total_hours, sun_down_occ_hours):
+        min_t, max_t = self.min_t, self.max_t
+        if self.band == 'lower':
+            return sun_down_occ_hours + sum(1 for v in values if min_t > v)
+        elif self.band == 'upper':
+            return sum(1 for v in values if not min_t > v and v > max_t)
+        return sum(1 for v in values if not min_t > v and not v > max_t)
+
+    def count_block(self, values, total_hours, sun_down_occ_hours):
+        lower = values < self.min_t
+        if self.band == 'lower':
+            return np.count_nonzero(lower, axis=1) + sun_down_occ_hours
+        upper = (values > self.max_t) & ~lower
+        if self.band == 'upper':
+            return np.count_nonzero(upper, axis=1)
+        return np.count_nonzero(~(lower | upper), axis=1)
+
+
+class GlareAutonomy(_AnnualMetric):
+    """Percentage of occupied hours where the DGP is at or below a threshold.
+
+    Args:
+        glare_threshold: A fractional number for the threshold of DGP above which
+            conditions are considered to induce glare. (Default: 0.4).
+    """
+    __slots__ = ('glare_threshold',)
+
+    def __init__(self, glare_threshold=0.4):
+        self.glare_threshold = glare_threshold
+
+    def count(self, values, total_hours, sun_down_occ_hours):
+        glare_threshold = self.glare_threshold
+        return total_hours - sum(1 for v in values if v > glare_threshold)
+
+    def count_block(self, values, total_hours, sun_down_occ_hours):
+        above = np.count_nonzero(values > self.glare_threshold, axis=1)
+        return total_hours - above
+
+
+def annual_metrics_by_sensor(
+        matrix_file, occ_pattern, metrics, total_hours=None, sun_down_occ_hours=0):
+    """Yield the values of several metrics for each sensor with a single file pass.
+
+    Args:
+        matrix_file: Path to a matrix file generated by Radiance (eg. an .ill or
+            a .dgp file). The file can be a headerless ASCII file or a binary float
+            or double matrix with a Radiance header. The results for each sensor
+            should be in a row and each column should be the value for a sun_up_hour.
+        occ_pattern: A list of 0 and 1 values for hours of occupancy.
+        metrics: A list of metric objects (eg. DaylightAutonomy,
+            UsefulDaylightIlluminance) to be computed for each sensor.
+        total_hours: An integer for the total number of occupied hours in the
+            occupancy schedule. If None, it will be assumed that all of the
+            occupied hours are sun-up hours and are already accounted for
+            in the the occ_pattern.
+        sun_down_occ_hours: An integer for the total number of occupied hours where
+            the sun is down.
+
+    Returns:
+        A generator of tuples where each tuple has one value for each metric.
+    """
+    total_hours = sum(occ_pattern) if total_hours is None else total_hours
+    if np is not None:
+        occ_mask = np.array(occ_pattern) != 0
+        for block in matrix_blocks(matrix_file):
+            block = block[:, :occ_mask.size]
+            occ = block[:, occ_mask[:block.shape[1]]]
+            results = [
+                [_percentage(v, total_hours) for v in
+                 metric.count_block(occ, total_hours, sun_down_occ_hours).tolist()]
+                for metric in metrics
+            ]
+            for res in zip(*results):
+                yield res
+    else:
+        for values in matrix_rows(matrix_file):
+            occ = [v for is_occ, v in zip(occ_pattern, values) if is_occ != 0]
+            yield tuple(
+                _percentage(
+                    metric.count(occ, total_hours, sun_down_occ_hours), total_hours)
+                for metric in metrics
+            )
+
+
+def annual_metrics(
+        matrix_file, occ_pattern, metrics, total_hours=None, sun_down_occ_hours=0):
+    """Compute several metrics for a matrix file with a single file pass.
+
+    Args:
+        matrix_file: Path to a matrix file generated by Radiance (eg. an .ill or
+            a .dgp file). The file can be a headerless ASCII file or a binary float
+            or double matrix with a Radiance header. The results for each sensor
+            should be in a row and each column should be the value for a sun_up_hour.
+        occ_pattern: A list of 0 and 1 values for hours of occupancy.
+        metrics: A list of metric objects (eg. DaylightAutonomy,
+            UsefulDaylightIlluminance) to be computed for each sensor.
+        total_hours: An integer for the total number of occupied hours in the
+            occupancy schedule. If None, it will be assumed that all of the
+            occupied hours are sun-up hours and are already accounted for
+            in the the occ_pattern.
+        sun_down_occ_hours: An integer for the total number of occupied hours where
+            the sun is down.
+
+    Returns:
+        A tuple of lists with one list for each input metric. Number of results in
+        each list matches the number of rows in the matrix file.
+    """
+    results = tuple([] for _ in metrics)
+    sensor_results = annual_metrics_by_sensor(
+        matrix_file, occ_pattern, metrics, total_hours, sun_down_occ_hours)
+    for values in sensor_results:
+        for res, value in zip(results, values):
+            res.append(value)
+    return results
+
+
+def annual_metrics_to_files(
+        matrix_file, occ_pattern, metrics, output_files, total_hours=None,
+        sun_down_occ_hours=0):
+    """Compute several metrics for a matrix file and write each of them to a file.
+
+    The matrix file is read only once and the results are written to the output
+    files as each row of the matrix is processed.
+
+    Args:
+        matrix_file: Path to a matrix file generated by Radiance (eg. an .ill or
+            a .dgp file). The file can be a headerless ASCII file or a binary float
+            or double matrix with a Radiance header.
+        occ_pattern: A list of 0 and 1 values for hours of occupancy.
+        metrics: A list of metric objects (eg. DaylightAutonomy,
+            UsefulDaylightIlluminance) to be computed for each sensor.
+        output_files: A list of file paths with one path for each metric. The
+            folders of these files will be created if they do not exist.
+        total_hours: An integer for the total number of occupied hours in the
+            occupancy schedule. If None, it will be assumed that all of the
+            occupied hours are sun-up hours and are already accounted for
+            in the the occ_pattern.
+        sun_down_occ_hours: An integer for the total number of occupied hours where
+            the sun is down.
+
+    Returns:
+        The list of output files.
+    """
+    assert len(metrics) == len(output_files), 'The number of metrics ({}) must ' \
+        'match the number of output files ({}).'.format(len(metrics), len(output_files))
+    for file_path in output_files:
+        folder = os.path.dirname(file_path)
+        if folder and not os.path.isdir(folder):
+            try:
+                os.makedirs(folder)
+            except OSError:  # the folder was created by another process
+                if not os.path.isdir(folder):
+                    raise
+
+    out_files = [open(file_path, 'w') for file_path in output_files]
+    try:
+        sensor_results = annual_metrics_by_sensor(
+            matrix_file, occ_pattern, metrics, total_hours, sun_down_occ_hours)
+        for values in sensor_results:
+            for outf, value in zip(out_files, values):
+                outf.write(str(value) + '\n')
+    finally:
+        for outf in out_files:
+            outf.close()
+    return output_files
@@ -1,12 +1,12 @@
 """Functions for post-processing daylight outputs into electric lighting schedules."""
-import os
-
-from .annual import generate_default_schedule, _process_input_folder
+from .annual import generate_default_schedule, map_grids
+from .results import ResultsFolder
+from .matrix import matrix_rows
 
 
 def daylight_control_schedules(
     results_folder, base_schedule=None, ill_setpoint=300,
-    min_power_in=0.3, min_light_out=0.2, off_at_min=False
+    min_power_in=0.3, min_light_out=0.2, off_at_min=False, workers=1
 ):
     """Generate electric lighting schedules from annual daylight results.
 
@@ -51,6 +51,9 @@ def daylight_control_schedules(
             with the off_at_min input below. (Default: 0.2).
         off_at_min: Boolean to note whether lights should switch off completely when
             they get to the minimum power input. (Default: False).
+        workers: An integer for the number of processes that will be used to
+            process the grids in parallel. If 0 or None, the number of CPUs will
+            be used. (Default: 1).
 
     Returns:
         A tuple with two values.
@@ -66,18 +69,17 @@ def daylight_control_schedules(
         base_schedule = generate_default_schedule()
 
     # get the relevant .ill files
-    grids, sun_up_hours = _process_input_folder(results_folder, '*')
+    results = ResultsFolder(results_folder)
+    grids, sun_up_hours = results.grids_info, results.sun_up_hours
     sun_up_hours = [int(h) for h in sun_up_hours]
 
     # get the dimming fractions for each sensor grid from the .ill files
-    dim_fracts = []
-    for grid_info in grids:
-        ill_file = os.path.join(results_folder, '%s.ill' % grid_info['full_id'])
-        fract_list = _file_to_dimming_fraction(
-            ill_file, sun_up_hours, ill_setpoint, min_power_in,
-            min_light_out, off_at_min
-        )
-        dim_fracts.append(fract_list)
+    grid_args = [
+        (results.grid_file(grid_info['full_id']), sun_up_hours,
+         ill_setpoint, min_power_in, min_light_out, off_at_min)
+        for grid_info in grids
+    ]
+    dim_fracts = map_grids(_file_to_dimming_fraction, grid_args, workers)
 
     # create the schedule by combining the base schedule with the dimming fraction
     schedules, schedule_ids = [], []
@@ -94,11 +96,10 @@ def _file_to_dimming_fraction(ill_file, su_pattern, setpt, m_pow, m_lgt, off_m):
     # get a base schedule of dimming fractions for the sun-up hours
     su_values = [0] * len(su_pattern)
     sensor_count = 0
-    with open(ill_file) as results:
-        for pt_res in results:
-            sensor_count += 1
-            for i, val in enumerate(pt_res.split()):
-                su_values[i] += _dimming_from_ill(float(val), setpt, m_pow, m_lgt, off_m)
+    for pt_res in matrix_rows(ill_file):
+        sensor_count += 1
+        for i, val in enumerate(pt_res):
+            su_values[i] += _dimming_from_ill(val, setpt, m_pow, m_lgt, off_m)
     su_values = [val / sensor_count for val in su_values]
 
     # account for the hours where the sun is not up
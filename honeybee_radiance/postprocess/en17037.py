@@ -2,30 +2,9 @@
 import json
 import os
 
-from .annual import filter_schedule_by_hours, _process_input_folder
-
-
-def _daylight_autonomy(values, occ_pattern, threshold, total_hours):
-    """Calculate annual daylight autonomy for a sensor.
-
-    Args:
-        values: Hourly illuminance values as numbers.
-        occ_pattern: A list of 0 and 1 values for hours of occupancy.
-        threshold: Threshold value for daylight autonomy.
-        total_hours: An integer for the total number of occupied hours,
-            which can be used to avoid having to sum occ pattern each time.
-
-    Returns:
-        daylight autonomy
-    """
-    da = 0
-    for is_occ, value in zip(occ_pattern, values):
-        if is_occ == 0:
-            continue
-        if value > threshold:
-            da += 1
-
-    return round(100.0 * da / total_hours, 2)
+from .annual import filter_schedule_by_hours, map_grids
+from .results import ResultsFolder
+from .annualmetrics import DaylightAutonomy, annual_metrics
 
 
 def en17037_metrics_to_files(
@@ -37,9 +16,10 @@ def en17037_metrics_to_files(
     level of recommendation in EN 17037.
 
     Args:
-        ill_file: Path to an ill file generated by Radiance. The ill file should be
-            tab separated and shot NOT have a header. The results for each sensor point
-            should be available in a row and and each column should be the illuminance
+        ill_file: Path to an ill file generated by Radiance. The ill file can be
+            a headerless ASCII file or a binary float or double matrix with
+            a Radiance header. The results for each sensor point should be
+            available in a row and and each column should be the illuminance
             value for a sun_up_hour. The number of columns should match the number of
             sun up hours.
         occ_pattern: A list of 0 and 1 values for hours of occupancy.
@@ -53,7 +33,11 @@ def en17037_metrics_to_files(
             in the the occ_pattern.
     """
     if not os.path.isdir(output_folder):
-        os.makedirs(output_folder)
+        try:
+            os.makedirs(output_folder)
+        except OSError:  # the folder was created by another process
+            if not os.path.isdir(output_folder):
+                raise
 
     recommendations = {
         'minimum_illuminance': {
@@ -69,52 +53,54 @@ def en17037_metrics_to_files(
     }
 
     grid_name = grid_name or os.path.split(ill_file)[-1][-4:]
-    da_folders = []
 
+    # collect the daylight autonomy metrics for all of the levels to compute them
+    # together with a single pass over the ill file
+    levels, da_metrics, da_files, sda_files = [], [], [], []
     for target_type, thresholds in recommendations.items():
         type_folder = os.path.join(output_folder, target_type)
-        if not os.path.isdir(type_folder):
-            os.makedirs(type_folder)
-
         for level, threshold in thresholds.items():
             level_folder = os.path.join(type_folder, level)
-            if not os.path.isdir(level_folder):
-                os.makedirs(level_folder)
-
             da_file = os.path.join(
                 level_folder, 'da', '%s.da' % grid_name).replace('\\', '/')
-            folder = os.path.dirname(da_file)
-            if not os.path.isdir(folder):
-                os.makedirs(folder)
             sda_file = os.path.join(
                 level_folder, 'sda', '%s.sda' % grid_name).replace('\\', '/')
-            folder = os.path.dirname(sda_file)
-            if not os.path.isdir(folder):
-                os.makedirs(folder)
+            for file_path in (da_file, sda_file):
+                folder = os.path.dirname(file_path)
+                if not os.path.isdir(folder):
+                    try:
+                        os.makedirs(folder)
+                    except OSError:  # the folder was created by another process
+                        if not os.path.isdir(folder):
+                            raise
+            levels.append((target_type, level_folder))
+            da_metrics.append(DaylightAutonomy(threshold))
+            da_files.append(da_file)
+            sda_files.append(sda_file)
+
+    da_results = annual_metrics(ill_file, occ_pattern, da_metrics, total_hours)
 
-            da = []
-            with open(ill_file) as results, open(da_file, 'w') as daf:
-                for pt_res in results:
-                    values = (float(res) for res in pt_res.split())
-                    dar = _daylight_autonomy(values, occ_pattern, threshold, total_hours)
-                    daf.write(str(dar) + '\n')
-                    da.append(dar)
+    da_folders = []
+    for (target_type, level_folder), da, da_file, sda_file in \
+            zip(levels, da_results, da_files, sda_files):
+        with open(da_file, 'w') as daf:
+            daf.write(''.join(str(dar) + '\n' for dar in da))
 
-            space_target = 50 if target_type == 'target_illuminance' else 95
-            pass_fail = [int(val > space_target) for val in da]
+        space_target = 50 if target_type == 'target_illuminance' else 95
+        pass_fail = [int(val > space_target) for val in da]
 
-            sda = sum(pass_fail) / len(pass_fail)
-            with open(sda_file, 'w') as sdaf:
-                sdaf.write(str(sda))
+        sda = sum(pass_fail) / len(pass_fail)
+        with open(sda_file, 'w') as sdaf:
+            sdaf.write(str(sda))
 
-            da_folders.append(os.path.join(level_folder, 'da'))
+        da_folders.append(os.path.join(level_folder, 'da'))
 
     return da_folders
 
 
 # TODO - support a list of schedules/schedule folder to match the input grids
 def en17037_to_folder(
-    results_folder, schedule, grids_filter='*', sub_folder='metrics'
+    results_folder, schedule, grids_filter='*', sub_folder='metrics', workers=1
         ):
     """Compute annual EN 17037 metrics in a folder and write them in a subfolder.
 
@@ -130,12 +116,16 @@ def en17037_to_folder(
             processed.
         sub_folder: An optional relative path for subfolder to copy results files.
             Default: metrics
+        workers: An integer for the number of processes that will be used to
+            process the grids in parallel. If 0 or None, the number of CPUs will
+            be used. (Default: 1).
 
     Returns:
         str -- Path to results folder.
 
     """
-    grids, sun_up_hours = _process_input_folder(results_folder, grids_filter)
+    results = ResultsFolder(results_folder)
+    grids, sun_up_hours = results.filter_grids(grids_filter), results.sun_up_hours
     occ_pattern, total_occ, sun_down_occ_hours = \
         filter_schedule_by_hours(sun_up_hours=sun_up_hours, schedule=schedule)
 
@@ -149,15 +139,16 @@ def en17037_to_folder(
     if not os.path.isdir(metrics_folder):
         os.makedirs(metrics_folder)
 
-    for grid in grids:
-        ill_file = os.path.join(results_folder, '%s.ill' % grid['full_id'])
-        da_folders = en17037_metrics_to_files(
-            ill_file, occ_pattern, metrics_folder, grid['full_id'], total_occ
-        )
+    grid_args = [
+        (results.grid_file(grid['full_id']), occ_pattern,
+         metrics_folder, grid['full_id'], total_occ)
+        for grid in grids
+    ]
+    da_folders = map_grids(en17037_metrics_to_files, grid_args, workers)
 
     # copy info.json to all results folders
-    for folder_name in da_folders:
-        grid_info = os.path.join(metrics_folder, folder_name, 'grids_info.json')
+    for folder_name in (da_folders[0] if da_folders else []):
+        grid_info = os.path.join(folder_name, 'grids_info.json')
         with open(grid_info, 'w') as outf:
             json.dump(grids, outf, indent=2)
 
@@ -7,15 +7,7 @@ import math
 from honeybee.model import Model
 from honeybee.units import conversion_factor_to_meters
 from ..writer import _filter_by_pattern
-
-
-def _process_input_folder(folder, filter_pattern):
-    """Process and input annual daylight results folder."""
-    info = os.path.join(folder, 'grids_info.json')
-    with open(info) as data_f:
-        data = json.load(data_f)
-    grids = _filter_by_pattern(data, filter=filter_pattern)
-    return grids
+from .results import ResultsFolder
 
 
 def ill_pass_fail_from_folder(
@@ -37,9 +29,9 @@ def ill_pass_fail_from_folder(
         criteria.
     """
     pass_fail = []
-    grids = _process_input_folder(results_folder, grids_filter)
-    for grid in grids:
-        res_file = os.path.join(results_folder, '%s.res' % grid['full_id'])
+    results = ResultsFolder(results_folder, 'res')
+    for grid in results.filter_grids(grids_filter):
+        res_file = results.grid_file(grid['full_id'])
         with open(res_file) as inf:
             values = [float(line) for line in inf]
         grid_pf = []
@@ -0,0 +1,321 @@
+"""Functions for reading Radiance matrix files in ASCII or binary format.
+
+Radiance matrix files can be headerless ASCII files (like the .ill files written by
+the annual recipes) or they can start with a Radiance header that notes the format
+of the data that follows it. For instance, the header of a binary matrix written
+by rcontrib or rmtxop with the -ff option looks like the following:
+
+.. code-block:: shell
+
+    #?RADIANCE
+    rmtxop -ff -c 47.4 119.9 11.6 ...
+    NROWS=416
+    NCOLS=4393
+    NCOMP=1
+    FORMAT=float
+
+Matrices of 0 and 1 values (eg. sunlight hours) can also be written in a bit-packed
+format where each value is stored as a single bit. The header of these files uses
+FORMAT=bitpacked and each row is padded with zeros to a whole number of bytes.
+The bits of a row can be counted without unpacking them using count_bits.
+
+The binary payload of float, double and bit-packed matrices is memory-mapped and
+returned without any string parsing. If numpy is available, rows can be read in
+blocks as 2D arrays with the matrix_blocks function. Otherwise, matrix_rows returns
+the values of each row as a list of numbers.
+"""
+import array
+import binascii
+import mmap
+import sys
+from itertools import islice
+
+try:
+    import numpy as np
+except ImportError:  # numpy is not available (eg. IronPython)
+    np = None
+
+# number of rows that are loaded into memory at once by matrix_blocks
+BLOCK_SIZE = 1000
+
+# array typecodes and byte sizes for the binary formats of Radiance matrices
+BINARY_FORMATS = {'float': ('f', 4), 'double': ('d', 8)}
+
+# format of matrices where each value is a single bit
+PACKED_FORMAT = 'bitpacked'
+
+# translation table from each byte to the number of bits that are set in it
+_POPCOUNT_TABLE = bytes(bytearray(bin(i).count('1') for i in range(256)))
+
+
+def matrix_header(matrix_file):
+    """Get the information from the header of a Radiance matrix file.
+
+    Args:
+        matrix_file: Path to a Radiance matrix file with or without a header.
+
+    Returns:
+        A dictionary with the following keys.
+
+        -   format: Text for the format of the matrix data, which will be one of
+            the following: ascii, float, double, bitpacked. Headerless files are
+            always assumed to be ascii.
+
+        -   nrows: An integer for the number of rows in the matrix. This will be None
+            if the number of rows is not specified in the header.
+
+        -   ncols: An integer for the number of columns in the matrix. This will be
+            None if the number of columns is not specified in the header.
+
+        -   ncomp: An integer for the number of components for each value.
+
+        -   big_endian: A boolean to note whether the binary values are big endian.
+
+        -   offset: An integer for the number of bytes before the matrix data starts.
+    """
+    header = {
+        'format': 'ascii', 'nrows': None, 'ncols': None, 'ncomp': 1,
+        'big_endian': sys.byteorder == 'big', 'offset': 0
+    }
+    with open(matrix_file, 'rb') as inf:
+        first_line = inf.readline()
+        if first_line[:10] != b'#?RADIANCE':
+            return header
+        offset = len(first_line)
+        for line in inf:
+            offset += len(line)
+            line = line.strip()
+            if not line:  # end of the header
+                break
+            key, _, value = line.decode('ascii', 'ignore').partition('=')
+            if key == 'FORMAT':
+                header['format'] = value.strip()
+            elif key == 'NROWS':
+                header['nrows'] = int(value)
+            elif key == 'NCOLS':
+                header['ncols'] = int(value)
+            elif key == 'NCOMP':
+                header['ncomp'] = int(value)
+            elif key == 'BIGENDIAN':
+                header['big_endian'] = value.strip() == '1'
+    header['offset'] = offset
+
+    if header['format'] in BINARY_FORMATS or header['format'] == PACKED_FORMAT:
+        if header['ncols'] is None:
+            raise ValueError(
+                'Binary matrix "{}" has no NCOLS in its header.'.format(matrix_file))
+        if header['nrows'] is None:  # infer the number of rows from the file size
+            row_size = _row_size(header)
+            with open(matrix_file, 'rb') as inf:
+                inf.seek(0, 2)
+                header['nrows'] = (inf.tell() - offset) // row_size \
+                    if row_size else 0
+    elif header['format'] != 'ascii':
+        raise ValueError(
+            'Unsupported matrix format "{}" in "{}". Supported formats are ascii, '
+            'float, double and bitpacked.'.format(header['format'], matrix_file))
+    return header
+
+
+def _row_size(header):
+    """Get the number of bytes in each row of a binary matrix."""
+    if header['format'] == PACKED_FORMAT:
+        return (header['ncols'] * header['ncomp'] + 7) // 8
+    _, size = BINARY_FORMATS[header['format']]
+    return header['ncols'] * header['ncomp'] * size
+
+
+def packed_header(ncols, nrows=None):
+    """Get the Radiance header of a bit-packed matrix as bytes.
+
+    Args:
+        ncols: An integer for the number of columns in the matrix.
+        nrows: An optional integer for the number of rows in the matrix. If None,
+            the number of rows will be inferred from the size of the file when
+            it is read. (Default: None).
+    """
+    header = ['#?RADIANCE']
+    if nrows is not None:
+        header.append('NROWS=%d' % nrows)
+    header.extend(('NCOLS=%d' % ncols, 'NCOMP=1', 'FORMAT=%s' % PACKED_FORMAT))
+    return ('\n'.join(header) + '\n\n').encode('ascii')
+
+
+def pack_row(values):
+    """Pack a row of 0 and 1 values into bytes with one bit for each value.
+
+    The first value is the most significant bit of the first byte and the row is
+    padded with zeros to a whole number of bytes.
+
+    Args:
+        values: An iterable of values that will be evaluated as booleans.
+    """
+    bits = ''.join('1' if v else '0' for v in values)
+    if not bits:
+        return b''
+    byte_count = (len(bits) + 7) // 8
+    bits += '0' * (byte_count * 8 - len(bits))
+    return binascii.unhexlify('%0*x' % (byte_count * 2, int(bits, 2)))
+
+
+def unpack_row(data, ncols):
+    """Unpack the bytes of a bit-packed row into a list of 0 and 1 values.
+
+    Args:
+        data: Bytes for a row that was packed with pack_row.
+        ncols: An integer for the number of values in the row.
+    """
+    if not ncols:
+        return []
+    bits = bin(int(binascii.hexlify(data), 16))[2:].zfill(len(data) * 8)
+    return [1 if b == '1' else 0 for b in bits[:ncols]]
+
+
+def count_bits(data):
+    """Get the number of bits that are set in the bytes of a bit-packed row."""
+    return sum(bytearray(data.translate(_POPCOUNT_TABLE)))
+
+
+def packed_rows(matrix_file):
+    """Yield the bytes of each row in a bit-packed Radiance matrix file.
+
+    Args:
+        matrix_file: Path to a Radiance matrix file in bitpacked format.
+
+    Returns:
+        A generator of bytes for each row of the matrix. Use count_bits to count
+        the values that are 1 and unpack_row to get the values of the row.
+    """
+    header = matrix_header(matrix_file)
+    if header['format'] != PACKED_FORMAT:
+        raise ValueError('Matrix "{}" is not in {} format.'.format(
+            matrix_file, PACKED_FORMAT))
+    if header['nrows'] == 0:
+        return
+    row_size = _row_size(header)
+    with open(matrix_file, 'rb') as inf:
+        data = mmap.mmap(inf.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            start = header['offset']
+            for _ in range(header['nrows']):
+                yield data[start:start + row_size]
+                start += row_size
+        finally:
+            data.close()
+
+
+def _ascii_lines(matrix_file, header):
+    """Yield the non-empty data lines of an ASCII matrix file."""
+    with open(matrix_file, 'rb') as inf:
+        inf.seek(header['offset'])
+        for line in inf:
+            if line.strip():
+                yield line
+
+
+def matrix_rows(matrix_file):
+    """Yield the values of each row in a Radiance matrix file.
+
+    Binary matrices are memory-mapped and each row is converted into numbers
+    without any string parsing.
+
+    Args:
+        matrix_file: Path to a Radiance matrix file in ASCII, float, double or
+            bitpacked format. Files without a header are assumed to be ASCII.
+
+    Returns:
+        A generator of lists where each list has the values for one row of the matrix.
+        If the matrix has more than one component (eg. RGB), the components of each
+        column will follow one another.
+    """
+    header = matrix_header(matrix_file)
+    if header['format'] == 'ascii':
+        for line in _ascii_lines(matrix_file, header):
+            yield [float(v) for v in line.split()]
+        return
+    if header['format'] == PACKED_FORMAT:
+        ncols = header['ncols'] * header['ncomp']
+        for row in packed_rows(matrix_file):
+            yield [float(v) for v in unpack_row(row, ncols)]
+        return
+
+    typecode, _ = BINARY_FORMATS[header['format']]
+    row_size = _row_size(header)
+    swap = header['big_endian'] != (sys.byteorder == 'big')
+    if header['nrows'] == 0:
+        return
+    with open(matrix_file, 'rb') as inf:
+        data = mmap.mmap(inf.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            start = header['offset']
+            for _ in range(header['nrows']):
+                row = array.array(typecode)
+                try:
+                    row.frombytes(data[start:start + row_size])
+                except AttributeError:  # python 2
+                    row.fromstring(data[start:start + row_size])
+                if swap:
+                    row.byteswap()
+                start += row_size
+                yield row.tolist()
+        finally:
+            data.close()
+
+
+def matrix_blocks(matrix_file, block_size=BLOCK_SIZE):
+    """Yield the rows of a Radiance matrix file as 2D numpy arrays.
+
+    This function requires numpy. Binary matrices are memory-mapped and each
+    block is a copy of the mapped rows as 64-bit floats. ASCII matrices are parsed
+    one block of lines at a time.
+
+    Args:
+        matrix_file: Path to a Radiance matrix file in ASCII, float, double or
+            bitpacked format. Files without a header are assumed to be ASCII.
+        block_size: An integer for the maximum number of rows in each block.
+            (Default: 1000).
+
+    Returns:
+        A generator of 2D numpy arrays where each row is a row of the matrix and
+        each column is a column of the matrix. If the matrix has more than one
+        component (eg. RGB), the components of each column will follow one another.
+    """
+    assert np is not None, 'numpy must be installed to read a matrix in blocks.'
+    header = matrix_header(matrix_file)
+    if header['format'] == 'ascii':
+        lines = _ascii_lines(matrix_file, header)
+        while True:
+            block = list(islice(lines, block_size))
+            if not block:
+                break
+            values = np.fromstring(b''.join(block).decode('ascii'), sep=' ')
+            yield values.reshape(len(block), -1)
+        return
+
+    if header['nrows'] == 0:
+        return
+    ncols = header['ncols'] * header['ncomp']
+    if header['format'] == PACKED_FORMAT:
+        data = np.memmap(
+            matrix_file, dtype=np.uint8, mode='r', offset=header['offset'],
+            shape=(header['nrows'], _row_size(header))
+        )
+        try:
+            for st in range(0, header['nrows'], block_size):
+                bits = np.unpackbits(data[st:st + block_size], axis=1)
+                yield bits[:, :ncols].astype(np.float64)
+        finally:
+            del data
+        return
+
+    typecode, _ = BINARY_FORMATS[header['format']]
+    dtype = np.dtype(typecode).newbyteorder('>' if header['big_endian'] else '<')
+    data = np.memmap(
+        matrix_file, dtype=dtype, mode='r', offset=header['offset'],
+        shape=(header['nrows'], ncols)
+    )
+    try:
+        for st in range(0, header['nrows'], block_size):
+            yield data[st:st + block_size].astype(np.float64)
+    finally:
+        del data
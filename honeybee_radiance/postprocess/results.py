@@ -0,0 +1,221 @@
+"""Lazy access to the results folder of a simulation with many sensor grids."""
+import json
+import os
+from collections import OrderedDict
+
+from ..writer import _filter_by_pattern
+from .matrix import matrix_header, matrix_rows, matrix_blocks, BINARY_FORMATS
+
+try:
+    import numpy as np
+except ImportError:  # numpy is not available (eg. IronPython)
+    np = None
+
+
+class ResultsFolder(object):
+    """Lazy accessor for a results folder with a result file for each sensor grid.
+
+    The grids_info.json and sun-up-hours.txt files of the folder are only read once
+    and the results of each grid are only loaded when they are requested. Loaded
+    grids are kept in a least-recently-used cache that is limited by a memory budget.
+
+    If numpy is available, the results of each grid are returned as a 2D numpy array
+    with a row for each sensor and a column for each sun-up hour. Binary float and
+    double matrices are memory-mapped instead of being loaded into memory. If numpy
+    is not available, the results are returned as a list of lists.
+
+    Args:
+        folder: Path to a results folder. The folder should include a
+            grids_info.json and a result file for each sensor grid. It can also
+            include a sun-up-hours.txt for annual studies.
+        extension: Text for the extension of the result files. (Default: ill).
+        cache_size: A number for the maximum memory in megabytes for the results
+            that are kept in the cache. The most recently used grid is always kept
+            even if it is larger than the budget. (Default: 1024).
+
+    Properties:
+        * folder
+        * extension
+        * cache_size
+        * grids_info
+        * grid_ids
+        * sun_up_hours
+        * cache_usage
+    """
+    __slots__ = (
+        '_folder', '_extension', '_cache_size', '_grids_info', '_sun_up_hours',
+        '_cache', '_cache_usage')
+
+    def __init__(self, folder, extension='ill', cache_size=1024):
+        assert os.path.isdir(folder), \
+            'Results folder "{}" does not exist.'.format(folder)
+        self._folder = folder
+        self._extension = extension
+        self._cache_size = cache_size
+        self._grids_info = None
+        self._sun_up_hours = None
+        self._cache = OrderedDict()
+        self._cache_usage = 0
+
+    @property
+    def folder(self):
+        """Get the path to the results folder."""
+        return self._folder
+
+    @property
+    def extension(self):
+        """Get the extension of the result files."""
+        return self._extension
+
+    @property
+    def cache_size(self):
+        """Get or set the maximum memory in megabytes for the cached grid results."""
+        return self._cache_size
+
+    @cache_size.setter
+    def cache_size(self, value):
+        self._cache_size = value
+        self._trim_cache()
+
+    @property
+    def grids_info(self):
+        """Get a list of dictionaries for the grids in the grids_info.json."""
+        if self._grids_info is None:
+            info = os.path.join(self._folder, 'grids_info.json')
+            with open(info) as data_f:
+                self._grids_info = json.load(data_f)
+        return self._grids_info
+
+    @property
+    def grid_ids(self):
+        """Get a list with the full_id of each grid in the folder."""
+        return [g['full_id'] for g in self.grids_info]
+
+    @property
+    def sun_up_hours(self):
+        """Get a list of numbers for the sun-up hours in the sun-up-hours.txt."""
+        if self._sun_up_hours is None:
+            suh_fp = os.path.join(self._folder, 'sun-up-hours.txt')
+            with open(suh_fp) as suh_file:
+                self._sun_up_hours = [float(hour) for hour in suh_file]
+        return self._sun_up_hours
+
+    @property
+    def cache_usage(self):
+        """Get the memory in megabytes that is used by the cached grid results."""
+        return self._cache_usage / (1024.0 ** 2)
+
+    def filter_grids(self, grids_filter='*'):
+        """Get a list of grids_info dictionaries that match a pattern.
+
+        Args:
+            grids_filter: A pattern to filter the grids. By default all the grids
+                will be returned.
+        """
+        return _filter_by_pattern(self.grids_info, filter=grids_filter)
+
+    def grid_file(self, full_id):
+        """Get the path to the result file of a grid.
+
+        Args:
+            full_id: Text for the full_id of a grid in the grids_info.json.
+        """
+        return os.path.join(self._folder, '%s.%s' % (full_id, self._extension))
+
+    def grid(self, full_id):
+        """Get the results of a grid with a row for each sensor.
+
+        Args:
+            full_id: Text for the full_id of a grid in the grids_info.json.
+
+        Returns:
+            A 2D numpy array if numpy is available. Otherwise, a list of lists.
+        """
+        try:
+            values = self._cache.pop(full_id)
+        except KeyError:
+            values = self._load_grid(full_id)
+            self._cache_usage += self._size(values)
+        self._cache[full_id] = values  # move the grid to the end of the cache
+        self._trim_cache()
+        return values
+
+    def values(self, full_id, sensors=None, hours=None):
+        """Get the results of a grid for a subset of its sensors and hours.
+
+        Args:
+            full_id: Text for the full_id of a grid in the grids_info.json.
+            sensors: An optional slice or list of integers for the indices of the
+                sensors. If None, all sensors will be returned. (Default: None).
+            hours: An optional slice or list of integers for the indices of the
+                columns (eg. the indices of the sun-up hours). If None, all of the
+                columns will be returned. (Default: None).
+
+        Returns:
+            A 2D numpy array if numpy is available. Otherwise, a list of lists.
+        """
+        values = self.grid(full_id)
+        if np is not None:
+            if sensors is not None:
+                values = values[sensors]
+            if hours is not None:
+                values = values[:, hours]
+            return values
+
+        if sensors is not None:
+            values = values[sensors] if isinstance(sensors, slice) \
+                else [values[i] for i in sensors]
+        if hours is not None:
+            values = [row[hours] for row in values] if isinstance(hours, slice) \
+                else [[row[i] for i in hours] for row in values]
+        return values
+
+    def clear_cache(self):
+        """Remove all of the grid results from the cache."""
+        self._cache.clear()
+        self._cache_usage = 0
+
+    def _load_grid(self, full_id):
+        """Load the results of a grid from its result file."""
+        grid_file = self.grid_file(full_id)
+        if np is None:
+            return list(matrix_rows(grid_file))
+        header = matrix_header(grid_file)
+        if header['format'] in BINARY_FORMATS:
+            shape = (header['nrows'], header['ncols'] * header['ncomp'])
+            if header['nrows'] == 0:
+                return np.zeros(shape)
+            typecode, _ = BINARY_FORMATS[header['format']]
+            dtype = np.dtype(typecode).newbyteorder(
+                '>' if header['big_endian'] else '<')
+            return np.memmap(
+                grid_file, dtype=dtype, mode='r', offset=header['offset'], shape=shape)
+        blocks = list(matrix_blocks(grid_file))
+        return np.vstack(blocks) if blocks else np.zeros((0, 0))
+
+    @staticmethod
+    def _size(values):
+        """Get the approximate number of bytes used by the results of a grid."""
+        if np is not None:
+            return values.nbytes
+        return sum(len(row) for row in values) * 8
+
+    def _trim_cache(self):
+        """Remove the least recently used grids until the cache is within budget."""
+        budget = self._cache_size * 1024 ** 2
+        while self._cache_usage > budget and len(self._cache) > 1:
+            _, values = self._cache.popitem(last=False)
+            self._cache_usage -= self._size(values)
+
+    def ToString(self):
+        """Overwrite .NET ToString."""
+        return self.__repr__()
+
+    def __len__(self):
+        return len(self.grids_info)
+
+    def __contains__(self, full_id):
+        return full_id in self.grid_ids
+
+    def __repr__(self):
+        return 'ResultsFolder: %s' % self._folder
@@ -1,16 +1,27 @@
 """Functions for post-processing results of dynamic objects that track the sun."""
 import os
-import json
 import shutil
 import math
 
 from ladybug_geometry.geometry3d.pointvector import Vector3D
 from ladybug.sunpath import Sunpath
 
+from .annual import map_grids
+from .matrix import matrix_header, matrix_rows, matrix_blocks, _ascii_lines, \
+    BLOCK_SIZE
+from .results import ResultsFolder
+
+try:
+    import numpy as np
+except ImportError:  # numpy is not available (eg. IronPython)
+    np = None
+
+VALUE_FORMAT = '%.7e'  # format of the merged values of binary result files
+
 
 def post_process_solar_tracking(
         result_folders, sun_up_file, location, north=0, tracking_increment=5,
-        destination_folder=None):
+        destination_folder=None, workers=1):
     """Postprocess a list of result folders to account for dynamic solar tracking.
 
     This function essentially takes .ill files for each state of a dynamic tracking
@@ -22,7 +33,8 @@ def post_process_solar_tracking(
             ordered from eastern-most to wester-most, tracing the path of the
             tracking system over the day. The names of the .ill files should be
             the same in each folder (representing the same sensor grid in a
-            different state).
+            different state). The .ill files can be headerless ASCII files or
+            binary float or double matrices with a Radiance header.
         sun_up_file: Path to a sun-up-hours.txt that contains the sun-up hours of
             the simulation.
         location: A Ladybug Location object to be used to generate sun poisitions.
@@ -34,6 +46,12 @@ def post_process_solar_tracking(
             files of the dynamic tracking system will be written. If None, all
             files will be written into the directory above the first result_folder.
             (Default: None).
+        workers: An integer for the number of processes that will be used to
+            process the grids in parallel. If 0 or None, the number of CPUs will
+            be used. (Default: 1).
+
+    Returns:
+        str -- Path to the destination folder.
     """
     # get the orientation angles of the panels for each model
     st_angle = int(90 - (len(result_folders) * tracking_increment / 2)) + 1
@@ -58,11 +76,10 @@ def post_process_solar_tracking(
         else:
             mtx_to_use.append(-1)
 
-    # parse the grids_info in the first folder to understand the sensor grids
+    # index the result folders of each state
+    states = [ResultsFolder(folder) for folder in result_folders]
+    hour_states = [len(states) - 1 if st == -1 else st for st in mtx_to_use]
     grids_info_file = os.path.join(result_folders[0], 'grids_info.json')
-    with open(grids_info_file) as gi_file:
-        grids_data = json.load(gi_file)
-    grid_ids = [g['full_id'] for g in grids_data]
 
     # prepare the destination folder and copy the grids_info to it
     if destination_folder is None:
@@ -72,19 +89,57 @@ def post_process_solar_tracking(
     shutil.copyfile(grids_info_file, os.path.join(destination_folder, 'grids_info.json'))
 
     # convert the .ill files of each sensor grid into a single .ill file
-    for grid_id in grid_ids:
-        grid_mtx = []
-        for i, model in enumerate(result_folders):
-            grid_file = os.path.join(model, '{}.ill'.format(grid_id))
-            with open(grid_file) as ill_file:
-                grid_mtx.append([lin.split() for lin in ill_file])
-        grid_ill = []
-        for i, hoy_mtx in enumerate(mtx_to_use):
-            hoy_vals = []
-            for pt in range(len(grid_mtx[0])):
-                hoy_vals.append(grid_mtx[hoy_mtx][pt][i])
-            grid_ill.append(hoy_vals)
-        dest_file = os.path.join(destination_folder, '{}.ill'.format(grid_id))
-        with open(dest_file, 'w') as ill_file:
-            for row in zip(*grid_ill):
-                ill_file.write('  '.join(row) + '\n')
+    grid_args = [
+        ([state.grid_file(grid_id) for state in states], hour_states,
+         os.path.join(destination_folder, '{}.ill'.format(grid_id)))
+        for grid_id in states[0].grid_ids
+    ]
+    map_grids(_merge_tracking_states, grid_args, workers)
+    return destination_folder
+
+
+def _merge_tracking_states(state_files, hour_states, dest_file):
+    """Merge the result files of the tracking states of a grid into a single file.
+
+    All of the state files are read together one row (or one block of rows) at a
+    time so that the memory in use does not depend on the number of sensors. If all
+    of the state files are ASCII, the original text of each value is written to
+    the merged file. Otherwise, the values are written with the VALUE_FORMAT.
+
+    Args:
+        state_files: A list of paths to the result files of the grid for each state.
+        hour_states: A list with the index of the state to use for each hour.
+        dest_file: Path to the .ill file to be written.
+    """
+    used_states = sorted(set(hour_states))
+    headers = [matrix_header(state_files[st]) for st in used_states]
+    hour_cols = [(used_states.index(st), i) for i, st in enumerate(hour_states)]
+    with open(dest_file, 'w') as ill_file:
+        if all(header['format'] == 'ascii' for header in headers):
+            readers = [
+                (line.split() for line in _ascii_lines(state_files[st], header))
+                for st, header in zip(used_states, headers)
+            ]
+            for rows in zip(*readers):
+                row = b'  '.join(rows[st][i] for st, i in hour_cols)
+                ill_file.write(row.decode('ascii') + '\n')
+        elif np is not None:
+            # load fewer rows at once when there are many states
+            block_size = max(1, BLOCK_SIZE // len(used_states)) \
+                if used_states else BLOCK_SIZE
+            state_cols = [
+                (used_states.index(st), [i for i, s in enumerate(hour_states) if s == st])
+                for st in used_states
+            ]
+            readers = [matrix_blocks(state_files[st], block_size) for st in used_states]
+            for blocks in zip(*readers):
+                merged = np.empty((blocks[0].shape[0], len(hour_states)))
+                for st, cols in state_cols:
+                    merged[:, cols] = blocks[st][:, cols]
+                np.savetxt(ill_file, merged, fmt=VALUE_FORMAT, delimiter='  ')
+        else:
+            readers = [matrix_rows(state_files[st]) for st in used_states]
+            for rows in zip(*readers):
+                ill_file.write('  '.join(
+                    VALUE_FORMAT % rows[st][i] for st, i in hour_cols) + '\n')
+    return dest_file
@@ -0,0 +1,566 @@
+"""Per-sensor histograms of annual results to evaluate metrics at any threshold.
+
+Building a ThresholdIndex requires one pass over the annual results of a sensor grid.
+Afterwards, daylight autonomy, continuous daylight autonomy, useful daylight
+illuminance and glare autonomy can be computed for any threshold from the index
+without reading the large .ill or .dgp files again.
+
+The index stores, for each sensor, the number of occupied hours and the sum of
+the values that fall in each bin of a set of log-spaced bins. Each bin includes its
+upper edge and excludes its lower edge. The first bin includes all values up to the
+lowest edge and the last bin includes all values above the highest edge.
+
+The results are exact when the thresholds fall on a bin edge, except that values
+which are exactly equal to the lower threshold of useful daylight illuminance are
+counted as lower than useful. Otherwise, the hours
+of the bin that contains the threshold are split by interpolation in log space
+(or linearly for the first and last bins). For any threshold inside a bin, the error
+of the daylight autonomy, the continuous daylight autonomy, each band of the useful
+daylight illuminance and the glare autonomy is at most 100 * n / total_hours
+percentage points, where n is the number of hours of the sensor in that bin. The
+error_bound method returns this value for each sensor. If the index is built with
+exact=True, the sorted occupied values of each sensor are also stored and all
+results are exact at the cost of a larger index.
+"""
+from __future__ import division
+import array
+import json
+import math
+import os
+import shutil
+from bisect import bisect_left, bisect_right
+
+from .annual import filter_schedule_by_hours, map_grids
+from .annualdaylight import _annual_daylight_vis_metadata
+from .results import ResultsFolder
+from .matrix import matrix_rows, matrix_blocks
+
+try:
+    import numpy as np
+except ImportError:  # numpy is not available (eg. IronPython)
+    np = None
+
+
+def log_bin_edges(min_value=1, max_value=100000, bin_count=100):
+    """Get a list of log-spaced bin edges.
+
+    Args:
+        min_value: A positive number for the lowest bin edge. (Default: 1).
+        max_value: A number for the highest bin edge. (Default: 100000).
+        bin_count: An integer for the number of bins between the lowest and the
+            highest edge. (Default: 100).
+
+    Returns:
+        A list of bin_count + 1 numbers where the ratio between each pair of
+        consecutive edges is the same.
+    """
+    assert 0 < min_value < max_value, 'min_value must be positive and smaller ' \
+        'than max_value. Got {} and {}.'.format(min_value, max_value)
+    ratio = math.log(max_value / min_value) / bin_count
+    edges = [min_value * math.exp(ratio * i) for i in range(bin_count)]
+    edges.append(max_value)
+    return edges
+
+
+def _percentage(in_v, occ_hours):
+    return round(100.0 * in_v / occ_hours, 2)
+
+
+class ThresholdIndex(object):
+    """Per-sensor histograms of occupied-hour values for fast threshold queries.
+
+    Args:
+        bin_edges: A list of increasing numbers for the edges of the bins. There is
+            one more bin than the number of edges.
+        counts: A list with a list of hour counts for each sensor. Each list has
+            one value for each bin.
+        sums: A list with a list of the sums of the values for each sensor. Each
+            list has one value for each bin.
+        maxima: A list of numbers for the maximum occupied value of each sensor.
+        occ_hours: An integer for the number of occupied sun-up hours.
+        total_hours: An integer for the total number of occupied hours. If None,
+            the occ_hours plus the sun_down_occ_hours will be used. (Default: None).
+        sun_down_occ_hours: An integer for the number of occupied hours where
+            the sun is down. (Default: 0).
+        sorted_values: An optional list with a sorted list of the occupied values
+            of each sensor. If provided, all results will be exact. (Default: None).
+
+    Properties:
+        * bin_edges
+        * sensor_count
+        * occ_hours
+        * total_hours
+        * sun_down_occ_hours
+        * is_exact
+    """
+    __slots__ = (
+        '_bin_edges', '_counts', '_sums', '_maxima', '_occ_hours', '_total_hours',
+        '_sun_down_occ_hours', '_sorted_values', '_suffix_counts', '_prefix_sums',
+        '_prefix_sorted')
+
+    def __init__(self, bin_edges, counts, sums, maxima, occ_hours, total_hours=None,
+                 sun_down_occ_hours=0, sorted_values=None):
+        self._bin_edges = tuple(bin_edges)
+        bin_count = len(self._bin_edges) + 1
+        assert len(counts) == len(sums) == len(maxima), 'The number of sensors ' \
+            'in counts, sums and maxima must match.'
+        for sensor_counts, sensor_sums in zip(counts, sums):
+            assert len(sensor_counts) == len(sensor_sums) == bin_count, 'Each ' \
+                'sensor must have {} bin values.'.format(bin_count)
+        self._counts = counts
+        self._sums = sums
+        self._maxima = maxima
+        self._occ_hours = occ_hours
+        self._total_hours = occ_hours + sun_down_occ_hours \
+            if total_hours is None else total_hours
+        self._sun_down_occ_hours = sun_down_occ_hours
+        self._sorted_values = sorted_values
+
+        # pre-compute cumulative values so that each query is O(1) per sensor
+        self._suffix_counts = []
+        self._prefix_sums = []
+        for sensor_counts, sensor_sums in zip(counts, sums):
+            suffix, total = [0] * (bin_count + 1), 0
+            for i in range(bin_count - 1, -1, -1):
+                total += sensor_counts[i]
+                suffix[i] = total
+            prefix, total = [0], 0
+            for value in sensor_sums:
+                total += value
+                prefix.append(total)
+            self._suffix_counts.append(suffix)
+            self._prefix_sums.append(prefix)
+        self._prefix_sorted = None
+        if sorted_values is not None:
+            self._prefix_sorted = []
+            for values in sorted_values:
+                prefix, total = [0], 0
+                for value in values:
+                    total += value
+                    prefix.append(total)
+                self._prefix_sorted.append(prefix)
+
+    @classmethod
+    def from_values(cls, sensor_values, bin_edges, occ_pattern=None, total_hours=None,
+                    sun_down_occ_hours=0, exact=False):
+        """Create a ThresholdIndex from the hourly values of each sensor.
+
+        Args:
+            sensor_values: An iterable with a list of hourly values for each sensor.
+            bin_edges: A list of increasing numbers for the edges of the bins.
+                The log_bin_edges function can be used to create these edges.
+            occ_pattern: A list of 0 and 1 values for the hours of occupancy. If None,
+                all hours will be considered occupied. (Default: None).
+            total_hours: An integer for the total number of occupied hours. If None,
+                the number of occupied sun-up hours plus the sun_down_occ_hours
+                will be used. (Default: None).
+            sun_down_occ_hours: An integer for the number of occupied hours where
+                the sun is down. (Default: 0).
+            exact: Boolean to note whether the sorted occupied values of each sensor
+                should be stored in the index to get exact results. (Default: False).
+        """
+        bin_count = len(bin_edges) + 1
+        counts, sums, maxima, sorted_values = [], [], [], [] if exact else None
+        occ_hours = None
+        for values in sensor_values:
+            if occ_pattern is not None:
+                values = [v for is_occ, v in zip(occ_pattern, values) if is_occ != 0]
+            occ_hours = len(values)
+            sensor_counts, sensor_sums = [0] * bin_count, [0] * bin_count
+            for v in values:
+                i = bisect_left(bin_edges, v)
+                sensor_counts[i] += 1
+                sensor_sums[i] += v
+            counts.append(sensor_counts)
+            sums.append(sensor_sums)
+            maxima.append(max(values) if values else 0)
+            if exact:
+                sorted_values.append(sorted(values))
+        if occ_hours is None:  # no sensors
+            occ_hours = sum(1 for v in occ_pattern if v != 0) if occ_pattern else 0
+        return cls(bin_edges, counts, sums, maxima, occ_hours, total_hours,
+                   sun_down_occ_hours, sorted_values)
+
+    @classmethod
+    def from_matrix(cls, matrix_file, occ_pattern, bin_edges, total_hours=None,
+                    sun_down_occ_hours=0, exact=False):
+        """Create a ThresholdIndex from a Radiance matrix file with one pass.
+
+        Args:
+            matrix_file: Path to a matrix file generated by Radiance (eg. an .ill or
+                a .dgp file). The file can be a headerless ASCII file or a binary
+                float or double matrix with a Radiance header.
+            occ_pattern: A list of 0 and 1 values for hours of occupancy.
+            bin_edges: A list of increasing numbers for the edges of the bins.
+            total_hours: An integer for the total number of occupied hours. If None,
+                the number of occupied sun-up hours plus the sun_down_occ_hours
+                will be used. (Default: None).
+            sun_down_occ_hours: An integer for the number of occupied hours where
+                the sun is down. (Default: 0).
+            exact: Boolean to note whether the sorted occupied values of each sensor
+                should be stored in the index to get exact results. (Default: False).
+        """
+        if np is None:
+            return cls.from_values(
+                matrix_rows(matrix_file), bin_edges, occ_pattern, total_hours,
+                sun_down_occ_hours, exact)
+
+        # use numpy to bin all of the sensors of a block together
+        bin_count = len(bin_edges) + 1
+        edges = np.array(bin_edges)
+        occ_mask = np.array(occ_pattern) != 0
+        counts, sums, maxima, sorted_values = [], [], [], [] if exact else None
+        occ_hours = int(np.count_nonzero(occ_mask))
+        for block in matrix_blocks(matrix_file):
+            block = block[:, :occ_mask.size]
+            occ = block[:, occ_mask[:block.shape[1]]]
+            occ_hours = occ.shape[1]
+            bins = np.searchsorted(edges, occ, side='left')
+            bins += (np.arange(occ.shape[0]) * bin_count)[:, None]
+            length = occ.shape[0] * bin_count
+            block_counts = np.bincount(bins.ravel(), minlength=length)
+            block_sums = np.bincount(bins.ravel(), occ.ravel(), minlength=length)
+            counts.extend(block_counts.reshape(-1, bin_count).tolist())
+            sums.extend(block_sums.reshape(-1, bin_count).tolist())
+            maxima.extend(occ.max(axis=1).tolist() if occ_hours else [0] * len(occ))
+            if exact:
+                sorted_values.extend(np.sort(occ, axis=1).tolist())
+        return cls(bin_edges, counts, sums, maxima, occ_hours, total_hours,
+                   sun_down_occ_hours, sorted_values)
+
+    @classmethod
+    def from_file(cls, index_file):
+        """Load a ThresholdIndex from an .idx file written with the to_file method."""
+        with open(index_file, 'rb') as inf:
+            header = json.loads(inf.readline().decode('utf-8'))
+            data = array.array('d')
+            try:
+                data.frombytes(inf.read())
+            except AttributeError:  # python 2
+                data.fromstring(inf.read())
+        bin_count = len(header['bin_edges']) + 1
+        sensor_count, occ_hours = header['sensor_count'], header['occ_hours']
+        counts, sums, maxima, sorted_values = [], [], [], None
+        st = 0
+        for _ in range(sensor_count):
+            counts.append([int(v) for v in data[st:st + bin_count]])
+            sums.append(data[st + bin_count:st + 2 * bin_count].tolist())
+            maxima.append(data[st + 2 * bin_count])
+            st += 2 * bin_count + 1
+        if header['exact']:
+            sorted_values = []
+            for _ in range(sensor_count):
+                sorted_values.append(data[st:st + occ_hours].tolist())
+                st += occ_hours
+        return cls(header['bin_edges'], counts, sums, maxima, occ_hours,
+                   header['total_hours'], header['sun_down_occ_hours'], sorted_values)
+
+    @property
+    def bin_edges(self):
+        """Get a tuple of numbers for the edges of the bins."""
+        return self._bin_edges
+
+    @property
+    def sensor_count(self):
+        """Get an integer for the number of sensors in the index."""
+        return len(self._counts)
+
+    @property
+    def occ_hours(self):
+        """Get an integer for the number of occupied sun-up hours."""
+        return self._occ_hours
+
+    @property
+    def total_hours(self):
+        """Get an integer for the total number of occupied hours."""
+        return self._total_hours
+
+    @property
+    def sun_down_occ_hours(self):
+        """Get an integer for the number of occupied hours where the sun is down."""
+        return self._sun_down_occ_hours
+
+    @property
+    def is_exact(self):
+        """Get a boolean for whether the index stores the sorted values of sensors."""
+        return self._sorted_values is not None
+
+    def daylight_autonomy(self, threshold=300):
+        """Get the daylight autonomy of each sensor for a threshold.
+
+        Args:
+            threshold: Threshold value for daylight autonomy. (Default: 300).
+
+        Returns:
+            A list of percentages with one value for each sensor.
+        """
+        total = self._total_hours
+        return [_percentage(c, total) for c in self._counts_above(threshold)]
+
+    def continuous_daylight_autonomy(self, threshold=300):
+        """Get the continuous daylight autonomy of each sensor for a threshold.
+
+        Args:
+            threshold: Threshold value for continuous daylight autonomy.
+                (Default: 300).
+
+        Returns:
+            A list of percentages with one value for each sensor.
+        """
+        total = self._total_hours
+        return [
+            _percentage(above + below / threshold, total) for above, below in
+            zip(self._counts_above(threshold), self._sums_below(threshold))
+        ]
+
+    def useful_daylight_illuminance(self, min_t=100, max_t=3000):
+        """Get the three bands of useful daylight illuminance for each sensor.
+
+        Args:
+            min_t: Minimum threshold for useful daylight illuminance. (Default: 100).
+            max_t: Maximum threshold for useful daylight illuminance. (Default: 3000).
+
+        Returns:
+            A tuple with three lists for the lower than useful daylight illuminance,
+            the useful daylight illuminance and the higher than useful daylight
+            illuminance. Each list has one percentage for each sensor.
+        """
+        total, occ_hours = self._total_hours, self._occ_hours
+        lower, udi, upper = [], [], []
+        for below, above in zip(self._counts_below(min_t), self._counts_above(max_t)):
+            lower.append(_percentage(below + self._sun_down_occ_hours, total))
+            udi.append(_percentage(occ_hours - below - above, total))
+            upper.append(_percentage(above, total))
+        return lower, udi, upper
+
+    def glare_autonomy(self, glare_threshold=0.4):
+        """Get the glare autonomy of each sensor for a DGP threshold.
+
+        Args:
+            glare_threshold: A fractional number for the threshold of DGP above
+                which conditions are considered to induce glare. (Default: 0.4).
+
+        Returns:
+            A list of percentages with one value for each sensor.
+        """
+        total = self._total_hours
+        return [_percentage(total - c, total)
+                for c in self._counts_above(glare_threshold)]
+
+    def error_bound(self, threshold):
+        """Get the maximum error of the results at a threshold for each sensor.
+
+        Args:
+            threshold: A number for the threshold to be evaluated.
+
+        Returns:
+            A list with the maximum error in percentage points for each sensor. This
+            is zero if the index is exact or the threshold falls on a bin edge.
+        """
+        if self.is_exact:
+            return [0] * self.sensor_count
+        k = bisect_left(self._bin_edges, threshold)
+        if k < len(self._bin_edges) and self._bin_edges[k] == threshold:
+            return [0] * self.sensor_count
+        return [100.0 * counts[k] / self._total_hours for counts in self._counts]
+
+    def _above_fraction(self, threshold, k, maximum):
+        """Get the fraction of bin k that is above the threshold."""
+        edges = self._bin_edges
+        low = edges[k - 1] if k > 0 else min(0, edges[0])
+        high = edges[k] if k < len(edges) else maximum
+        if threshold >= high:
+            return 0
+        if threshold <= low:
+            return 1
+        if 0 < k < len(edges) and low > 0:  # interpolate in log space
+            return math.log(high / threshold) / math.log(high / low)
+        return (high - threshold) / (high - low)
+
+    def _counts_above(self, threshold):
+        """Get the number of hours above the threshold for each sensor."""
+        if self.is_exact:
+            return [len(values) - bisect_right(values, threshold)
+                    for values in self._sorted_values]
+        k = bisect_left(self._bin_edges, threshold)
+        if k < len(self._bin_edges) and self._bin_edges[k] == threshold:
+            return [suffix[k + 1] for suffix in self._suffix_counts]
+        return [
+            suffix[k + 1] + counts[k] * self._above_fraction(threshold, k, maximum)
+            for suffix, counts, maximum in
+            zip(self._suffix_counts, self._counts, self._maxima)
+        ]
+
+    def _counts_below(self, threshold):
+        """Get the number of hours below the threshold for each sensor."""
+        if self.is_exact:
+            return [bisect_left(values, threshold) for values in self._sorted_values]
+        occ_hours = self._occ_hours
+        return [occ_hours - c for c in self._counts_above(threshold)]
+
+    def _sums_below(self, threshold):
+        """Get the sum of the values at or below the threshold for each sensor."""
+        if self.is_exact:
+            return [prefix[bisect_right(values, threshold)] for values, prefix in
+                    zip(self._sorted_values, self._prefix_sorted)]
+        k = bisect_left(self._bin_edges, threshold)
+        if k < len(self._bin_edges) and self._bin_edges[k] == threshold:
+            return [prefix[k + 1] for prefix in self._prefix_sums]
+        return [
+            prefix[k] + sums[k] * (1 - self._above_fraction(threshold, k, maximum))
+            for prefix, sums, maximum in
+            zip(self._prefix_sums, self._sums, self._maxima)
+        ]
+
+    def to_file(self, index_file):
+        """Write the index to a file.
+
+        The file starts with a line of JSON for the header, which is followed by
+        the binary values of each sensor as 64-bit floats.
+
+        Args:
+            index_file: Path to an .idx file.
+        """
+        header = {
+            'bin_edges': list(self._bin_edges),
+            'sensor_count': self.sensor_count,
+            'occ_hours': self._occ_hours,
+            'total_hours': self._total_hours,
+            'sun_down_occ_hours': self._sun_down_occ_hours,
+            'exact': self.is_exact
+        }
+        with open(index_file, 'wb') as outf:
+            outf.write((json.dumps(header) + '\n').encode('utf-8'))
+            for counts, sums, maximum in zip(self._counts, self._sums, self._maxima):
+                array.array('d', list(counts) + list(sums) + [maximum]).tofile(outf)
+            if self.is_exact:
+                for values in self._sorted_values:
+                    array.array('d', values).tofile(outf)
+        return index_file
+
+    def ToString(self):
+        """Overwrite .NET ToString."""
+        return self.__repr__()
+
+    def __len__(self):
+        return self.sensor_count
+
+    def __repr__(self):
+        return 'ThresholdIndex: [{} sensors, {} bins]'.format(
+            self.sensor_count, len(self._bin_edges) + 1)
+
+
+def _threshold_index_to_file(matrix_file, index_file, occ_pattern, bin_edges,
+                             total_hours, sun_down_occ_hours, exact):
+    """Build the ThresholdIndex of a matrix file and write it to an .idx file."""
+    index = ThresholdIndex.from_matrix(
+        matrix_file, occ_pattern, bin_edges, total_hours, sun_down_occ_hours, exact)
+    return index.to_file(index_file)
+
+
+def threshold_index_to_folder(
+    results_folder, schedule=None, grids_filter='*', sub_folder='threshold_index',
+    min_value=1, max_value=100000, bin_count=100, exact=False, extension='ill',
+    workers=1
+):
+    """Build the ThresholdIndex of each grid in a results folder.
+
+    This folder is an output folder of annual daylight or imageless annual glare
+    recipes. Folder should include grids_info.json and sun-up-hours.txt.
+
+    Args:
+        results_folder: Results folder.
+        schedule: An annual schedule for 8760 hours of the year as a list of values.
+        grids_filter: A pattern to filter the grids. By default all the grids will be
+            processed.
+        sub_folder: An optional relative path for subfolder to write the index
+            files. (Default: threshold_index).
+        min_value: A positive number for the lowest bin edge. (Default: 1).
+        max_value: A number for the highest bin edge. (Default: 100000).
+        bin_count: An integer for the number of log-spaced bins between the lowest
+            and the highest edge. (Default: 100).
+        exact: Boolean to note whether the sorted occupied values of each sensor
+            should be stored in the index to get exact results. (Default: False).
+        extension: Text for the extension of the result files. Use dgp to build
+            the index of an imageless annual glare study. (Default: ill).
+        workers: An integer for the number of processes that will be used to
+            process the grids in parallel. If 0 or None, the number of CPUs will
+            be used. (Default: 1).
+
+    Returns:
+        str -- Path to the index folder.
+    """
+    results = ResultsFolder(results_folder, extension)
+    grids, sun_up_hours = results.filter_grids(grids_filter), results.sun_up_hours
+    occ_pattern, total_occ, sun_down_occ_hours = \
+        filter_schedule_by_hours(sun_up_hours=sun_up_hours, schedule=schedule)
+    bin_edges = log_bin_edges(min_value, max_value, bin_count)
+
+    index_folder = os.path.join(results_folder, sub_folder)
+    if not os.path.isdir(index_folder):
+        os.makedirs(index_folder)
+
+    grid_args = [
+        (results.grid_file(grid['full_id']),
+         os.path.join(index_folder, '%s.idx' % grid['full_id']), occ_pattern,
+         bin_edges, total_occ, sun_down_occ_hours, exact)
+        for grid in grids
+    ]
+    map_grids(_threshold_index_to_file, grid_args, workers)
+
+    with open(os.path.join(index_folder, 'grids_info.json'), 'w') as outf:
+        json.dump(grids, outf)
+
+    return index_folder
+
+
+def metrics_from_threshold_index(
+    index_folder, output_folder, threshold=300, min_t=100, max_t=3000
+):
+    """Write annual daylight metrics of an index folder into a folder.
+
+    The output folder has the same structure as the one of the metrics_to_folder
+    function in the annualdaylight module, including the vis_metadata.json of
+    each metric.
+
+    Args:
+        index_folder: A folder of .idx files written by threshold_index_to_folder.
+        output_folder: An output folder where the results will be written to.
+        threshold: Threshold illuminance level for daylight autonomy. (Default: 300).
+        min_t: Minimum threshold for useful daylight illuminance. (Default: 100).
+        max_t: Maximum threshold for useful daylight illuminance. (Default: 3000).
+
+    Returns:
+        str -- Path to the output folder.
+    """
+    grid_info = os.path.join(index_folder, 'grids_info.json')
+    with open(grid_info) as data_f:
+        grids = json.load(data_f)
+
+    metric_ext = (('da', 'da'), ('cda', 'cda'), ('udi_lower', 'udi'),
+                  ('udi', 'udi'), ('udi_upper', 'udi'))
+    for metric, _ in metric_ext:
+        metric_folder = os.path.join(output_folder, metric)
+        if not os.path.isdir(metric_folder):
+            os.makedirs(metric_folder)
+        shutil.copyfile(grid_info, os.path.join(metric_folder, 'grids_info.json'))
+
+    metric_info_dict = _annual_daylight_vis_metadata()
+    for metric, data in metric_info_dict.items():
+        file_path = os.path.join(output_folder, metric, 'vis_metadata.json')
+        with open(file_path, 'w') as fp:
+            json.dump(data, fp, indent=4)
+
+    for grid in grids:
+        index = ThresholdIndex.from_file(
+            os.path.join(index_folder, '%s.idx' % grid['full_id']))
+        results = (index.daylight_autonomy(threshold),
+                   index.continuous_daylight_autonomy(threshold)) + \
+            index.useful_daylight_illuminance(min_t, max_t)
+        for (metric, ext), values in zip(metric_ext, results):
+            res_file = os.path.join(
+                output_folder, metric, '%s.%s' % (grid['full_id'], ext))
+            with open(res_file, 'w') as outf:
+                outf.write(''.join(str(v) + '\n' for v in values))
+
+    return output_folder
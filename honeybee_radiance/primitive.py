@@ -129,7 +129,7 @@ class Primitive(object):
         * is_void
     """
     __slots__ = ('_identifier', '_display_name', '_modifier', '_values',
-                 '_is_opaque', '_dependencies', '_type', '_locked')
+                 '_is_opaque', '_dependencies', '_type', '_locked', '_cache')
 
     # All Radiance geometry types
     GEOMETRYTYPES = set(('source', 'sphere', 'bubble', 'polygon', 'cone', 'cup',
@@ -429,15 +429,66 @@ class Primitive(object):
             '{} is not a valid dependent type'.format(type(dep))
         self._dependencies.append(dep)
 
+    def _cache_dict(self):
+        """Get the dictionary of cached values, which is cleared when attributes change.
+
+        The cache is set with object.__setattr__ so that it can be used on locked
+        primitives, which are the ones that are hashed and written most often.
+        """
+        cache = getattr(self, '_cache', None)
+        if cache is None:
+            cache = {}
+            object.__setattr__(self, '_cache', cache)
+        return cache
+
+    def _cached(self, key, function):
+        """Get a cached value of this primitive or compute it with a function.
+
+        The values are cached until an attribute of this primitive is set or the
+        identifier of its modifier or one of its dependencies changes, which can
+        be part of the values of the primitive (eg. the alternate material of
+        a mirror).
+        """
+        stamp = (self.modifier.identifier,) + \
+            tuple(dep.identifier for dep in self.dependencies)
+        try:
+            cached_stamp, value = self._cache[key]
+        except (AttributeError, TypeError, KeyError):  # the cache is empty
+            pass
+        else:
+            if cached_stamp == stamp:
+                return value
+        value = function()
+        self._cache_dict()[key] = (stamp, value)
+        return value
+
+    def _own_key(self):
+        """Get a tuple for the type, identifier and values of this primitive.
+
+        The tuple does not include the modifier and the dependencies, which have
+        their own cache.
+        """
+        return self._cached('key', lambda: (self.type, self.identifier) + tuple(
+            hash(tuple(vals)) for vals in self.values))
+
+    def _own_radiance(self, minimal=False):
+        """Get the Radiance string of this primitive without dependencies."""
+        return self._cached(minimal, lambda: self._to_radiance(self, minimal))
+
     @staticmethod
-    def _to_radiance(primitive, minimal=False):
+    def _to_radiance(primitive, minimal=False, precision=None):
         """Return Radiance representation of primitive."""
         header = "%s %s %s" % (primitive.modifier.identifier,
                                primitive.type, primitive.identifier)
         output = [header]
         for line_count in range(3):
             try:
-                values = (str(v) for v in primitive.values[line_count])
+                if precision is None:
+                    values = (str(v) for v in primitive.values[line_count])
+                else:  # only round the floats and keep the text and integers
+                    values = (
+                        str(round(v, precision)) if isinstance(v, float) else str(v)
+                        for v in primitive.values[line_count])
             except BaseException:
                 values = []  # line will be displayed as 0
             else:
@@ -448,7 +499,7 @@ class Primitive(object):
         return ' '.join(output) if minimal else '\n'.join(output)
 
     def to_radiance(self, minimal=False, include_modifier=True,
-                    include_dependencies=True):
+                    include_dependencies=True, precision=None):
         """Return full radiance definition.
 
         Args:
@@ -458,6 +509,12 @@ class Primitive(object):
                 should be included in the string. Default: True.
             include_dependencies: Boolean to note whether the dependencies of this
                 primitive should be included in the string. Default: True.
+            precision: An optional integer for the number of decimal places to
+                which the float values of this primitive are rounded. Rounded values
+                are written without trailing zeros, which makes the strings of
+                geometry much shorter. The modifier and the dependencies are always
+                written with full precision. If None, the values of this primitive
+                are also written with full precision. (Default: None).
         """
         output = []
 
@@ -465,11 +522,14 @@ class Primitive(object):
             for dep in self.dependencies:
                 if isinstance(dep, Void):
                     continue
-                output.append(self._to_radiance(dep, minimal))
+                output.append(dep._own_radiance(minimal))
 
         if include_modifier and not self.modifier.is_void:
-            output.append(self._to_radiance(self.modifier, minimal))
-        output.append(self._to_radiance(self, minimal))
+            output.append(self.modifier._own_radiance(minimal))
+        if precision is None:
+            output.append(self._own_radiance(minimal))
+        else:
+            output.append(self._to_radiance(self, minimal, precision))
 
         return '\n'.join(output)
 
@@ -517,8 +577,7 @@ class Primitive(object):
 
     def __key(self):
         """A tuple based on the object properties, useful for hashing."""
-        return (hash(self.modifier), self.type, self.identifier) + \
-            tuple(hash(tuple(vals)) for vals in self.values) + \
+        return (hash(self.modifier),) + self._own_key() + \
             tuple(hash(dep) for dep in self._dependencies)
 
     def __hash__(self):
@@ -552,3 +611,16 @@ class Primitive(object):
     def __repr__(self):
         """Return primitive definition."""
         return self.to_radiance()
+
+
+_lockable_setattr = Primitive.__setattr__
+
+
+def _primitive_setattr(self, key, value):
+    """Set an attribute of a Primitive and clear its cached key and strings."""
+    _lockable_setattr(self, key, value)
+    if key != '_cache':
+        object.__setattr__(self, '_cache', None)
+
+
+Primitive.__setattr__ = _primitive_setattr
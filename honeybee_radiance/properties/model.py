@@ -1,5 +1,7 @@
 # coding=utf-8
 """Model Radiance Properties."""
+from contextlib import contextmanager
+
 from honeybee.extensionutil import model_extension_dicts
 from honeybee.checkdup import check_duplicate_identifiers
 from honeybee.boundarycondition import Surface
@@ -60,6 +62,7 @@ class ModelRadianceProperties(object):
     def __init__(self, host, sensor_grids=None, views=None, luminaires=None):
         """Initialize Model radiance properties."""
         self._host = host
+        self._modifier_cache = None  # dictionary of modifier lists when caching
         self.sensor_grids = sensor_grids
         self.views = views
         self.luminaires = luminaires
@@ -118,8 +121,7 @@ class ModelRadianceProperties(object):
         blk_modifiers and the modifier_direct of any states, which can be obtained
         separately from the blk_modifiers property.
         """
-        all_mods = self.room_modifiers + self.face_modifiers + self.shade_modifiers
-        return list(set(all_mods))
+        return self._cached_modifiers('modifiers', self._collect_modifiers)
 
     @property
     def blk_modifiers(self):
@@ -129,26 +131,12 @@ class ModelRadianceProperties(object):
         It also includes modifier_direct for any dynamic states assigned to
         these objects.
         """
-        modifiers = [black]
-        for face in self.host.faces:  # check all orphaned Face modifiers
-            self._check_and_add_face_modifier_blk(face, modifiers)
-        for ap in self.host.orphaned_apertures:  # check all Aperture modifiers
-            self._check_and_add_dynamic_obj_modifier_blk(ap, modifiers)
-        for dr in self.host.orphaned_doors:  # check all Door modifiers
-            self._check_and_add_dynamic_obj_modifier_blk(dr, modifiers)
-        for shade in self.host.shades:
-            self._check_and_add_dynamic_obj_modifier_blk(shade, modifiers)
-        for sm in self.host.shade_meshes:  # check all ShadeMesh modifiers
-            self._check_and_add_obj_modifier_blk(sm, modifiers)
-        return list(set(modifiers))
+        return self._cached_modifiers('blk_modifiers', self._collect_blk_modifiers)
 
     @property
     def room_modifiers(self):
         """A list of all unique modifiers assigned to Room ModifierSets."""
-        room_mods = []
-        for cnstr_set in self.modifier_sets:
-            room_mods.extend(cnstr_set.modified_modifiers_unique)
-        return list(set(room_mods))
+        return self._cached_modifiers('room_modifiers', self._collect_room_modifiers)
 
     @property
     def face_modifiers(self):
@@ -158,33 +146,13 @@ class ModelRadianceProperties(object):
         objects. It does not include the modifiers of any shades assigned to these
         objects. Nor does it include any blk modifiers.
         """
-        modifiers = []
-        for face in self.host.faces:  # check all orphaned Face modifiers
-            self._check_and_add_face_modifier(face, modifiers)
-        for ap in self.host.orphaned_apertures:  # check all Aperture modifiers
-            self._check_and_add_dynamic_obj_modifier(ap, modifiers)
-        for dr in self.host.orphaned_doors:  # check all Door modifiers
-            self._check_and_add_dynamic_obj_modifier(dr, modifiers)
-        return list(set(modifiers))
+        return self._cached_modifiers('face_modifiers', self._collect_face_modifiers)
 
     @property
     def shade_modifiers(self):
         """A list of all unique modifiers assigned to Shade and ShadeMeshes in the model.
         """
-        modifiers = []
-        for room in self.host.rooms:
-            self._check_and_add_room_modifier_shade(room, modifiers)
-        for face in self.host.orphaned_faces:
-            self._check_and_add_face_modifier_shade(face, modifiers)
-        for ap in self.host.orphaned_apertures:
-            self._check_and_add_obj_modifier_shade(ap, modifiers)
-        for dr in self.host.orphaned_doors:
-            self._check_and_add_obj_modifier_shade(dr, modifiers)
-        for shade in self.host.orphaned_shades:
-            self._check_and_add_orphaned_shade_modifier(shade, modifiers)
-        for shade_mesh in self.host.shade_meshes:
-            self._check_and_add_shade_mesh_modifier(shade_mesh, modifiers)
-        return list(set(modifiers))
+        return self._cached_modifiers('shade_modifiers', self._collect_shade_modifiers)
 
     @property
     def bsdf_modifiers(self):
@@ -193,19 +161,14 @@ class ModelRadianceProperties(object):
         This includes any BSDF modifiers in both the Model.modifiers and the
         Model.blk_modifiers.
         """
-        all_mods = self.modifiers + self.blk_modifiers
+        with self.cache_modifiers():
+            all_mods = self.modifiers + self.blk_modifiers
         return list(set(mod for mod in all_mods if isinstance(mod, (aBSDF, BSDF))))
 
     @property
     def modifier_sets(self):
         """A list of all unique Room-Assigned ModifierSets in the Model."""
-        modifier_sets = []
-        for room in self.host.rooms:
-            if room.properties.radiance._modifier_set is not None:
-                if not self._instance_in_array(room.properties.radiance._modifier_set,
-                                               modifier_sets):
-                    modifier_sets.append(room.properties.radiance._modifier_set)
-        return list(set(modifier_sets))  # catch equivalent modifier sets
+        return self._cached_modifiers('modifier_sets', self._collect_modifier_sets)
 
     @property
     def global_modifier_set(self):
@@ -300,6 +263,54 @@ class ModelRadianceProperties(object):
         else:
             self._luminaires = []
 
+    def modifier_by_identifier(self, identifier):
+        """Get a modifier or modifier_blk of the Model using its identifier.
+
+        Args:
+            identifier: Text for the identifier of a modifier in the modifiers
+                or the blk_modifiers of the Model.
+
+        Returns:
+            The modifier with the identifier. If a modifier and a modifier_blk share
+            the same identifier, the modifier will be returned.
+        """
+        index = self._cached_modifiers('identifiers', self._collect_identifiers)
+        try:
+            return index[identifier]
+        except KeyError:
+            raise ValueError(
+                'Modifier "{}" was not found in the model.'.format(identifier))
+
+    @contextmanager
+    def cache_modifiers(self):
+        """Context manager to collect the modifiers of the Model only once.
+
+        Inside the context, the first access of modifiers, blk_modifiers,
+        room_modifiers, face_modifiers, shade_modifiers and modifier_sets collects
+        the objects from the Model and the following ones reuse the result. This
+        makes the repeated access of these properties during translation and
+        validation linear in the size of the Model. The cache is cleared when the
+        context exits and whenever the modifiers are changed through the methods
+        of this object (eg. apply_properties_from_dict). Other edits to the
+        modifiers or geometry of the Model should not be made inside the context.
+
+        Usage:
+
+        .. code-block:: python
+
+            with model.properties.radiance.cache_modifiers():
+                modifiers = model.properties.radiance.modifiers
+                bsdfs = model.properties.radiance.bsdf_modifiers
+        """
+        if self._modifier_cache is not None:  # already inside of a cache context
+            yield self
+            return
+        self._modifier_cache = {}
+        try:
+            yield self
+        finally:
+            self._modifier_cache = None
+
     def remove_sensor_grids(self):
         """Remove all sensor grids from the model."""
         self._sensor_grids = []
@@ -447,7 +458,8 @@ class ModelRadianceProperties(object):
             -   shade_meshes: A list of all shade meshes without a unique
                 modifier_blk (just using the default black or transparent modifier).
 
-            -   shade_meshes_blk: A list of all shade meshes that have a unique modifier_blk.
+            -   shade_meshes_blk: A list of all shade meshes that have a unique
+                modifier_blk.
         """
         shade_meshes, shade_meshes_blk = [], []
         for shade in self.host.shade_meshes:
@@ -749,8 +761,9 @@ class ModelRadianceProperties(object):
         detailed = False if raise_exception else detailed
         msgs = []
         # perform checks for duplicate identifiers
-        msgs.append(self.check_duplicate_modifier_identifiers(False, detailed))
-        msgs.append(self.check_duplicate_modifier_set_identifiers(False, detailed))
+        with self.cache_modifiers():
+            msgs.append(self.check_duplicate_modifier_identifiers(False, detailed))
+            msgs.append(self.check_duplicate_modifier_set_identifiers(False, detailed))
         msgs.append(self.check_duplicate_sensor_grid_identifiers(False, detailed))
         msgs.append(self.check_duplicate_view_identifiers(False, detailed))
         # output a final report of errors or raise an exception
@@ -957,6 +970,59 @@ class ModelRadianceProperties(object):
                 merged_grids.append(merged_grid)
         self.sensor_grids = merged_grids
 
+    def deduplicate_modifiers(self):
+        """Replace modifiers of the Model that have the same content with one modifier.
+
+        Modifiers are duplicates of one another when they have the same type,
+        values, modifier and dependencies, regardless of their identifiers and
+        display names. All Faces, Apertures, Doors, Shades, ShadeMeshes, dynamic
+        states and Room ModifierSets that use a duplicate are re-assigned to one
+        representative modifier. This is the modifier of the default modifier set
+        with the same content if it exists. Otherwise, it is the duplicate with the
+        first identifier in alphabetical order.
+
+        This reduces the number of primitives that are written for the Model and
+        the number of modifiers in simulations that compute contributions for
+        each modifier.
+
+        Returns:
+            An integer for the number of modifiers that were replaced with
+            another modifier of the same content and are no longer in the Model.
+        """
+        # group all modifiers of the model by their content
+        with self.cache_modifiers():
+            model_mods = set(self.modifiers + self.blk_modifiers)
+        representatives = {}
+        for mod in self._default_modifiers():
+            representatives.setdefault(self._modifier_content_key(mod), mod)
+        mod_map = {}
+        for mod in sorted(model_mods, key=lambda m: m.identifier):
+            rep = representatives.setdefault(self._modifier_content_key(mod), mod)
+            if rep is not mod and rep != mod:
+                mod_map[mod] = rep
+        if not mod_map:
+            return 0
+
+        # re-assign the representative modifiers to all objects of the model
+        for obj in self.host.faces + self.host.apertures + self.host.doors + \
+                self.host.shades + list(self.host.shade_meshes):
+            self._remap_obj_modifiers(obj, mod_map)
+        new_sets = {}
+        for room in self.host.rooms:
+            mod_set = room.properties.radiance._modifier_set
+            if mod_set is None:
+                continue
+            try:
+                new_set = new_sets[id(mod_set)]
+            except KeyError:
+                new_set = new_sets[id(mod_set)] = \
+                    self._remap_modifier_set(mod_set, mod_map)
+            room.properties.radiance.modifier_set = new_set
+        self._clear_modifier_cache()
+        with self.cache_modifiers():  # count the modifiers that are no longer used
+            used_mods = set(self.modifiers + self.blk_modifiers)
+        return sum(1 for mod in mod_map if mod not in used_mods)
+
     def apply_properties_from_dict(self, data):
         """Apply the radiance properties of a dictionary to the host Model of this object.
 
@@ -969,6 +1035,7 @@ class ModelRadianceProperties(object):
             'Dictionary possesses no ModelRadianceProperties.'
 
         modifiers, modifier_sets = self.load_properties_from_dict(data)
+        self._clear_modifier_cache()
 
         # collect lists of radiance property dictionaries
         room_e_dicts, face_e_dicts, shd_e_dicts, ap_e_dicts, dr_e_dicts = \
@@ -1008,7 +1075,8 @@ class ModelRadianceProperties(object):
 
         # apply the luminaires if they are in the data
         if 'luminaires' in rad_data and rad_data['luminaires'] is not None:
-            self.luminaires = [Luminaire.from_dict(luminaire) for luminaire in rad_data['luminaires']]
+            self.luminaires = [Luminaire.from_dict(luminaire)
+                               for luminaire in rad_data['luminaires']]
 
     def to_dict(self):
         """Return Model radiance properties as a dictionary."""
@@ -1220,13 +1288,13 @@ class ModelRadianceProperties(object):
         return model_dict
 
     def _check_and_add_room_modifier_shade(self, room, modifiers):
-        """Check if a modifier is assigned to a Room's shades and add it to a list."""
+        """Check if a modifier is assigned to a Room's shades and add it to a dict."""
         self._check_and_add_obj_modifier_shade(room, modifiers)
         for face in room.faces:  # check all Face modifiers
             self._check_and_add_face_modifier_shade(face, modifiers)
 
     def _check_and_add_face_modifier_shade(self, face, modifiers):
-        """Check if a modifier is assigned to a Face's shades and add it to a list."""
+        """Check if a modifier is assigned to a Face's shades and add it to a dict."""
         self._check_and_add_obj_modifier_shade(face, modifiers)
         for ap in face.apertures:  # check all Aperture modifiers
             self._check_and_add_obj_modifier_shade(ap, modifiers)
@@ -1234,12 +1302,12 @@ class ModelRadianceProperties(object):
             self._check_and_add_obj_modifier_shade(dr, modifiers)
 
     def _check_and_add_obj_modifier_shade(self, subf, modifiers):
-        """Check if a modifier is assigned to an object's shades and add it to a list."""
+        """Check if a modifier is assigned to an object's shades and add it to a dict."""
         for shade in subf.shades:
             self._check_and_add_dynamic_obj_modifier(shade, modifiers)
 
     def _check_and_add_face_modifier(self, face, modifiers):
-        """Check if a modifier is assigned to a face and add it to a list."""
+        """Check if a modifier is assigned to a face and add it to a dict."""
         self._check_and_add_obj_modifier(face, modifiers)
         for ap in face.apertures:  # check all Aperture modifiers
             self._check_and_add_dynamic_obj_modifier(ap, modifiers)
@@ -1247,7 +1315,7 @@ class ModelRadianceProperties(object):
             self._check_and_add_dynamic_obj_modifier(dr, modifiers)
 
     def _check_and_add_face_modifier_blk(self, face, modifiers):
-        """Check if a modifier_blk is assigned to a face and add it to a list."""
+        """Check if a modifier_blk is assigned to a face and add it to a dict."""
         self._check_and_add_obj_modifier_blk(face, modifiers)
         for ap in face.apertures:  # check all Aperture modifiers
             self._check_and_add_dynamic_obj_modifier_blk(ap, modifiers)
@@ -1255,77 +1323,212 @@ class ModelRadianceProperties(object):
             self._check_and_add_dynamic_obj_modifier_blk(dr, modifiers)
 
     def _check_and_add_obj_modifier(self, obj, modifiers):
-        """Check if a modifier is assigned to an object and add it to a list."""
+        """Check if a modifier is assigned to an object and add it to a dict."""
         mod = obj.properties.radiance._modifier
         if mod is not None:
-            if not self._instance_in_array(mod, modifiers):
-                modifiers.append(mod)
+            modifiers[id(mod)] = mod
 
     def _check_and_add_dynamic_obj_modifier(self, obj, modifiers):
-        """Check if a modifier is assigned to a dynamic object and add it to a list."""
+        """Check if a modifier is assigned to a dynamic object and add it to a dict.
+        """
         mod = obj.properties.radiance._modifier
         if mod is not None:
-            if not self._instance_in_array(mod, modifiers):
-                modifiers.append(mod)
+            modifiers[id(mod)] = mod
         for st in obj.properties.radiance._states:
             stm = (st._modifier, st._modifier_direct) + \
                 tuple(s.modifier for s in st._shades)
             for mod in stm:
                 if mod is not None:
-                    if not self._instance_in_array(mod, modifiers):
-                        modifiers.append(mod)
+                    modifiers[id(mod)] = mod
 
     def _check_and_add_obj_modifier_blk(self, obj, modifiers):
-        """Check if a modifier_blk is assigned to an object and add it to a list."""
+        """Check if a modifier_blk is assigned to an object and add it to a dict.
+        """
         mod = obj.properties.radiance._modifier_blk
         if mod is not None:
-            if not self._instance_in_array(mod, modifiers):
-                modifiers.append(mod)
+            modifiers[id(mod)] = mod
 
     def _check_and_add_dynamic_obj_modifier_blk(self, obj, modifiers):
-        """Check if a modifier_blk is assigned to a dynamic object and add it to a list.
+        """Check if a modifier_blk is assigned to a dynamic object and add it to a dict.
         """
         mod = obj.properties.radiance._modifier_blk
         if mod is not None:
-            if not self._instance_in_array(mod, modifiers):
-                modifiers.append(mod)
+            modifiers[id(mod)] = mod
         for st in obj.properties.radiance._states:
             for s in st._shades:
                 mod = s.modifier
                 if mod is not None:
-                    if not self._instance_in_array(mod, modifiers):
-                        modifiers.append(mod)
+                    modifiers[id(mod)] = mod
 
     def _check_and_add_orphaned_shade_modifier(self, obj, modifiers):
-        """Check if a modifier is assigned to an object and add it to a list."""
+        """Check if a modifier is assigned to an object and add it to a dict."""
         mod = obj.properties.radiance._modifier
-        if mod is not None:
-            if not self._instance_in_array(mod, modifiers):
-                modifiers.append(mod)
-        else:
-            def_mod = generic_context if obj.is_detached else \
+        if mod is None:
+            mod = generic_context if obj.is_detached else \
                 generic_modifier_set_visible.shade_set.exterior_modifier
-            if not self._instance_in_array(def_mod, modifiers):
-                modifiers.append(def_mod)
+        modifiers[id(mod)] = mod
         for st in obj.properties.radiance._states:
             stm = (st._modifier, st._modifier_direct) + \
                 tuple(s.modifier for s in st._shades)
             for mod in stm:
                 if mod is not None:
-                    if not self._instance_in_array(mod, modifiers):
-                        modifiers.append(mod)
+                    modifiers[id(mod)] = mod
 
     def _check_and_add_shade_mesh_modifier(self, obj, modifiers):
-        """Check if a modifier is assigned to an object and add it to a list."""
+        """Check if a modifier is assigned to an object and add it to a dict."""
         mod = obj.properties.radiance._modifier
-        if mod is not None:
-            if not self._instance_in_array(mod, modifiers):
-                modifiers.append(mod)
-        else:
-            def_mod = generic_context if obj.is_detached else \
+        if mod is None:
+            mod = generic_context if obj.is_detached else \
                 generic_modifier_set_visible.shade_set.exterior_modifier
-            if not self._instance_in_array(def_mod, modifiers):
-                modifiers.append(def_mod)
+        modifiers[id(mod)] = mod
+
+    def _collect_modifiers(self):
+        """Collect all unique modifiers of the model."""
+        all_mods = self.room_modifiers + self.face_modifiers + self.shade_modifiers
+        return list(set(all_mods))
+
+    def _collect_blk_modifiers(self):
+        """Collect all unique modifier_blk of the model."""
+        modifiers = {id(black): black}
+        for face in self.host.faces:  # check all orphaned Face modifiers
+            self._check_and_add_face_modifier_blk(face, modifiers)
+        for ap in self.host.orphaned_apertures:  # check all Aperture modifiers
+            self._check_and_add_dynamic_obj_modifier_blk(ap, modifiers)
+        for dr in self.host.orphaned_doors:  # check all Door modifiers
+            self._check_and_add_dynamic_obj_modifier_blk(dr, modifiers)
+        for shade in self.host.shades:
+            self._check_and_add_dynamic_obj_modifier_blk(shade, modifiers)
+        for sm in self.host.shade_meshes:  # check all ShadeMesh modifiers
+            self._check_and_add_obj_modifier_blk(sm, modifiers)
+        return list(set(modifiers.values()))
+
+    def _collect_room_modifiers(self):
+        """Collect all unique modifiers of the Room ModifierSets."""
+        room_mods = []
+        for cnstr_set in self.modifier_sets:
+            room_mods.extend(cnstr_set.modified_modifiers_unique)
+        return list(set(room_mods))
+
+    def _collect_face_modifiers(self):
+        """Collect all unique modifiers of Faces, Apertures and Doors."""
+        modifiers = {}
+        for face in self.host.faces:  # check all orphaned Face modifiers
+            self._check_and_add_face_modifier(face, modifiers)
+        for ap in self.host.orphaned_apertures:  # check all Aperture modifiers
+            self._check_and_add_dynamic_obj_modifier(ap, modifiers)
+        for dr in self.host.orphaned_doors:  # check all Door modifiers
+            self._check_and_add_dynamic_obj_modifier(dr, modifiers)
+        return list(set(modifiers.values()))
+
+    def _collect_shade_modifiers(self):
+        """Collect all unique modifiers of Shades and ShadeMeshes."""
+        modifiers = {}
+        for room in self.host.rooms:
+            self._check_and_add_room_modifier_shade(room, modifiers)
+        for face in self.host.orphaned_faces:
+            self._check_and_add_face_modifier_shade(face, modifiers)
+        for ap in self.host.orphaned_apertures:
+            self._check_and_add_obj_modifier_shade(ap, modifiers)
+        for dr in self.host.orphaned_doors:
+            self._check_and_add_obj_modifier_shade(dr, modifiers)
+        for shade in self.host.orphaned_shades:
+            self._check_and_add_orphaned_shade_modifier(shade, modifiers)
+        for shade_mesh in self.host.shade_meshes:
+            self._check_and_add_shade_mesh_modifier(shade_mesh, modifiers)
+        return list(set(modifiers.values()))
+
+    def _collect_modifier_sets(self):
+        """Collect all unique Room-Assigned ModifierSets."""
+        modifier_sets = {}
+        for room in self.host.rooms:
+            mod_set = room.properties.radiance._modifier_set
+            if mod_set is not None:
+                modifier_sets[id(mod_set)] = mod_set
+        return list(set(modifier_sets.values()))  # catch equivalent modifier sets
+
+    def _collect_identifiers(self):
+        """Collect a dictionary of all modifiers with identifiers as keys."""
+        index = {mod.identifier: mod for mod in self.blk_modifiers}
+        index.update((mod.identifier, mod) for mod in self.modifiers)
+        return index
+
+    @staticmethod
+    def _default_modifiers():
+        """Get a list of the modifiers in the default modifier set in a fixed order."""
+        mod_set = generic_modifier_set_visible
+        modifiers = []
+        for sub_set in (mod_set.wall_set, mod_set.floor_set, mod_set.roof_ceiling_set,
+                        mod_set.aperture_set, mod_set.door_set, mod_set.shade_set):
+            modifiers.extend(getattr(sub_set, attr[1:])
+                             for attr in sorted(sub_set._slots))
+        modifiers.extend((mod_set.air_boundary_modifier, black))
+        return modifiers
+
+    @staticmethod
+    def _remap_obj_modifiers(obj, mod_map):
+        """Replace the modifiers of an object and its states using a mapping dict."""
+        props = obj.properties.radiance
+        props._modifier = mod_map.get(props._modifier, props._modifier)
+        props._modifier_blk = mod_map.get(props._modifier_blk, props._modifier_blk)
+        for st in getattr(props, '_states', ()):
+            st._modifier = mod_map.get(st._modifier, st._modifier)
+            st._modifier_direct = mod_map.get(st._modifier_direct, st._modifier_direct)
+            for s in st._shades:
+                s._modifier = mod_map.get(s._modifier, s._modifier)
+                s._modifier_direct = mod_map.get(s._modifier_direct, s._modifier_direct)
+
+    @staticmethod
+    def _remap_modifier_set(mod_set, mod_map):
+        """Get a ModifierSet with its modifiers replaced using a mapping dict.
+
+        The input ModifierSet is edited and returned unless it is locked, in which
+        case an edited copy of it is returned. The input is returned unchanged if
+        none of its modifiers are in the mapping.
+        """
+        if not any(mod in mod_map for mod in mod_set.modified_modifiers):
+            return mod_set
+        if mod_set._locked:
+            mod_set = mod_set.duplicate()
+        sub_sets = (mod_set._wall_set, mod_set._floor_set, mod_set._roof_ceiling_set,
+                    mod_set._aperture_set, mod_set._door_set, mod_set._shade_set)
+        for sub_set in sub_sets:
+            for attr in sub_set._slots:
+                mod = getattr(sub_set, attr)
+                if mod in mod_map:
+                    setattr(sub_set, attr, mod_map[mod])
+        air_mod = mod_set._air_boundary_modifier
+        mod_set._air_boundary_modifier = mod_map.get(air_mod, air_mod)
+        return mod_set
+
+    @classmethod
+    def _modifier_content_key(cls, modifier):
+        """Get a tuple for the content of a modifier that excludes its identifier."""
+        if modifier.is_void:
+            return ('void',)
+        return (modifier.__class__.__name__, modifier.type,
+                tuple(tuple(vals) for vals in modifier.values),
+                cls._modifier_content_key(modifier.modifier),
+                tuple(cls._modifier_content_key(dep)
+                      for dep in modifier.dependencies))
+
+    def _cached_modifiers(self, key, collect):
+        """Get the result of a collect function from the cache if it is in use.
+
+        Lists are returned as copies so that editing them does not edit the cache.
+        """
+        cache = self._modifier_cache
+        if cache is None:
+            return collect()
+        try:
+            result = cache[key]
+        except KeyError:
+            result = cache[key] = collect()
+        return list(result) if isinstance(result, list) else result
+
+    def _clear_modifier_cache(self):
+        """Remove all collected modifiers from the cache if it is in use."""
+        if self._modifier_cache is not None:
+            self._modifier_cache.clear()
 
     @staticmethod
     def _instance_in_array(object_instance, object_array):
@@ -1,6 +1,20 @@
 """A collection of auxiliary functions for working with radiance files and objects."""
 import re
 import os
+import json
+from array import array
+from itertools import islice
+try:
+    from StringIO import StringIO  # python 2
+except ImportError:
+    from io import StringIO
+
+_CHUNK_LINES = 100000  # number of lines that are parsed together
+_SENSOR_DEFAULTS = (0, 0, 0, 0, 0, 1)  # the defaults of Sensor.from_raw_values
+_INFO_DEPTH = 2  # folder levels that are searched for an _info.json
+_SENSOR_COUNTS = {}  # cached sensor counts for (path, mtime, size)
+_DIGITS = '0123456789'
+_CONTINUE_CHARS = _DIGITS + '.-'  # first characters of lines that continue an object
 
 
 # TODO: Add support for comments [#] and commands [!]
@@ -14,18 +28,40 @@ def parse_from_string(full_string):
         A list of strings. Each string represents a different Radiance primitive
         (geometry or modifier). Comments [#] and commands [!] are excluded.
     """
-    raw_rad_objects = re.findall(
-        r'^\s*([^0-9].*(\s*[\d.-]+.*)*)',
-        full_string,
-        re.MULTILINE)
+    return tuple(parse_from_lines(StringIO(full_string)))
 
-    rad_objects = (' '.join(radiance_object[0].split())
-                   for radiance_object in raw_rad_objects)
 
-    filtered_objects = tuple(rad_object for rad_object in rad_objects
-                             if rad_object and rad_object[0] not in ['#', '!'])
+def parse_from_lines(lines):
+    """Get a generator of strings for each object in the lines of a Radiance file.
 
-    return filtered_objects
+    The lines are tokenized in a single pass and only the lines of the current
+    object are kept in memory. So, this method can be used with an open file
+    to parse large Radiance files without reading the whole file as a string.
+
+    A line starts a new object unless it starts with a number, in which case it
+    continues the values of the previous object. Empty lines are ignored.
+
+    Args:
+        lines: An iterable of the lines of a Radiance file (eg. an open file).
+
+    Returns:
+        A generator of strings. Each string represents a different Radiance
+        primitive (geometry or modifier). Comments [#] and commands [!] are excluded.
+    """
+    tokens = None  # the tokens of the current object
+    for line in lines:
+        line_tokens = line.split()
+        if not line_tokens:
+            continue
+        first_char = line_tokens[0][0]
+        if first_char in _CONTINUE_CHARS and tokens is not None:
+            tokens.extend(line_tokens)
+        elif first_char not in _DIGITS:
+            if tokens and tokens[0][0] not in '#!':
+                yield ' '.join(tokens)
+            tokens = line_tokens
+    if tokens and tokens[0][0] not in '#!':
+        yield ' '.join(tokens)
 
 
 def parse_from_file(file_path):
@@ -50,7 +86,7 @@ def parse_from_file(file_path):
     assert os.path.isfile(file_path), "Can't find %s." % file_path
 
     with open(file_path, "r") as rad_file:
-        return parse_from_string(rad_file.read())
+        return tuple(parse_from_lines(rad_file))
 
 
 def string_to_dicts(string):
@@ -67,59 +103,79 @@ def string_to_dicts(string):
     Returns:
         A list of dictionaries.
     """
-    def find_object(target, index):
-        for o_count, other_obj in enumerate(objects[:-(index + 1)]):
-            if other_obj['identifier'] == target:
-                return o_count, other_obj
+    objects = _objects_to_dicts(parse_from_lines(StringIO(string)))
+    if not objects:
+        raise ValueError(
+            '{} includes no radiance objects.'.format(string)
+        )
+    return objects
+
+
+def file_to_dicts(file_path):
+    """Convert a radiance file to a list of primitive dictionaries.
 
-    input_objects = parse_from_string(string)
+    This is the same as string_to_dicts but the file is streamed line by line
+    such that the whole file is never loaded as one string.
 
-    if not input_objects:
+    Args:
+        file_path: Path to Radiance file.
+
+    Returns:
+        A list of dictionaries.
+    """
+    assert os.path.isfile(file_path), "Can't find %s." % file_path
+
+    with open(file_path, "r") as rad_file:
+        objects = _objects_to_dicts(parse_from_lines(rad_file))
+    if not objects:
         raise ValueError(
-            '{} includes no radiance objects.'.format(string)
+            '{} includes no radiance objects.'.format(file_path)
         )
+    return objects
 
-    # break down each object and convert it to a dict
-    objects = [string_to_dict(inp) for inp in input_objects]
 
-    # start from the last material and try to find dependencies if any)
-    rev_objects = list(reversed(objects))
-    remove_index = []
-    for count, obj in enumerate(rev_objects):
+def _objects_to_dicts(input_objects):
+    """Convert Radiance object strings to a list of nested primitive dictionaries.
 
+    The objects are indexed by identifier as they are converted and the modifier
+    and the dependencies of each object are looked up from the previous objects.
+    The objects that are used by other objects are nested inside them and are not
+    returned at the top level.
+    """
+    objects, index, used = [], {}, set()
+    for count, inp in enumerate(input_objects):
+        obj = string_to_dict(inp)
         if obj['modifier'] != 'void':
-            # try to find it in objects and add replace it
             try:
-                o_count, other_obj = find_object(obj['modifier'], count)
-            except TypeError:
-                # didn't find any
+                o_count, other_obj = index[obj['modifier']]
+            except KeyError:
                 raise ValueError(
                     'Failed to find "{}" modifier for "{}" in input string'.format(
                         obj['modifier'], obj['identifier']
                     )
                 )
+            obj['modifier'] = other_obj
+            used.add(o_count)
+
+        for value in obj['values'][0]:
+            if '(' in value or '"' in value:
+                continue
+            # search for dependencies
+            try:
+                o_count, other_obj = index[value]
+            except KeyError:
+                pass  # didn't find any
             else:
-                objects[-(count + 1)]['modifier'] = other_obj
-                remove_index.append(o_count)
-
-        if len(obj['values'][0]) != 0:
-            for value in obj['values'][0]:
-                if '(' in value or '"' in value:
-                    continue
-                # search for dependencies
-                try:
-                    o_count, other_obj = find_object(value, count)
-                except TypeError:
-                    # didn't find any
-                    pass
-                else:
-                    objects[-(count + 1)]['dependencies'].append(other_obj)
-                    remove_index.append(o_count)
-
-    if remove_index:
-        return [obj for index, obj in enumerate(objects) if index not in remove_index]
-    else:
-        return objects
+                obj['dependencies'].append(other_obj)
+                used.add(o_count)
+
+        objects.append(obj)
+        if obj['identifier'] not in index:  # the first definition takes precedence
+            index[obj['identifier']] = (count, obj)
+
+    if used:
+        return [obj for count, obj in enumerate(objects) if count not in used]
+    return objects
 
 
 # pattern one handles whitespaces inside ( )
@@ -192,23 +248,110 @@ def parse_header(filepath):
         inf.close()
 
 
+def parse_sensor_values(filepath, start_line=None, end_line=None):
+    """Parse the sensors of a sensor grid file into a flat array of floats.
+
+    The file is read in large chunks and the values of each chunk are converted in
+    one go. The returned array has 6 values (x, y, z, dx, dy, dz) for each sensor.
+    Comments [#] and empty lines will not be loaded but they are still considered in
+    the line count for the start_line and end_line inputs. Lines with less than 6
+    values will use the defaults of Sensor.from_raw_values for the missing values.
+
+    Args:
+        filepath: Full path to Radiance pts file.
+        start_line: Start line including the comments (default: 0).
+        end_line: End line as an integer including the comments
+            (default: last line in file).
+
+    Returns:
+        An array of floats with 6 values for each sensor.
+    """
+    start_line = int(start_line) if start_line is not None else 0
+    stop_line = int(end_line) + 1 if end_line is not None else None
+    values = array('d')
+    with open(filepath, 'r') as pts_file:
+        lines = islice(pts_file, start_line, stop_line)
+        while True:
+            lines_chunk = list(islice(lines, _CHUNK_LINES))
+            if not lines_chunk:
+                break
+            chunk = [ln for ln in lines_chunk if ln[0] != '#' and ln.strip()]
+            tokens = ''.join(chunk).split()
+            if len(tokens) == 6 * len(chunk):
+                values.extend(array('d', map(float, tokens)))
+                continue
+            # some of the lines do not have 6 values
+            for ln in chunk:
+                sensor = ln.split()
+                if len(sensor) > 6:
+                    raise ValueError(
+                        'A sensor must have 6 values. Found {}: {}'.format(
+                            len(sensor), ln.strip()))
+                values.extend(float(v) for v in sensor)
+                values.extend(_SENSOR_DEFAULTS[len(sensor):])
+    return values
+
+
 def sensor_count_from_file(filepath):
     """Return sensor count of a sensor grid file.
 
     This function returns the sensor count of a sensor grid file. Comments [#] and
     empty lines will not be counted.
 
+    If the file is written next to an _info.json that is not older than the file
+    and that has the size of the file next to its count (eg. the grids folder of
+    model_to_rad_folder), the count in the _info.json is used and the file is not
+    read. Counts are also cached for each file using the modified time and the
+    size of the file such that a file is only read again once it has changed.
+
     Args:
         filepath: Full path to Radiance pts file.
 
     Returns:
         sensor_count
     """
-    sensor_count = 0
-    with open(filepath, 'r') as pts_file:
-        for l in pts_file:
-            if not l.strip() or l[0] == '#':
-                pass
-            else:
-                sensor_count += 1
-    return sensor_count
\ No newline at end of file
+    stat = os.stat(filepath)
+    key = (os.path.abspath(filepath), stat.st_mtime, stat.st_size)
+    try:
+        return _SENSOR_COUNTS[key]
+    except KeyError:
+        pass
+    sensor_count = _sensor_count_from_info(filepath, stat)
+    if sensor_count is None:
+        sensor_count = 0
+        with open(filepath, 'rb') as pts_file:
+            for line in pts_file:
+                if line.strip() and line[:1] != b'#':
+                    sensor_count += 1
+    _SENSOR_COUNTS[key] = sensor_count
+    return sensor_count
+
+
+def _sensor_count_from_info(filepath, stat):
+    """Get the sensor count of a file from an _info.json in its folder or parents.
+
+    The _info.json of a grids folder has a full_id for each grid that can include
+    the group subfolder. The count is only used if the _info.json is not older than
+    the file and the size of the file matches the pts_size next to the count.
+    Returns None if there is no such count for the file.
+    """
+    folder, rel_path = os.path.split(os.path.abspath(filepath))
+    for _ in range(_INFO_DEPTH):
+        info_file = os.path.join(folder, '_info.json')
+        if os.path.isfile(info_file) and os.path.getmtime(info_file) >= stat.st_mtime:
+            try:
+                with open(info_file) as inf:
+                    grids_info = json.load(inf)
+            except ValueError:  # not a valid json file
+                grids_info = []
+            rel_path = rel_path.replace('\\', '/')
+            for info in grids_info:
+                if isinstance(info, dict) and 'count' in info and \
+                        info.get('pts_size') == stat.st_size and \
+                        '{}.pts'.format(info.get('full_id')) == rel_path:
+                    return int(info['count'])
+        folder, parent = os.path.split(folder)
+        if not parent:
+            break
+        rel_path = parent + '/' + rel_path
+    return None
@@ -0,0 +1,169 @@
+"""A spatial index to find the Room that contains a point in a model."""
+from __future__ import division
+
+import math
+
+from ladybug_geometry.geometry3d.pointvector import Point3D
+
+
+class RoomIndex(object):
+    """A uniform grid over the bounding boxes of Rooms for point-in-room queries.
+
+    Each Room is registered in all of the cells of a grid in the world XY plane that
+    its bounding box overlaps. A point is only tested against the Rooms of its cell
+    whose bounding boxes contain the point, which makes each query nearly
+    independent of the number of Rooms in the model. The final test uses the
+    is_point_inside method of the Room geometry and so the results are the same as
+    testing the point against all of the Rooms.
+
+    Args:
+        rooms: A list of honeybee Rooms. If a point is inside more than one Room
+            (eg. overlapping Rooms), the first Room in this list will be returned.
+        cell_size: An optional number for the size of the grid cells. If None, the
+            average size of the Room bounding boxes in the XY plane will be used.
+            (Default: None).
+
+    Properties:
+        * rooms
+        * cell_size
+
+    Usage:
+
+    .. code-block:: python
+
+        from ladybug_geometry.geometry3d.pointvector import Point3D
+        from honeybee.room import Room
+        from honeybee_radiance.roomindex import RoomIndex
+
+        rooms = [Room.from_box('Room_%d' % i, 5, 5, 3, origin=Point3D(5 * i, 0, 0))
+                 for i in range(10)]
+        index = RoomIndex(rooms)
+        print(index.room(Point3D(12, 1, 1)).identifier)
+
+        >> Room_2
+    """
+    __slots__ = ('_rooms', '_cell_size', '_bounds', '_cells')
+
+    def __init__(self, rooms, cell_size=None):
+        self._rooms = tuple(rooms)
+        self._bounds = tuple(
+            (room.min.x, room.min.y, room.min.z, room.max.x, room.max.y, room.max.z)
+            for room in self._rooms)
+        if cell_size is None:
+            sizes = [max(b[3] - b[0], b[4] - b[1]) for b in self._bounds]
+            cell_size = sum(sizes) / len(sizes) if sum(sizes) > 0 else 1
+        assert cell_size > 0, 'RoomIndex cell_size must be greater than 0. ' \
+            'Got {}.'.format(cell_size)
+        self._cell_size = cell_size
+
+        # register each room in the cells of its bounding box
+        self._cells = {}
+        for i, b in enumerate(self._bounds):
+            min_i, min_j = self._cell(b[0], b[1])
+            max_i, max_j = self._cell(b[3], b[4])
+            for ci in range(min_i, max_i + 1):
+                for cj in range(min_j, max_j + 1):
+                    try:
+                        self._cells[(ci, cj)].append(i)
+                    except KeyError:
+                        self._cells[(ci, cj)] = [i]
+
+    @classmethod
+    def from_model(cls, model, cell_size=None):
+        """Create a RoomIndex for all of the Rooms of a honeybee Model.
+
+        Args:
+            model: A honeybee Model.
+            cell_size: An optional number for the size of the grid cells.
+                (Default: None).
+        """
+        return cls(model.rooms, cell_size)
+
+    @property
+    def rooms(self):
+        """Get a tuple of the Rooms in the index."""
+        return self._rooms
+
+    @property
+    def cell_size(self):
+        """Get a number for the size of the grid cells."""
+        return self._cell_size
+
+    def candidates(self, point):
+        """Get the indices of the Rooms with a bounding box that contains a point.
+
+        Args:
+            point: A tuple of (x, y, z) values or a Point3D.
+
+        Returns:
+            A list of integers for the indices of the Rooms in the input order.
+        """
+        x, y, z = point[0], point[1], point[2]
+        try:
+            room_ids = self._cells[self._cell(x, y)]
+        except KeyError:  # the point is outside of all bounding boxes
+            return []
+        bounds = self._bounds
+        return [
+            i for i in room_ids
+            if bounds[i][0] <= x <= bounds[i][3] and bounds[i][1] <= y <= bounds[i][4]
+            and bounds[i][2] <= z <= bounds[i][5]
+        ]
+
+    def room_index(self, point):
+        """Get the index of the Room that contains a point.
+
+        Args:
+            point: A tuple of (x, y, z) values or a Point3D.
+
+        Returns:
+            An integer for the index of the Room or -1 if the point is not inside
+            any of the Rooms.
+        """
+        candidates = self.candidates(point)
+        if not candidates:
+            return -1
+        point = point if isinstance(point, Point3D) else Point3D(*point)
+        for i in candidates:
+            if self._rooms[i].geometry.is_point_inside(point):
+                return i
+        return -1
+
+    def room(self, point):
+        """Get the Room that contains a point.
+
+        Args:
+            point: A tuple of (x, y, z) values or a Point3D.
+
+        Returns:
+            A honeybee Room or None if the point is not inside any of the Rooms.
+        """
+        i = self.room_index(point)
+        return self._rooms[i] if i != -1 else None
+
+    def room_indices(self, points):
+        """Get the index of the Room that contains each point in a list.
+
+        Args:
+            points: A list of (x, y, z) tuples or Point3Ds.
+
+        Returns:
+            A list of integers with the index of the Room for each point. The
+            points that are not inside any of the Rooms get -1.
+        """
+        return [self.room_index(pt) for pt in points]
+
+    def _cell(self, x, y):
+        """Get the (i, j) grid cell for an X and Y coordinate."""
+        return int(math.floor(x / self._cell_size)), \
+            int(math.floor(y / self._cell_size))
+
+    def __len__(self):
+        return len(self._rooms)
+
+    def ToString(self):
+        """Overwrite .NET ToString."""
+        return self.__repr__()
+
+    def __repr__(self):
+        return 'RoomIndex: [%d rooms, %d cells]' % (len(self._rooms), len(self._cells))
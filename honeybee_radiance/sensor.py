@@ -49,6 +49,14 @@ class Sensor(object):
         """
         return cls((x, y, z), (dx, dy, dz))
 
+    @classmethod
+    def _from_tuples(cls, pos, dir):
+        """Create a sensor from tuples of 3 floats without validating them."""
+        sensor = cls.__new__(cls)
+        sensor._pos = pos
+        sensor._dir = dir
+        return sensor
+
     @property
     def pos(self):
         """Get or set the position of the sensor as a tuple of 3 (x, y, z) numbers."""
@@ -129,8 +137,21 @@ class Sensor(object):
         """Overwrite .NET ToString."""
         return self.__repr__()
 
-    def to_radiance(self):
-        """Return Radiance string for a test point."""
+    def to_radiance(self, precision=None):
+        """Return Radiance string for a test point.
+
+        Args:
+            precision: An optional integer for the number of decimal places to
+                which the position is rounded. The direction is always written
+                with full precision since rounding a unit vector changes the angle
+                of the sensor. If None, the position is written with full
+                precision. (Default: None).
+        """
+        if precision is not None:
+            return '%s %s' % (
+                ' '.join(str(round(v, precision)) for v in self.pos),
+                ' '.join(str(v) for v in self.dir)
+            )
         return '%s %s' % (
             ' '.join(str(v) for v in self.pos),
             ' '.join(str(v) for v in self.dir)
@@ -3,6 +3,8 @@ from __future__ import division
 
 from .sensor import Sensor
 from .lightpath import light_path_from_room
+from .roomindex import RoomIndex
+from .reader import parse_sensor_values
 
 from honeybee.facetype import AirBoundary
 import honeybee.typing as typing
@@ -14,15 +16,23 @@ from ladybug_geometry.geometry3d.mesh import Mesh3D
 import os
 import json
 import math
+from array import array
 try:
     from itertools import izip as zip
 except ImportError:  # python 3
     pass
 
+_BLOCK_SIZE = 10000  # number of sensors that are formatted together
+
 
 class SensorGrid(object):
     """A grid of sensors.
 
+    Sensor grids that are created with the from_* classmethods store the positions
+    and directions of all sensors in a single array of floats and the Sensor objects
+    are only created when the sensors are indexed or iterated over. Until then,
+    the transforms and the serialization methods work directly on this array.
+
     Args:
         identifier: Text string for a unique SensorGrid ID. Must not contain spaces
             or special characters. This will be used to identify the object in the
@@ -43,8 +53,9 @@ class SensorGrid(object):
         * full_identifier
     """
 
-    __slots__ = ('_identifier', '_display_name', '_sensors', '_room_identifier',
-                 '_light_path', '_mesh', '_base_geometry', '_group_identifier')
+    __slots__ = ('_identifier', '_display_name', '_sensors', '_values',
+                 '_room_identifier', '_light_path', '_mesh', '_base_geometry',
+                 '_group_identifier')
 
     def __init__(self, identifier, sensors):
         """Initialize a SensorGrid."""
@@ -75,8 +86,11 @@ class SensorGrid(object):
         """
         assert ag_dict['type'] == 'SensorGrid', \
             'Expected SensorGrid dictionary. Got {}.'.format(ag_dict['type'])
-        sensors = (Sensor.from_dict(sensor) for sensor in ag_dict['sensors'])
-        new_obj = cls(identifier=ag_dict["identifier"], sensors=sensors)
+        values = array('d')
+        for sensor in ag_dict['sensors']:
+            values.extend(_vector_values(sensor.get('pos')))
+            values.extend(_vector_values(sensor.get('dir'), (0, 0, 1)))
+        new_obj = cls._from_values(ag_dict['identifier'], values)
         if 'display_name' in ag_dict and ag_dict['display_name'] is not None:
             new_obj.display_name = ag_dict['display_name']
         if 'room_identifier' in ag_dict and ag_dict['room_identifier'] is not None:
@@ -103,8 +117,12 @@ class SensorGrid(object):
             positions: A list of (x, y ,z) tuples for position of sensors.
             plane_normal: (x, y, z) tuples for direction of sensors.
         """
-        sg = (Sensor(pt, plane_normal) for pt in positions)
-        return cls(identifier, sg)
+        direction = _vector_values(plane_normal, (0, 0, 1))
+        values = array('d')
+        for pt in positions:
+            values.extend(_vector_values(pt))
+            values.extend(direction)
+        return cls._from_values(identifier, values)
 
     @classmethod
     def from_position_and_direction(cls, identifier, positions, directions):
@@ -120,8 +138,11 @@ class SensorGrid(object):
             positions: A list of (x, y ,z) tuples for position of sensors.
             directions: A list of (x, y, z) tuples for direction of sensors.
         """
-        sg = tuple(Sensor(pt, v) for pt, v in zip(positions, directions))
-        return cls(identifier, sg)
+        values = array('d')
+        for pt, v in zip(positions, directions):
+            values.extend(_vector_values(pt))
+            values.extend(_vector_values(v, (0, 0, 1)))
+        return cls._from_values(identifier, values)
 
     @classmethod
     def from_mesh3d(cls, identifier, mesh):
@@ -219,8 +240,13 @@ class SensorGrid(object):
         vw_vecs = [start_vector.rotate_xy(i * inc_ang) for i in range(dir_count)]
         vw_vecs = [(round(v.x, 5), round(v.y, 5), round(v.z, 3)) for v in vw_vecs]
         # set up the sensor grid object
-        sensors = tuple(Sensor(pt, v) for pt in positions for v in vw_vecs)
-        sg = cls(identifier, sensors)
+        values = array('d')
+        for pt in positions:
+            pt = _vector_values(pt)
+            for v in vw_vecs:
+                values.extend(pt)
+                values.extend(v)
+        sg = cls._from_values(identifier, values)
         # generate the mesh if it was requested
         if mesh_radius > 0:
             sg.mesh = cls.radial_positions_mesh(
@@ -273,7 +299,9 @@ class SensorGrid(object):
 
         The lines that start with # will be considred as commented lines and won't be
         loaded. However, these commented lines are still considered in total line
-        count for the start_line and end_line inputs.
+        count for the start_line and end_line inputs. Empty lines are skipped the
+        same way. The file is parsed in large chunks and it is much faster than
+        creating a Sensor for each line.
 
         Args:
             file_path: Full path to sensors file
@@ -289,28 +317,8 @@ class SensorGrid(object):
             raise IOError("Can't find {}.".format(file_path))
         identifier = identifier or os.path.split(os.path.splitext(file_path)[0])[-1]
 
-        start_line = int(start_line) if start_line is not None else 0
-        try:
-            end_line = int(end_line)
-        except TypeError:
-            end_line = float('+inf')
-
-        line_count = end_line - start_line + 1
-
-        sensors = []
-        with open(file_path, 'r') as inf:
-            for _ in range(start_line):
-                next(inf)
-
-            for count, l in enumerate(inf):
-                if not count < line_count:
-                    break
-                if not l or l[0] == '#':
-                    # commented line
-                    continue
-                sensors.append(Sensor.from_raw_values(*l.split()))
-
-        return cls(identifier, sensors)
+        values = parse_sensor_values(file_path, start_line, end_line)
+        return cls._from_values(identifier, values)
 
     @classmethod
     def from_merged_grids(cls, grids):
@@ -330,9 +338,9 @@ class SensorGrid(object):
             assert isinstance(grid, SensorGrid), 'Expected  SensorGrid for ' \
                 'from_merged_grids. Got {}.'.format(type(grid))
         # merge the sensors, meshes, and base geometry together
-        sensors, meshes, base_geo = [], [], []
+        values, meshes, base_geo = array('d'), [], []
         for grid in grids:
-            sensors.extend(grid.sensors)
+            values.extend(grid._sensor_values())
             if grid.mesh is not None:
                 meshes.extend(grid.mesh)
             if grid.base_geometry is not None:
@@ -340,7 +348,7 @@ class SensorGrid(object):
         mesh = Mesh3D.join_meshes(meshes) if len(meshes) == len(grids) else None
         base_geo = tuple(base_geo) if len(base_geo) != 0 else None
         # create the new grid and set all properties based on the first one
-        new_grid = cls(grids[0].identifier, sensors)
+        new_grid = cls._from_values(grids[0].identifier, values)
         new_grid.mesh = mesh
         new_grid.base_geometry = base_geo
         new_grid._display_name = grids[0]._display_name
@@ -349,6 +357,14 @@ class SensorGrid(object):
         new_grid._light_path = grids[0]._light_path
         return new_grid
 
+    @classmethod
+    def _from_values(cls, identifier, values):
+        """Create a sensor grid from an array of 6 floats for each sensor."""
+        new_obj = cls(identifier, ())
+        new_obj._sensors = None
+        new_obj._values = values
+        return new_obj
+
     @property
     def identifier(self):
         """Get or set text for a unique SensorGrid identifier."""
@@ -378,11 +394,19 @@ class SensorGrid(object):
     @property
     def sensors(self):
         """Get or set a tuple of Sensor objects for the grid sensors."""
+        if self._sensors is None:  # create the sensors from the array of values
+            values = self._values
+            self._sensors = tuple(
+                Sensor._from_tuples(tuple(values[i:i + 3]), tuple(values[i + 3:i + 6]))
+                for i in range(0, len(values), 6)
+            )
+            self._values = None  # the sensors can be edited from now on
         return self._sensors
 
     @sensors.setter
     def sensors(self, value):
         self._sensors = tuple(value)
+        self._values = None
         for sen in self._sensors:
             if not isinstance(sen, Sensor):
                 raise ValueError(
@@ -391,16 +415,24 @@ class SensorGrid(object):
     @property
     def positions(self):
         """Get a generator of sensor positions as x, y, z."""
-        return (ap.pos for ap in self.sensors)
+        if self._values is not None:
+            values = self._values
+            return (tuple(values[i:i + 3]) for i in range(0, len(values), 6))
+        return (ap.pos for ap in self._sensors)
 
     @property
     def directions(self):
         """Get a generator of sensor directions as x, y , z."""
-        return (ap.dir for ap in self.sensors)
+        if self._values is not None:
+            values = self._values
+            return (tuple(values[i + 3:i + 6]) for i in range(0, len(values), 6))
+        return (ap.dir for ap in self._sensors)
 
     @property
     def count(self):
         """Get the number of sensors."""
+        if self._values is not None:
+            return len(self._values) // 6
         return len(self._sensors)
 
     @property
@@ -544,7 +576,7 @@ class SensorGrid(object):
 
         return base
 
-    def enclosure_info_dict(self, model, air_boundary_distance=0):
+    def enclosure_info_dict(self, model, air_boundary_distance=0, room_index=None):
         """Get a dictionary with information about sensor relation to rooms.
 
         This can be written as a JSON in order to map sensors with appropriate
@@ -557,19 +589,32 @@ class SensorGrid(object):
                 air boundaries over which values should be interpolated.
                 Using 0 will assume a hard edge between Rooms of the same
                 radiant enclosures. (Default: 0).
+            room_index: An optional RoomIndex for the rooms of the model. Passing
+                the same RoomIndex avoids building it again when the enclosure info
+                of several grids in the same model is calculated. If None, a
+                RoomIndex will be created from the model. (Default: None).
         """
         # setup rooms and lists to check enclosure info
         enclosures, sensor_indices, air_bound_proximity = {}, [], {}
         has_indoor, has_outdoor = False, False
-        rooms = model._rooms
-        if self.room_identifier:  # put the assigned room first for faster calculation
-            rooms = model.rooms_by_identifier([self.room_identifier]) + rooms
+        if room_index is None:
+            room_index = RoomIndex.from_model(model)
+        rooms = room_index.rooms
+        assigned_room = None
+        if self.room_identifier:  # test the assigned room first for faster calculation
+            assigned_room = model.rooms_by_identifier([self.room_identifier])[0]
 
         # have a dictionary to track proximity to AirBoundary faces
         model_ab = {}
-        for room in rooms:
-            model_ab[room.identifier] = \
-                [f for f in room.faces if isinstance(f.type, AirBoundary)]
+
+        def _room_air_boundaries(room):
+            """Get the AirBoundary Faces of a room."""
+            try:
+                return model_ab[room.identifier]
+            except KeyError:  # the first time that this room is needed
+                model_ab[room.identifier] = \
+                    [f for f in room.faces if isinstance(f.type, AirBoundary)]
+                return model_ab[room.identifier]
 
         def _air_boundary_info(distance, face, room_index):
             """Method to perform interpolation across AirBoundary Faces."""
@@ -583,39 +628,43 @@ class SensorGrid(object):
             return {room_index: fac_1, adj_i: 1 - fac_1}
 
         # loop through the sensors and verify the room that they belong to
-        for i, sensor in enumerate(self.sensors):
-            sensor_pt = Point3D(*sensor.pos)
-            for room in rooms:
-                if room.geometry.is_point_inside(sensor_pt):
-                    # add the room index of the sensor
-                    try:
-                        sensor_indices.append(enclosures[room.identifier])
-                    except KeyError:  # the first time that this room is needed
-                        enclosures[room.identifier] = len(enclosures)
-                        sensor_indices.append(enclosures[room.identifier])
-                    has_indoor = True
-                    # test if the sensor is near any AriBoundary faces
-                    air_b = model_ab[room.identifier]
-                    if air_boundary_distance > 0 and len(air_b) != 0:
-                        for face in air_b:
-                            fg = face.geometry
-                            close_pt = fg._plane.closest_point(sensor_pt)
-                            p_dist = sensor_pt.distance_to_point(close_pt)
-                            if p_dist <= air_boundary_distance:
-                                close_pt_2d = fg._plane.xyz_to_xy(close_pt)
-                                g_dist = fg.polygon2d.distance_to_point(close_pt_2d)
-                                f_dist = math.sqrt(p_dist ** 2 + g_dist ** 2)
-                                if f_dist <= air_boundary_distance:
-                                    ab_info = _air_boundary_info(
-                                        f_dist, face, sensor_indices[-1])
-                                    try:
-                                        air_bound_proximity[i].append(ab_info)
-                                    except KeyError:
-                                        air_bound_proximity[i] = [ab_info]
-                    break  # we found the room and we don't need to iterate
-            else:  # the sensor is completely outside and not a part of a room
-                sensor_indices.append(-1)
-                has_outdoor = True
+        for i, sensor_pos in enumerate(self.positions):
+            sensor_pt = Point3D(*sensor_pos)
+            if assigned_room is not None and \
+                    assigned_room.geometry.is_point_inside(sensor_pt):
+                room = assigned_room
+            else:
+                room_i = room_index.room_index(sensor_pt)
+                if room_i == -1:  # the sensor is completely outside of the rooms
+                    sensor_indices.append(-1)
+                    has_outdoor = True
+                    continue
+                room = rooms[room_i]
+
+            # add the room index of the sensor
+            try:
+                sensor_indices.append(enclosures[room.identifier])
+            except KeyError:  # the first time that this room is needed
+                enclosures[room.identifier] = len(enclosures)
+                sensor_indices.append(enclosures[room.identifier])
+            has_indoor = True
+            # test if the sensor is near any AriBoundary faces
+            if air_boundary_distance > 0:
+                for face in _room_air_boundaries(room):
+                    fg = face.geometry
+                    close_pt = fg._plane.closest_point(sensor_pt)
+                    p_dist = sensor_pt.distance_to_point(close_pt)
+                    if p_dist <= air_boundary_distance:
+                        close_pt_2d = fg._plane.xyz_to_xy(close_pt)
+                        g_dist = fg.polygon2d.distance_to_point(close_pt_2d)
+                        f_dist = math.sqrt(p_dist ** 2 + g_dist ** 2)
+                        if f_dist <= air_boundary_distance:
+                            ab_info = _air_boundary_info(
+                                f_dist, face, sensor_indices[-1])
+                            try:
+                                air_bound_proximity[i].append(ab_info)
+                            except KeyError:
+                                air_bound_proximity[i] = [ab_info]
 
         # write out the enclosure info JSON
         mapper = sorted(enclosures, key=enclosures.__getitem__)
@@ -627,11 +676,20 @@ class SensorGrid(object):
             'air_bound_proximity': air_bound_proximity
         }
 
-    def to_radiance(self):
-        """Return sensors grid as a Radiance string."""
-        return "\n".join((ap.to_radiance() for ap in self._sensors))
+    def to_radiance(self, precision=None):
+        """Return sensors grid as a Radiance string.
 
-    def to_file(self, folder, file_name=None, mkdir=False, ignore_group=False):
+        Args:
+            precision: An optional integer for the number of decimal places to
+                which the sensor positions are rounded. Rounded values are written
+                without trailing zeros. The directions are always written with
+                full precision. If None, the positions are written with full
+                precision. (Default: None).
+        """
+        return ''.join(self._radiance_blocks(precision=precision))[:-1]
+
+    def to_file(self, folder, file_name=None, mkdir=False, ignore_group=False,
+                precision=None):
         """Write this sensor grid to a Radiance sensors file.
 
         Args:
@@ -642,6 +700,8 @@ class SensorGrid(object):
                 doesn't exist already. (Default: False).
             ignore_group: A boolean to indicate if creating a new subfolder for sensor
                 group should be ignored. (Default: False).
+            precision: An optional integer for the number of decimal places to
+                which the sensor positions are rounded. (Default: None).
 
         Returns:
             Full path to newly created file.
@@ -653,8 +713,7 @@ class SensorGrid(object):
             folder = os.path.normpath(os.path.join(folder, self.group_identifier))
             mkdir = True  # in most cases the subfolder does not exist already
 
-        return futil.write_to_file_by_name(
-            folder, identifier, self.to_radiance() + '\n', mkdir)
+        return self._write_blocks(folder, identifier, mkdir, precision=precision)
 
     def to_files(self, folder, count, base_name=None, mkdir=False):
         """Split this sensor grid and write them to several files.
@@ -688,16 +747,13 @@ class SensorGrid(object):
             ]
         # calculate sensor count in each file
         sc = int(round(self.count / count))
-        sensors = iter(self._sensors)
         for fc in range(count - 1):
             name = '%s_%04d.pts' % (base_name, fc)
-            content = '\n'.join((next(sensors).to_radiance() for _ in range(sc)))
-            futil.write_to_file_by_name(folder, name, content + '\n', mkdir)
+            self._write_blocks(folder, name, mkdir, fc * sc, (fc + 1) * sc)
 
         # write whatever is left to the last file
         name = '%s_%04d.pts' % (base_name, count - 1)
-        content = '\n'.join((sensor.to_radiance() for sensor in sensors))
-        futil.write_to_file_by_name(folder, name, content + '\n', mkdir)
+        self._write_blocks(folder, name, mkdir, (count - 1) * sc)
 
         grids_info = []
 
@@ -723,7 +779,8 @@ class SensorGrid(object):
         base = {
             'type': 'SensorGrid',
             'identifier': self.identifier,
-            'sensors': [sen.to_dict() for sen in self.sensors]
+            'sensors': [{'pos': pos, 'dir': dir} for pos, dir in
+                        zip(self.positions, self.directions)]
         }
         if self._display_name is not None:
             base['display_name'] = self.display_name
@@ -807,8 +864,13 @@ class SensorGrid(object):
             moving_vec: A ladybug_geometry Vector3D with the direction and distance
                 to move the sensor.
         """
-        for sens in self._sensors:
-            sens.move(moving_vec)
+        if self._values is not None:
+            _transform_values(
+                self._values, lambda x, y, z: (
+                    x + moving_vec.x, y + moving_vec.y, z + moving_vec.z))
+        else:
+            for sens in self._sensors:
+                sens.move(moving_vec)
         if self._mesh is not None:
             self._mesh = self._mesh.move(moving_vec)
         if self._base_geometry is not None:
@@ -824,9 +886,17 @@ class SensorGrid(object):
             origin: A ladybug_geometry Point3D for the origin around which the
                 object will be rotated.
         """
-        for sens in self._sensors:
-            sens.rotate(axis, angle, origin)
         r_angle = math.radians(angle)
+        if self._values is not None:
+            ox, oy, oz = origin.x, origin.y, origin.z
+            _transform_values(
+                self._values,
+                lambda x, y, z: _offset(_rotate(x - ox, y - oy, z - oz, axis, r_angle),
+                                        ox, oy, oz),
+                lambda x, y, z: _rotate(x, y, z, axis, r_angle))
+        else:
+            for sens in self._sensors:
+                sens.rotate(axis, angle, origin)
         if self._mesh is not None:
             self._mesh = self._mesh.rotate(axis, r_angle, origin)
         if self._base_geometry is not None:
@@ -841,9 +911,17 @@ class SensorGrid(object):
             origin: A ladybug_geometry Point3D for the origin around which the
                 object will be rotated.
         """
-        for sens in self._sensors:
-            sens.rotate_xy(angle, origin)
         r_angle = math.radians(angle)
+        if self._values is not None:
+            ox, oy, oz = origin.x, origin.y, origin.z
+            _transform_values(
+                self._values,
+                lambda x, y, z: _offset(
+                    _rotate_xy(x - ox, y - oy, z - oz, r_angle), ox, oy, oz),
+                lambda x, y, z: _rotate_xy(x, y, z, r_angle))
+        else:
+            for sens in self._sensors:
+                sens.rotate_xy(angle, origin)
         if self._mesh is not None:
             self._mesh = self._mesh.rotate_xy(r_angle, origin)
         if self._base_geometry is not None:
@@ -857,8 +935,16 @@ class SensorGrid(object):
             plane: A ladybug_geometry Plane across which the object will
                 be reflected.
         """
-        for sens in self._sensors:
-            sens.reflect(plane)
+        if self._values is not None:
+            n, o = plane.n, plane.o
+            _transform_values(
+                self._values,
+                lambda x, y, z: _offset(
+                    _reflect(x - o.x, y - o.y, z - o.z, n), o.x, o.y, o.z),
+                lambda x, y, z: _reflect(x, y, z, n))
+        else:
+            for sens in self._sensors:
+                sens.reflect(plane)
         if self._mesh is not None:
             self._mesh = self._mesh.reflect(plane.n, plane.o)
         if self._base_geometry is not None:
@@ -873,14 +959,75 @@ class SensorGrid(object):
             origin: A ladybug_geometry Point3D representing the origin from which
                 to scale. If None, it will be scaled from the World origin (0, 0, 0).
         """
-        for sens in self._sensors:
-            sens.scale(factor, origin)
+        if self._values is not None:
+            if origin is None:
+                _transform_values(
+                    self._values, lambda x, y, z: (x * factor, y * factor, z * factor))
+            else:
+                ox, oy, oz = origin.x, origin.y, origin.z
+                _transform_values(
+                    self._values, lambda x, y, z: (
+                        factor * (x - ox) + ox, factor * (y - oy) + oy,
+                        factor * (z - oz) + oz))
+        else:
+            for sens in self._sensors:
+                sens.scale(factor, origin)
         if self._mesh is not None:
             self._mesh = self._mesh.scale(factor, origin)
         if self._base_geometry is not None:
             self._base_geometry = \
                 tuple(face.scale(factor, origin) for face in self._base_geometry)
 
+    def sort_by_hilbert_curve(self, tolerance=None):
+        """Sort the sensors along a 3D Hilbert curve and optionally remove duplicates.
+
+        Sensors that are close to each other in space will be close to each other in
+        the sorted grid. This improves the reuse of the ambient cache and the
+        octree traversal when the grid is run with rtrace using irradiance caching.
+        If the grid has a mesh that is aligned with the faces, the faces are sorted
+        too. Otherwise, the mesh is removed from the grid.
+
+        Args:
+            tolerance: An optional number for the distance within which sensors with
+                the same direction are considered duplicates. Only the first of
+                the duplicated sensors will be kept. Use 0 to only remove exact
+                duplicates. If None, no sensor will be removed. (Default: None).
+
+        Returns:
+            A list with an integer for each sensor in the original grid that is the
+            index of the sensor in the sorted grid. The results of the sorted grid
+            can be mapped back to the original order using this list, where the
+            results of duplicated sensors are the results of the kept sensor.
+        """
+        values = self._sensor_values()
+        count = len(values) // 6
+        if tolerance is None:
+            kept, duplicates = list(range(count)), list(range(count))
+        else:
+            kept, duplicates = _remove_duplicates(values, tolerance)
+
+        # sort the kept sensors by their index along the Hilbert curve
+        order = sorted(kept, key=_hilbert_keys(values, kept).__getitem__)
+        new_index = [0] * count
+        for i, sen_i in enumerate(order):
+            new_index[sen_i] = i
+        mapping = [new_index[sen_i] for sen_i in duplicates]
+
+        if self._values is not None:
+            new_values = array('d')
+            for sen_i in order:
+                new_values.extend(values[sen_i * 6:sen_i * 6 + 6])
+            self._values = new_values
+        else:
+            self._sensors = tuple(self._sensors[sen_i] for sen_i in order)
+        if self._mesh is not None:
+            if len(self._mesh.faces) == count:
+                faces = self._mesh.faces
+                self._mesh = Mesh3D(self._mesh.vertices, [faces[i] for i in order])
+            else:  # the mesh is aligned with the vertices
+                self._mesh = None
+        return mapping
+
     def duplicate(self):
         """Get a copy of this object."""
         return self.__copy__()
@@ -957,16 +1104,72 @@ class SensorGrid(object):
             v_count += (dir_count + 1)
         return Mesh3D(verts, faces)
 
+    def _sensor_values(self):
+        """Get an array with 6 floats for the position and direction of each sensor."""
+        if self._values is not None:
+            return self._values
+        values = array('d')
+        for sen in self._sensors:
+            values.extend(sen.pos)
+            values.extend(sen.dir)
+        return values
+
+    def _radiance_blocks(self, start=0, end=None, precision=None):
+        """Get a generator of Radiance strings for blocks of sensors.
+
+        Each block is formatted at once and ends with a new line.
+
+        Args:
+            start: Index of the first sensor. (Default: 0).
+            end: Index after the last sensor. (Default: None).
+            precision: An optional integer for the number of decimal places to
+                which the sensor positions are rounded. (Default: None).
+        """
+        end = self.count if end is None else min(end, self.count)
+        if self._values is not None:
+            values = self._values
+            for st in range(start, end, _BLOCK_SIZE):
+                block_end = min(st + _BLOCK_SIZE, end)
+                block = values[st * 6:block_end * 6]
+                # only round the positions since the directions are unit vectors
+                block = tuple(block) if precision is None else tuple(
+                    round(v, precision) if i % 6 < 3 else v
+                    for i, v in enumerate(block))
+                yield ('%s %s %s %s %s %s\n' * (block_end - st)) % block
+        else:
+            sensors = self._sensors
+            for st in range(start, end, _BLOCK_SIZE):
+                block = sensors[st:min(st + _BLOCK_SIZE, end)]
+                yield '\n'.join(sen.to_radiance(precision) for sen in block) + '\n'
+
+    def _write_blocks(self, folder, file_name, mkdir=False, start=0, end=None,
+                      precision=None):
+        """Write a range of sensors to a file in blocks and return the file path."""
+        if not os.path.isdir(folder):
+            if mkdir:
+                futil.preparedir(folder)
+            elif not futil.preparedir(folder, False):
+                raise ValueError('Failed to find %s.' % folder)
+        file_path = os.path.join(folder, file_name)
+        with open(file_path, 'w') as outf:
+            for block in self._radiance_blocks(start, end, precision):
+                outf.write(block)
+        return file_path
+
     def __len__(self):
         """Number of sensors in this grid."""
-        return len(self.sensors)
+        return self.count
 
     def __getitem__(self, index):
         """Get a sensor for an index."""
         return self.sensors[index]
 
     def __copy__(self):
-        new_obj = SensorGrid(self.identifier, (sen.duplicate() for sen in self.sensors))
+        if self._values is not None:
+            new_obj = SensorGrid._from_values(self.identifier, array('d', self._values))
+        else:
+            new_obj = SensorGrid(
+                self.identifier, (sen.duplicate() for sen in self._sensors))
         new_obj._display_name = self._display_name
         new_obj._room_identifier = self._room_identifier
         new_obj.group_identifier = self.group_identifier
@@ -979,7 +1182,9 @@ class SensorGrid(object):
         """A tuple based on the object properties, useful for hashing."""
         return (
             self.identifier, self._display_name, self._room_identifier,
-            self._room_identifier) + tuple(hash(sensor) for sensor in self.sensors)
+            self._room_identifier) + tuple(
+                hash((hash(pos), hash(dir))) for pos, dir in
+                zip(self.positions, self.directions))
 
     def __hash__(self):
         return hash(self.__key())
@@ -1005,4 +1210,164 @@ class SensorGrid(object):
 
     def __repr__(self):
         """Get the string representation of the sensor grid."""
-        return 'SensorGrid: {} [{} sensors]'.format(self.display_name, len(self.sensors))
+        return 'SensorGrid: {} [{} sensors]'.format(self.display_name, self.count)
+
+
+def _vector_values(value, default=(0, 0, 0)):
+    """Get a tuple of 3 floats from a position or a direction."""
+    if value is None:
+        return default
+    return typing.tuple_with_length(value)
+
+
+def _transform_values(values, pos_func, dir_func=None):
+    """Transform the positions and directions in an array of sensor values in place.
+
+    Args:
+        values: An array with 6 floats for the position and direction of each sensor.
+        pos_func: A function that takes the x, y, z of a position and returns the
+            transformed x, y, z.
+        dir_func: An optional function that takes the x, y, z of a direction and
+            returns the transformed x, y, z. If None, directions are not changed.
+    """
+    for i in range(0, len(values), 6):
+        values[i:i + 3] = array('d', pos_func(*values[i:i + 3]))
+        if dir_func is not None:
+            values[i + 3:i + 6] = array('d', dir_func(*values[i + 3:i + 6]))
+
+
+def _offset(xyz, ox, oy, oz):
+    """Add an origin to a tuple of x, y, z."""
+    return xyz[0] + ox, xyz[1] + oy, xyz[2] + oz
+
+
+def _rotate(x, y, z, axis, angle):
+    """Rotate x, y, z around an axis using the same math as ladybug_geometry."""
+    u, v, w = axis.x, axis.y, axis.z
+    r2 = u ** 2 + v ** 2 + w ** 2
+    r = math.sqrt(r2)
+    ct = math.cos(angle)
+    st = math.sin(angle) / r
+    dt = (u * x + v * y + w * z) * (1 - ct) / r2
+    return (u * dt + x * ct + (-w * y + v * z) * st,
+            v * dt + y * ct + (w * x - u * z) * st,
+            w * dt + z * ct + (-v * x + u * y) * st)
+
+
+def _rotate_xy(x, y, z, angle):
+    """Rotate x, y, z counterclockwise in the XY plane."""
+    cos_a = math.cos(angle)
+    sin_a = math.sin(angle)
+    return cos_a * x - sin_a * y, sin_a * x + cos_a * y, z
+
+
+def _reflect(x, y, z, normal):
+    """Reflect x, y, z across a plane with a normalized normal vector."""
+    d = 2 * (x * normal.x + y * normal.y + z * normal.z)
+    return x - d * normal.x, y - d * normal.y, z - d * normal.z
+
+
+def _remove_duplicates(values, tolerance):
+    """Find the duplicated sensors within a tolerance in an array of sensor values.
+
+    Returns a list with the indices of the sensors that are kept and a list with
+    the index of the kept sensor for each sensor in the array.
+    """
+    kept, duplicates, cells = [], [], {}
+    size = tolerance if tolerance > 0 else 1
+    for sen_i in range(len(values) // 6):
+        sensor = values[sen_i * 6:sen_i * 6 + 6]
+        cell = tuple(int(math.floor(v / size)) for v in sensor[:3])
+        match = None
+        if tolerance > 0:  # look for sensors in the neighboring cells
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    for dz in (-1, 0, 1):
+                        n_cell = (cell[0] + dx, cell[1] + dy, cell[2] + dz)
+                        for k_i in cells.get(n_cell, ()):
+                            other = values[k_i * 6:k_i * 6 + 6]
+                            if _distance(sensor[:3], other[:3]) <= tolerance and \
+                                    _distance(sensor[3:], other[3:]) <= tolerance:
+                                match = k_i
+                                break
+                        if match is not None:
+                            break
+                    if match is not None:
+                        break
+                if match is not None:
+                    break
+        else:
+            for k_i in cells.get(cell, ()):
+                if values[k_i * 6:k_i * 6 + 6] == sensor:
+                    match = k_i
+                    break
+        if match is None:
+            match = sen_i
+            kept.append(sen_i)
+            try:
+                cells[cell].append(sen_i)
+            except KeyError:
+                cells[cell] = [sen_i]
+        duplicates.append(match)
+    return kept, duplicates
+
+
+def _distance(pt_1, pt_2):
+    """Get the distance between two lists of 3 values."""
+    return math.sqrt(sum((a - b) ** 2 for a, b in zip(pt_1, pt_2)))
+
+
+def _hilbert_keys(values, sensors, bits=16):
+    """Get a dictionary with the index along a 3D Hilbert curve for a list of sensors.
+
+    The positions are scaled uniformly to fit a cube with 2 ** bits cells on each side.
+    """
+    if not sensors:
+        return {}
+    mins = [min(values[i * 6 + k] for i in sensors) for k in range(3)]
+    extent = max(max(values[i * 6 + k] for i in sensors) - mins[k] for k in range(3))
+    scale = ((1 << bits) - 1) / extent if extent > 0 else 0
+    return {
+        i: _hilbert_index(
+            [int((values[i * 6 + k] - mins[k]) * scale) for k in range(3)], bits)
+        for i in sensors
+    }
+
+
+def _hilbert_index(coords, bits):
+    """Get the index of a point with integer coordinates along a Hilbert curve.
+
+    This is the algorithm of J. Skilling (2004) to transpose the coordinates to the
+    Hilbert index, which works for any number of dimensions.
+    """
+    x = list(coords)
+    n = len(x)
+    # inverse undo excess work
+    q = 1 << (bits - 1)
+    while q > 1:
+        p = q - 1
+        for i in range(n):
+            if x[i] & q:
+                x[0] ^= p
+            else:
+                t = (x[0] ^ x[i]) & p
+                x[0] ^= t
+                x[i] ^= t
+        q >>= 1
+    # gray encode
+    for i in range(1, n):
+        x[i] ^= x[i - 1]
+    t = 0
+    q = 1 << (bits - 1)
+    while q > 1:
+        if x[n - 1] & q:
+            t ^= q - 1
+        q >>= 1
+    for i in range(n):
+        x[i] ^= t
+    # interleave the bits of the transposed coordinates
+    index = 0
+    for b in range(bits - 1, -1, -1):
+        for i in range(n):
+            index = (index << 1) | ((x[i] >> b) & 1)
+    return index
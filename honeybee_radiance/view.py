@@ -862,11 +862,21 @@ class View(object):
 
         return _views
 
-    def to_radiance(self):
-        """Return full Radiance definition as a string."""
+    def to_radiance(self, precision=None):
+        """Return full Radiance definition as a string.
+
+        Args:
+            precision: An optional integer for the number of decimal places to
+                which the position is rounded. The direction and up vector are
+                always written with full precision since rounding them changes
+                the angles of the view. If None, the position is written with
+                full precision. (Default: None).
+        """
+        vp = self.vp if precision is None else '-vp %s' % ' '.join(
+            str(round(v, precision)) for v in self.position)
         # create base information of view
         view_options = ' '.join((
-            self.vt, self.vp, self.vd, self.vu,
+            self.vt, vp, self.vd, self.vu,
             self.vh, self.vv, self.vs, self.vl,
             self.vo, self.va
         ))
@@ -920,7 +930,7 @@ class View(object):
             base['group_identifier'] = self.group_identifier
         return base
 
-    def to_file(self, folder, file_name=None, mkdir=False):
+    def to_file(self, folder, file_name=None, mkdir=False, precision=None):
         """Save view to a file.
 
         Args:
@@ -928,6 +938,8 @@ class View(object):
             file_name: Optional file name without extension (Default: self.identifier).
             mkdir: A boolean to indicate if the folder should be created in case it
                 doesn't exist already (Default: False).
+            precision: An optional integer for the number of decimal places to
+                which the position of the view is rounded. (Default: None).
 
         Returns:
             Full path to newly created file.
@@ -937,7 +949,7 @@ class View(object):
         if not (identifier.endswith('.vf') or identifier.endswith('.unf')):
             identifier += '.vf'
         # add rvu before the view itself
-        content = 'rvu ' + self.to_radiance()
+        content = 'rvu ' + self.to_radiance(precision)
         return futil.write_to_file_by_name(folder, identifier, content, mkdir)
 
     def move(self, moving_vec):
@@ -3,6 +3,7 @@
 from honeybee_radiance.sensorgrid import SensorGrid
 from ladybug.futil import write_to_file_by_name, preparedir
 from honeybee.config import folders
+from honeybee_radiance.config import folders as rad_folders
 from honeybee.face import Face
 from honeybee.boundarycondition import Surface
 from honeybee.facetype import AirBoundary
@@ -15,14 +16,22 @@ from .lib.modifiers import black
 
 import os
 import sys
+import math
 import json
 import shutil
+import hashlib
+import tempfile
+import subprocess
 import re
 import itertools
 from collections import defaultdict
+from types import GeneratorType
 
+MANIFEST_FILE = '_manifest.json'  # name of the manifest of incremental writes
+_BUFFER_SIZE = 262144  # number of characters to collect before writing to a file
 
-def shade_mesh_to_rad(shade_mesh, blk=False):
+
+def shade_mesh_to_rad(shade_mesh, blk=False, precision=None):
     """Generate a RAD string representation of a ShadeMesh.
 
     Note that the resulting string does not include modifier definitions.
@@ -32,23 +41,16 @@ def shade_mesh_to_rad(shade_mesh, blk=False):
         blk: Boolean to note whether the "blacked out" version of the Shade should
             be output, which is useful for direct studies and isolation studies
             to understand the contribution of individual apertures.
+        precision: An optional integer for the number of decimal places to which
+            the vertices are rounded. If None, the vertices are written with full
+            precision. (Default: None).
     """
     rad_prop = shade_mesh.properties.radiance
     modifier = rad_prop.modifier_blk if blk else rad_prop.modifier
-    base_geo = modifier.identifier + ' polygon {} 0 0 {} {}'
-    shd_id = shade_mesh.identifier
-    geo_strs = []
-    str_vertices = tuple(tuple(str(v) for v in pt.to_array())
-                         for pt in shade_mesh.vertices)
-    for fi, f_geo in enumerate(shade_mesh.faces):
-        coords = tuple(v for pt in f_geo for v in str_vertices[pt])
-        poly_id = '{}_{}'.format(shd_id, fi)
-        geo_str = base_geo.format(poly_id, len(coords), ' '.join(coords))
-        geo_strs.append(geo_str)
-    return '\n'.join(geo_strs)
+    return '\n'.join(_mesh_polygon_strings(shade_mesh, modifier, precision=precision))
 
 
-def shade_to_rad(shade, blk=False, minimal=False):
+def shade_to_rad(shade, blk=False, minimal=False, precision=None):
     """Generate a RAD string representation of a Shade.
 
     Note that the resulting string does not include modifier definitions. Nor
@@ -61,14 +63,17 @@ def shade_to_rad(shade, blk=False, minimal=False):
             to understand the contribution of individual apertures.
         minimal: Boolean to note whether the radiance string should be written
             in a minimal format (with spaces instead of line breaks). Default: False.
+        precision: An optional integer for the number of decimal places to which
+            the vertices are rounded. If None, the vertices are written with full
+            precision. (Default: None).
     """
     rad_prop = shade.properties.radiance
     modifier = rad_prop.modifier_blk if blk else rad_prop.modifier
     rad_poly = Polygon(shade.identifier, shade.vertices, modifier)
-    return rad_poly.to_radiance(minimal, False, False)
+    return rad_poly.to_radiance(minimal, False, False, precision)
 
 
-def door_to_rad(door, blk=False, minimal=False):
+def door_to_rad(door, blk=False, minimal=False, precision=None):
     """Generate a RAD string representation of a Door.
 
     Note that the resulting string does not include modifier definitions. Nor
@@ -82,17 +87,20 @@ def door_to_rad(door, blk=False, minimal=False):
             to understand the contribution of individual apertures.
         minimal: Boolean to note whether the radiance string should be written
             in a minimal format (with spaces instead of line breaks). Default: False.
+        precision: An optional integer for the number of decimal places to which
+            the vertices are rounded. If None, the vertices are written with full
+            precision. (Default: None).
     """
     rad_prop = door.properties.radiance
     modifier = rad_prop.modifier_blk if blk else rad_prop.modifier
     rad_poly = Polygon(door.identifier, door.vertices, modifier)
-    door_strs = [rad_poly.to_radiance(minimal, False, False)]
+    door_strs = [rad_poly.to_radiance(minimal, False, False, precision)]
     for shd in door.shades:
-        door_strs.append(shade_to_rad(shd, blk, minimal))
+        door_strs.append(shade_to_rad(shd, blk, minimal, precision))
     return '\n\n'.join(door_strs)
 
 
-def aperture_to_rad(aperture, blk=False, minimal=False):
+def aperture_to_rad(aperture, blk=False, minimal=False, precision=None):
     """Generate a RAD string representation of an Aperture.
 
     Note that the resulting string does not include modifier definitions. Nor
@@ -106,17 +114,21 @@ def aperture_to_rad(aperture, blk=False, minimal=False):
             to understand the contribution of individual apertures.
         minimal: Boolean to note whether the radiance string should be written
             in a minimal format (with spaces instead of line breaks). Default: False.
+        precision: An optional integer for the number of decimal places to which
+            the vertices are rounded. If None, the vertices are written with full
+            precision. (Default: None).
     """
     rad_prop = aperture.properties.radiance
     modifier = rad_prop.modifier_blk if blk else rad_prop.modifier
     rad_poly = Polygon(aperture.identifier, aperture.vertices, modifier)
-    ap_strs = [rad_poly.to_radiance(minimal, False, False)]
+    ap_strs = [rad_poly.to_radiance(minimal, False, False, precision)]
     for shd in aperture.shades:
-        ap_strs.append(shade_to_rad(shd, blk, minimal))
+        ap_strs.append(shade_to_rad(shd, blk, minimal, precision))
     return '\n\n'.join(ap_strs)
 
 
-def face_to_rad(face, blk=False, minimal=False, exclude_sub_faces=False):
+def face_to_rad(face, blk=False, minimal=False, exclude_sub_faces=False,
+                precision=None):
     """Get Face as a Radiance string.
 
     Note that the resulting string does not include modifier definitions. Nor
@@ -133,22 +145,25 @@ def face_to_rad(face, blk=False, minimal=False, exclude_sub_faces=False):
             in a minimal format (with spaces instead of line breaks). (Default: False).
         exclude_sub_faces:Boolean to note whether Apertures and Doors should
             be excluded from the output string. (Default: False).
+        precision: An optional integer for the number of decimal places to which
+            the vertices are rounded. If None, the vertices are written with full
+            precision. (Default: None).
     """
     rad_prop = face.properties.radiance
     modifier = rad_prop.modifier_blk if blk else rad_prop.modifier
     rad_poly = Polygon(face.identifier, face.punched_vertices, modifier)
-    face_strs = [rad_poly.to_radiance(minimal, False, False)]
+    face_strs = [rad_poly.to_radiance(minimal, False, False, precision)]
     for shd in face.shades:
-        face_strs.append(shade_to_rad(shd, blk, minimal))
+        face_strs.append(shade_to_rad(shd, blk, minimal, precision))
     if not exclude_sub_faces:
         for dr in face.doors:
-            face_strs.append(door_to_rad(dr, blk, minimal))
+            face_strs.append(door_to_rad(dr, blk, minimal, precision))
         for ap in face.apertures:
-            face_strs.append(aperture_to_rad(ap, blk, minimal))
+            face_strs.append(aperture_to_rad(ap, blk, minimal, precision))
     return '\n\n'.join(face_strs)
 
 
-def room_to_rad(room, blk=False, minimal=False):
+def room_to_rad(room, blk=False, minimal=False, precision=None):
     """Generate a RAD string representation of a Room.
 
     This method will write all geometry associated with a Room including all
@@ -163,16 +178,19 @@ def room_to_rad(room, blk=False, minimal=False):
             studies to understand the contribution of individual apertures.
         minimal: Boolean to note whether the radiance string should be written
             in a minimal format (with spaces instead of line breaks). Default: False.
+        precision: An optional integer for the number of decimal places to which
+            the vertices are rounded. If None, the vertices are written with full
+            precision. (Default: None).
     """
     room_strs = []
     for face in room.faces:
-        room_strs.append(face_to_rad(face, blk, minimal))
+        room_strs.append(face_to_rad(face, blk, minimal, precision=precision))
     for shd in room.shades:
-        room_strs.append(shade_to_rad(shd, blk, minimal))
+        room_strs.append(shade_to_rad(shd, blk, minimal, precision))
     return '\n\n'.join(room_strs)
 
 
-def model_to_rad(model, blk=False, minimal=False):
+def model_to_rad(model, blk=False, minimal=False, precision=None):
     r"""Generate a RAD string representation of a Model.
 
     The resulting strings will include all geometry (Rooms, Faces, Shades, Apertures,
@@ -191,6 +209,9 @@ def model_to_rad(model, blk=False, minimal=False):
             studies to understand the contribution of individual apertures.
         minimal: Boolean to note whether the radiance string should be written
             in a minimal format (with spaces instead of line breaks). Default: False.
+        precision: An optional integer for the number of decimal places to which
+            the vertices are rounded. If None, the vertices are written with full
+            precision. (Default: None).
 
     Returns:
         A tuple of two strings.
@@ -200,81 +221,130 @@ def model_to_rad(model, blk=False, minimal=False):
         -   modifier_str: A radiance string that contains all of the modifiers
             in the model. These will be modifier_blk if blk is True.
     """
-    # write all modifiers into the file
-    modifier_str = ['#   ============== MODIFIERS ==============\n']
+    model_str = ''.join(_joined_pieces(
+        _model_geometry_strings(model, blk, minimal, precision), '\n\n'))
+    modifier_str = '\n\n'.join(_model_modifier_strings(model, blk, minimal))
+    return model_str, modifier_str
+
+
+def model_to_rad_file(
+        model, output_file, blk=False, minimal=False, precision=None):
+    """Write a RAD representation of a Model to a file.
+
+    The file will have the modifiers and then the geometry of the Model in the same
+    way as the translate model-to-rad command. The Radiance strings are generated
+    one object at a time and written to the file in bounded buffers. So, unlike
+    model_to_rad, the memory in use does not grow with the size of the output,
+    which is useful for models with a lot of context geometry.
+
+    Args:
+        model: A honeybee Model for which a RAD representation will be written.
+        output_file: A file object to write the RAD representation.
+        blk: Boolean to note whether the "blacked out" version of the geometry
+            should be output, which is useful for direct studies and isolation
+            studies to understand the contribution of individual apertures.
+        minimal: Boolean to note whether the radiance string should be written
+            in a minimal format (with spaces instead of line breaks). Default: False.
+        precision: An optional integer for the number of decimal places to which
+            the vertices are rounded. If None, the vertices are written with full
+            precision. (Default: None).
+    """
+    pieces = itertools.chain(
+        ('# ========  MODEL MODIFIERS ========\n\n',),
+        _joined_pieces(_model_modifier_strings(model, blk, minimal), '\n\n'),
+        ('\n\n# ========  MODEL GEOMETRY ========\n\n',),
+        _joined_pieces(
+            _model_geometry_strings(model, blk, minimal, precision), '\n\n')
+    )
+    _write_pieces(output_file, pieces)
+
+
+def _model_modifier_strings(model, blk=False, minimal=False):
+    """Yield the RAD string of each modifier in a Model after a header."""
+    yield '#   ============== MODIFIERS ==============\n'
     rad_prop = model.properties.radiance
     modifiers = rad_prop.blk_modifiers if blk else rad_prop.modifiers
     if not blk:
         # must be imported here to avoid circular imports
         from .lib.modifiersets import generic_modifier_set_visible
         modifiers = set(modifiers + generic_modifier_set_visible.modifiers_unique)
-    for mod in modifiers:
-        modifier_str.append(mod.to_radiance(minimal))
+    # sort the modifiers since the order of a set changes with the hash seed
+    for mod in sorted(modifiers, key=lambda m: m.identifier):
+        yield mod.to_radiance(minimal)
+
+
+def _model_geometry_strings(model, blk=False, minimal=False, precision=None):
+    """Yield the RAD strings of the geometry in a Model with section headers.
+
+    Each ShadeMesh is yielded as a generator for the pieces of its RAD string.
+    """
+    yield '#   ================ MODEL ================\n'
 
     # write all Faces into the file
-    model_str = ['#   ================ MODEL ================\n']
     faces = model.faces
     interior_faces, offset = set(), model.tolerance * -2
     if len(faces) != 0:
-        model_str.append('#   ================ FACES ================\n')
+        yield '#   ================ FACES ================\n'
         for face in faces:
             if isinstance(face.boundary_condition, Surface):
                 if face.identifier in interior_faces:
                     face = face.duplicate()
                     face.move(face.normal * offset)
-                    model_str.append(face_to_rad(face, blk, minimal, True))
+                    yield face_to_rad(face, blk, minimal, True, precision)
                 else:
                     interior_faces.add(face.boundary_condition.boundary_condition_object)
-                    model_str.append(face_to_rad(face, blk, minimal))
+                    yield face_to_rad(face, blk, minimal, precision=precision)
             else:
-                model_str.append(face_to_rad(face, blk, minimal))
+                yield face_to_rad(face, blk, minimal, precision=precision)
 
     # write all orphaned Apertures into the file
     apertures = model.orphaned_apertures
     interior_aps = set()
     if len(apertures) != 0:
-        model_str.append('#   ============== APERTURES ==============\n')
+        yield '#   ============== APERTURES ==============\n'
         for ap in apertures:
             if isinstance(ap.boundary_condition, Surface):
                 if ap.identifier in interior_aps:
                     continue
                 interior_aps.add(ap.boundary_condition.boundary_condition_object)
-            model_str.append(aperture_to_rad(ap, blk, minimal))
+            yield aperture_to_rad(ap, blk, minimal, precision)
 
     # write all orphaned Doors into the file
     doors = model.orphaned_doors
     interior_drs = set()
     if len(doors) != 0:
-        model_str.append('#   ================ DOORS ================\n')
+        yield '#   ================ DOORS ================\n'
         for dr in doors:
             if isinstance(dr.boundary_condition, Surface):
                 if dr.identifier in interior_drs:
                     continue
                 interior_drs.add(dr.boundary_condition.boundary_condition_object)
-            model_str.append(door_to_rad(dr, blk, minimal))
+            yield door_to_rad(dr, blk, minimal, precision)
 
     # write all Room shades into the file
     rooms = model.rooms
     if len(rooms) != 0:
-        model_str.append('#   ============== ROOM SHADES ==============\n')
+        yield '#   ============== ROOM SHADES ==============\n'
         for room in rooms:
             for shd in room.shades:
-                model_str.append(shade_to_rad(shd, blk, minimal))
+                yield shade_to_rad(shd, blk, minimal, precision)
 
     # write all orphaned Shades into the file
     if len(model.orphaned_shades) != 0 or len(model.shade_meshes):
-        model_str.append('#   ============= CONTEXT SHADES =============\n')
+        yield '#   ============= CONTEXT SHADES =============\n'
         for shd in model.orphaned_shades:
-            model_str.append(shade_to_rad(shd, blk, minimal))
+            yield shade_to_rad(shd, blk, minimal, precision)
         for shd_msh in model.shade_meshes:
-            model_str.append(shade_mesh_to_rad(shd_msh, blk))
-
-    return '\n\n'.join(model_str), '\n\n'.join(modifier_str)
+            rad_prop = shd_msh.properties.radiance
+            modifier = rad_prop.modifier_blk if blk else rad_prop.modifier
+            yield _joined_pieces(
+                _mesh_polygon_strings(shd_msh, modifier, precision=precision), '\n')
 
 
 def model_to_rad_folder(
     model, folder=None, config_file=None, minimal=False, grids=None, views=None,
-    full_match=False
+    full_match=False, incremental=False, rtm_face_count=None, instance_count=None,
+    precision=None
 ):
     r"""Write a honeybee model to a rad folder.
 
@@ -305,35 +375,79 @@ def model_to_rad_folder(
             matches. Setting this to True indicates that wildcard symbols will not be
             used in the filtering of grids and views. In this case the names of grids
             and views are filtered as is. (Default: False).
+        incremental: Boolean to note whether only the files that have changed since
+            the last time the model was written to the folder should be rewritten.
+            In this case, the files are first written to a temporary folder and then
+            only the new and changed files are copied to the model folder while the
+            files that are no longer part of the model are removed. A _manifest.json
+            is written to the model folder with the content hash of each file and
+            each room, sensor grid and view, together with the lists of changed
+            files, removed files and changed objects so that the octrees and
+            matrices that are not affected by the changes can be skipped.
+            (Default: False).
+        rtm_face_count: An optional integer for the number of faces above which
+            a ShadeMesh is written as a Radiance mesh primitive instead of one
+            polygon for each face. The mesh is compiled into a .rtm file next to
+            the shade_meshes.rad file with the obj2mesh command of the installed
+            Radiance, which makes the files smaller and speeds up the octree
+            build and the ray intersection for large context meshes. If None,
+            all ShadeMeshes are written as polygons. (Default: None).
+        instance_count: An optional integer for the minimum number of congruent
+            copies of a shade group for the group to be written once as a Radiance
+            octree and each copy to be written as an instance of it. A shade group
+            is either the static Shades of one parent object (eg. the fins or
+            louvres of an Aperture) or a ShadeMesh. The copies must have the same modifier
+            and they can be moved and rotated around the Z axis, which is typical
+            of repeated facade shades, furniture and luminaire bodies. The octrees
+            are compiled into an instances sub-folder of the scene folder with the
+            oconv command of the installed Radiance. If None, all shades are
+            written as polygons. (Default: None).
+        precision: An optional integer for the number of decimal places to which
+            the vertices of the geometry and the positions of the sensor grids
+            and views are rounded. Rounded values are written without trailing
+            zeros, which makes the files smaller and faster to parse. The
+            directions of the sensors and views are always written with full
+            precision. The precision_from_tolerance function can be used to get
+            a value that matches the model tolerance. If None, all values are
+            written with full precision. (Default: None).
     """
+    assert instance_count is None or instance_count >= 2, 'The instance_count ' \
+        'must be at least 2. Got {}.'.format(instance_count)
     # prepare the folder for simulation
     model_id = model.identifier
     if folder is None:
         folder = os.path.join(folders.default_simulation_folder, model_id, 'radiance')
     if not os.path.isdir(folder):
         preparedir(folder)  # create the directory if it's not there
+    if incremental:
+        staging_folder = tempfile.mkdtemp(prefix='.staging_', dir=folder)
+        try:
+            model_to_rad_folder(
+                model, staging_folder, config_file, minimal, grids, views, full_match,
+                rtm_face_count=rtm_face_count, instance_count=instance_count,
+                precision=precision)
+            source = ModelFolder(staging_folder, 'model', config_file)
+            target = ModelFolder(folder, 'model', config_file)
+            _sync_model_folder(
+                source.model_folder(full=True), target.model_folder(full=True),
+                _model_object_hashes(model))
+        finally:
+            shutil.rmtree(staging_folder, ignore_errors=True)
+        return folder
     model_folder = ModelFolder(folder, 'model', config_file)
     model_folder.write(folder_type=-1, cfg=folder_config.minimal, overwrite=True)
 
     # determine the number of places to which mesh vertices will be rounded
-    dec_count = 3  # default value when there is no tolerance
-    str_tol = str(model.tolerance).split('.')
-    if len(str_tol) == 2 and str_tol[0] == '0':
-        str_tol = str_tol[-1]
-        dec_count = 0
-        for dig in str_tol:
-            if dig == '0':
-                dec_count += 1
-            else:
-                dec_count += 1
-                break
+    dec_count = precision_from_tolerance(model.tolerance) \
+        if precision is None else precision
 
     # gather and write static apertures to the folder
     aps, aps_blk = model.properties.radiance.subfaces_by_blk()
     mods, mods_blk, mod_combs, mod_names = _collect_modifiers(aps, aps_blk, True)
     _write_static_files(
         folder, model_folder.aperture_folder(full=True), 'aperture',
-        aps, aps_blk, mods, mods_blk, mod_combs, mod_names, 'Face3D', minimal)
+        aps, aps_blk, mods, mods_blk, mod_combs, mod_names, 'Face3D', minimal,
+        precision=precision)
 
     # gather and write static faces
     faces, faces_blk = model.properties.radiance.faces_by_blk()
@@ -341,14 +455,15 @@ def model_to_rad_folder(
     _write_static_files(
         folder, model_folder.scene_folder(full=True), 'envelope',
         faces, faces_blk, f_mods, f_mods_blk, mod_combs, mod_names,
-        'PunchedFace3D', minimal)
+        'PunchedFace3D', minimal, precision=precision)
 
     # gather and write static shades
     shades, shades_blk = model.properties.radiance.shades_by_blk()
     s_mods, s_mods_blk, mod_combs, mod_names = _collect_modifiers(shades, shades_blk)
     _write_static_files(
         folder, model_folder.scene_folder(full=True), 'shades',
-        shades, shades_blk, s_mods, s_mods_blk, mod_combs, mod_names, 'Face3D', minimal)
+        shades, shades_blk, s_mods, s_mods_blk, mod_combs, mod_names, 'Face3D', minimal,
+        instance_count=instance_count, tolerance=model.tolerance, precision=precision)
 
     # gather and write static shade meshes
     shade_meshes, shade_meshes_blk = model.properties.radiance.shade_meshes_by_blk()
@@ -357,7 +472,8 @@ def model_to_rad_folder(
     _write_static_files(
         folder, model_folder.scene_folder(full=True), 'shade_meshes',
         shade_meshes, shade_meshes_blk, sm_mods, sm_mods_blk,
-        mod_combs, mod_names, 'Mesh3D', minimal, dec_count)
+        mod_combs, mod_names, 'Mesh3D', minimal, dec_count, rtm_face_count,
+        instance_count, model.tolerance, precision)
 
     # write dynamic sub-face groups (apertures and doors)
     ext_dict = {}
@@ -425,9 +541,9 @@ def model_to_rad_folder(
 
     # write the assigned sensor grids and views into the correct folder
     grid_dir = model_folder.grid_folder(full=True)
-    _write_sensor_grids(grid_dir, model, grids, full_match)
+    _write_sensor_grids(grid_dir, model, grids, full_match, precision)
     view_dir = model_folder.view_folder(full=True)
-    _write_views(view_dir, model, views, full_match)
+    _write_views(view_dir, model, views, full_match, precision)
 
     model_folder.combined_receivers(auto_mtx_path=False)
 
@@ -440,7 +556,137 @@ def model_to_rad_folder(
     return folder
 
 
-def _write_sensor_grids(folder, model, grids_filter, full_match=False):
+def precision_from_tolerance(tolerance):
+    """Get the number of decimal places that matches a model tolerance.
+
+    Args:
+        tolerance: A number for the model tolerance (eg. 0.01).
+
+    Returns:
+        An integer for the number of decimal places to the first non-zero digit
+        of the tolerance. This is 3 when the tolerance is not a decimal fraction.
+    """
+    str_tol = str(tolerance).split('.')
+    if len(str_tol) != 2 or str_tol[0] != '0':
+        return 3  # default value when there is no tolerance
+    dec_count = 0
+    for dig in str_tol[-1]:
+        dec_count += 1
+        if dig != '0':
+            break
+    return dec_count
+
+
+def read_manifest(folder, config_file=None):
+    """Read the manifest of a model folder that was written incrementally.
+
+    Args:
+        folder: The root folder that was used in model_to_rad_folder.
+        config_file: An optional config file path to modify the default folder
+            names. (Default: None).
+
+    Returns:
+        A dictionary with the content hash of the files (files) and the model
+        objects (objects) together with the lists of changed files (changed),
+        removed files (removed) and changed objects (changed_objects) in the last
+        incremental write. The paths are relative to the model folder. None will
+        be returned if the folder has no manifest.
+    """
+    model_folder = ModelFolder(folder, 'model', config_file).model_folder(full=True)
+    manifest_file = os.path.join(model_folder, MANIFEST_FILE)
+    if not os.path.isfile(manifest_file):
+        return None
+    with open(manifest_file) as inf:
+        return json.load(inf)
+
+
+def _file_hash(file_path):
+    """Get the sha256 hash of the content of a file."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as inf:
+        for chunk in iter(lambda: inf.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _model_object_hashes(model):
+    """Get a dictionary with the hash of each room, sensor grid and view in a model."""
+    def _hash(obj):
+        obj_str = json.dumps(obj.to_dict(), sort_keys=True)
+        return hashlib.sha256(obj_str.encode('utf-8')).hexdigest()
+
+    hashes = {}
+    for room in model.rooms:
+        hashes['room/%s' % room.identifier] = _hash(room)
+    for grid in model.properties.radiance.sensor_grids:
+        hashes['grid/%s' % grid.full_identifier] = _hash(grid)
+    for view in model.properties.radiance.views:
+        hashes['view/%s' % view.full_identifier] = _hash(view)
+    return hashes
+
+
+def _sync_model_folder(source, target, object_hashes):
+    """Copy the new and changed files of a model folder and remove the old ones.
+
+    Args:
+        source: The newly written model folder.
+        target: The model folder to be updated.
+        object_hashes: A dictionary with the hash of each object in the model.
+    """
+    manifest_file = os.path.join(target, MANIFEST_FILE)
+    try:
+        with open(manifest_file) as inf:
+            manifest = json.load(inf)
+    except (IOError, OSError, ValueError):  # no manifest from a previous write
+        manifest = {'files': {}, 'objects': {}}
+
+    # copy the files that are new or have changed
+    old_files, files, changed = manifest['files'], {}, []
+    for root, _, file_names in os.walk(source):
+        for file_name in file_names:
+            src_file = os.path.join(root, file_name)
+            rel_path = os.path.relpath(src_file, source).replace('\\', '/')
+            files[rel_path] = digest = _file_hash(src_file)
+            dest_file = os.path.join(target, rel_path)
+            if os.path.isfile(dest_file):
+                old_digest = old_files.get(rel_path) or _file_hash(dest_file)
+                if old_digest == digest:
+                    continue
+            elif not os.path.isdir(os.path.dirname(dest_file)):
+                os.makedirs(os.path.dirname(dest_file))
+            shutil.copy2(src_file, dest_file)  # keep _info.json newer than the grids
+            changed.append(rel_path)
+
+    # remove the files and folders that are no longer a part of the model
+    removed = []
+    if os.path.isdir(target):
+        for root, _, file_names in os.walk(target, topdown=False):
+            for file_name in file_names:
+                dest_file = os.path.join(root, file_name)
+                rel_path = os.path.relpath(dest_file, target).replace('\\', '/')
+                if rel_path != MANIFEST_FILE and rel_path not in files:
+                    os.remove(dest_file)
+                    removed.append(rel_path)
+            if root != target and not os.listdir(root):
+                os.rmdir(root)
+
+    old_objects = manifest['objects']
+    changed_objects = [
+        key for key, value in object_hashes.items() if old_objects.get(key) != value]
+    changed_objects.extend(key for key in old_objects if key not in object_hashes)
+
+    manifest = {
+        'files': files,
+        'objects': object_hashes,
+        'changed': sorted(changed),
+        'removed': sorted(removed),
+        'changed_objects': sorted(changed_objects)
+    }
+    with open(manifest_file, 'w') as outf:
+        json.dump(manifest, outf, indent=2)
+
+
+def _write_sensor_grids(folder, model, grids_filter, full_match=False, precision=None):
     """Write out the sensor grid files.
 
     Args:
@@ -452,6 +698,8 @@ def _write_sensor_grids(folder, model, grids_filter, full_match=False):
             wildcard symbols in names. Use relative path from inside grids folder.
         full_match: A boolean to filter grids by their identifiers as full matches.
             (Default: False).
+        precision: An optional integer for the number of decimal places to which
+            the sensor positions are rounded. (Default: None).
 
     Returns:
         A tuple for path to _info.json and _model_grids_info.json. The first file
@@ -474,8 +722,11 @@ def _write_sensor_grids(folder, model, grids_filter, full_match=False):
         # group_by_identifier
         grouped_grids = _group_by_identifier(filtered_grids)
         for grid in grouped_grids:
-            grid.to_file(folder)
-            grids_info.append(grid.info_dict(model))
+            pts_file = grid.to_file(folder, precision=precision)
+            grid_info = grid.info_dict(model)
+            # the size of the file lets the count be used without reading the file
+            grid_info['pts_size'] = os.path.getsize(pts_file)
+            grids_info.append(grid_info)
 
         # write information file for all the grids.
         grids_info_file = os.path.join(folder, '_info.json')
@@ -514,7 +765,7 @@ def _write_sensor_grids(folder, model, grids_filter, full_match=False):
         raise ValueError('All sensor grids were filtered out of the model folder!')
 
 
-def _write_views(folder, model, views_filter, full_match=False):
+def _write_views(folder, model, views_filter, full_match=False, precision=None):
     """Write out the view files.
 
     Args:
@@ -526,6 +777,8 @@ def _write_views(folder, model, views_filter, full_match=False):
             Use relative path from inside views folder.
         full_match: A boolean to filter views by their identifiers as full matches.
             (Default: False).
+        precision: An optional integer for the number of decimal places to which
+            the view positions are rounded. (Default: None).
 
     Returns:
         The path to _info.json, which includes the information for the views that
@@ -538,7 +791,7 @@ def _write_views(folder, model, views_filter, full_match=False):
         # group_by_identifier
         views_info = []
         for view in filtered_views:
-            view.to_file(folder)
+            view.to_file(folder, precision=precision)
             info_file = os.path.join(folder, '{}.json'.format(view.identifier))
             with open(info_file, 'w') as fp:
                 json.dump(view.info_dict(model), fp, indent=4)
@@ -684,7 +937,8 @@ def _write_dynamic_json(folder, sub_folder, json_dict):
 
 def _write_static_files(
         folder, sub_folder, file_id, geometry, geometry_blk, modifiers, modifiers_blk,
-        mod_combs, mod_names, geo_type='Face3D', minimal=False, decimal_count=3):
+        mod_combs, mod_names, geo_type='Face3D', minimal=False, decimal_count=3,
+        rtm_face_count=None, instance_count=None, tolerance=0.01, precision=None):
     """Write out the three files that need to go into any static radiance model folder.
 
     This includes a .rad, .mat, and .blk file for the folder.
@@ -705,62 +959,16 @@ def _write_static_files(
             PunchedFace3D, or Mesh3D).
         minimal: Boolean noting whether radiance strings should be written minimally.
         decimal_count: Integer for the number of decimal places to round mesh vertices
+        rtm_face_count: Optional integer for the number of faces above which Mesh3D
+            geometry is written as a mesh primitive with a compiled .rtm file.
+        instance_count: Optional integer for the minimum number of congruent copies
+            of a shade group for the group to be written as Radiance instances.
+        tolerance: The tolerance used to find the congruent shade groups.
+        precision: Optional integer for the number of decimal places to round
+            the vertices of the geometry. If specified, it is used instead of the
+            decimal_count for the Mesh3D polygons.
     """
-    def is_air_boundary(face):
-        return isinstance(face, Face) and isinstance(face.type, AirBoundary)
-
     if len(geometry) != 0 or len(geometry_blk) != 0:
-        # write the strings for the geometry
-        face_strs = []
-        if geo_type == 'Face3D':
-            for face in geometry:
-                modifier = face.properties.radiance.modifier
-                rad_poly = Polygon(face.identifier, face.vertices, modifier)
-                face_strs.append(rad_poly.to_radiance(minimal, False, False))
-            for face, mod_name in zip(geometry_blk, mod_names):
-                modifier = mod_combs[mod_name][0]
-                rad_poly = Polygon(face.identifier, face.vertices, modifier)
-                face_strs.append(rad_poly.to_radiance(minimal, False, False))
-        elif geo_type == 'Mesh3D':
-            tol_f_str = '{:.' + str(decimal_count) + 'f}'
-            for shade_mesh in geometry:
-                str_vertices = tuple(tuple(tol_f_str.format(v) for v in pt.to_array())
-                                     for pt in shade_mesh.vertices)
-                modifier = shade_mesh.properties.radiance.modifier
-                base_geo = modifier.identifier + ' polygon {} 0 0 {} {}'
-                shd_id = shade_mesh.identifier
-                for fi, f_geo in enumerate(shade_mesh.faces):
-                    coords = tuple(v for pt in f_geo for v in str_vertices[pt])
-                    poly_id = '{}_{}'.format(shd_id, fi)
-                    geo_str = base_geo.format(poly_id, len(coords), ' '.join(coords))
-                    face_strs.append(geo_str)
-            for shade_mesh, mod_name in zip(geometry_blk, mod_names):
-                str_vertices = tuple(tuple(tol_f_str.format(v) for v in pt.to_array())
-                                     for pt in shade_mesh.vertices)
-                modifier = mod_combs[mod_name][0]
-                base_geo = modifier.identifier + ' polygon {} 0 0 {} {}'
-                shd_id = shade_mesh.identifier
-                for fi, f_geo in enumerate(shade_mesh.faces):
-                    coords = tuple(v for pt in f_geo for v in str_vertices[pt])
-                    poly_id = '{}_{}'.format(shd_id, fi)
-                    geo_str = base_geo.format(poly_id, len(coords), ' '.join(coords))
-                    face_strs.append(geo_str)
-        else:  # assume that it is punched Face3D
-            for face in geometry:
-                if not is_air_boundary(face):
-                    modifier = face.properties.radiance.modifier
-                    geo = face.punched_vertices if hasattr(face, 'punched_vertices') \
-                        else face.vertices
-                    rad_poly = Polygon(face.identifier, geo, modifier)
-                    face_strs.append(rad_poly.to_radiance(minimal, False, False))
-            for face, mod_name in zip(geometry_blk, mod_names):
-                if not is_air_boundary(face):
-                    modifier = mod_combs[mod_name][0]
-                    geo = face.punched_vertices if hasattr(face, 'punched_vertices') \
-                        else face.vertices
-                    rad_poly = Polygon(face.identifier, geo, modifier)
-                    face_strs.append(rad_poly.to_radiance(minimal, False, False))
-
         # write the strings for the modifiers
         mod_strs = []
         mod_blk_strs = []
@@ -787,14 +995,388 @@ def _write_static_files(
 
         # write the three files for the model sub-folder
         dest = os.path.join(folder, sub_folder)
-        if geo_type == 'Mesh3D':  # write minimum specification to reduce file size
-            write_to_file_by_name(dest, '{}.rad'.format(file_id), '\n'.join(face_strs))
-        else:
-            write_to_file_by_name(dest, '{}.rad'.format(file_id), '\n\n'.join(face_strs))
+        instance_strs = []
+        if instance_count is not None:
+            geometry, geometry_blk, mod_names, instance_strs = _instance_geometry(
+                geometry, geometry_blk, mod_combs, mod_names, geo_type,
+                instance_count, tolerance, folder, dest, file_id)
+        face_strs = itertools.chain(instance_strs, _static_geometry_strings(
+            geometry, geometry_blk, mod_combs, mod_names, geo_type, minimal,
+            decimal_count, rtm_face_count, folder, dest, precision))
+        # write minimum specification for meshes to reduce file size
+        separator = '\n' if geo_type == 'Mesh3D' else '\n\n'
+        _write_file_pieces(
+            dest, '{}.rad'.format(file_id), _joined_pieces(face_strs, separator))
         write_to_file_by_name(dest, '{}.mat'.format(file_id), '\n\n'.join(mod_strs))
         write_to_file_by_name(dest, '{}.blk'.format(file_id), '\n\n'.join(mod_blk_strs))
 
 
+def _static_geometry_strings(
+        geometry, geometry_blk, mod_combs, mod_names, geo_type='Face3D',
+        minimal=False, decimal_count=3, rtm_face_count=None, folder=None, dest=None,
+        precision=None):
+    """Yield the RAD string of each polygon of the geometry of a static file.
+
+    The arguments are the same as the ones of _write_static_files. The folder and
+    dest are the root folder and the folder of the static file, which are used to
+    write the .rtm files of the meshes with more than rtm_face_count faces.
+    """
+    if geo_type == 'Mesh3D':
+        vertex_format = '{:.' + str(decimal_count) + 'f}'
+        mesh_mods = itertools.chain(
+            ((mesh, mesh.properties.radiance.modifier) for mesh in geometry),
+            ((mesh, mod_combs[mod_name][0])
+             for mesh, mod_name in zip(geometry_blk, mod_names))
+        )
+        for shade_mesh, modifier in mesh_mods:
+            if rtm_face_count is not None and len(shade_mesh.faces) > rtm_face_count:
+                rtm_file = _shade_mesh_to_rtm(shade_mesh, dest, vertex_format)
+                rtm_path = os.path.relpath(rtm_file, folder).replace('\\', '/')
+                yield '{} mesh {} 1 {} 0 0'.format(
+                    modifier.identifier, shade_mesh.identifier, rtm_path)
+                continue
+            poly_strs = _mesh_polygon_strings(shade_mesh, modifier, precision=precision) \
+                if precision is not None else \
+                _mesh_polygon_strings(shade_mesh, modifier, vertex_format)
+            for geo_str in poly_strs:
+                yield geo_str
+        return
+
+    punched = geo_type != 'Face3D'  # assume that it is punched Face3D
+    geo_mods = itertools.chain(
+        ((face, face.properties.radiance.modifier) for face in geometry),
+        ((face, mod_combs[mod_name][0])
+         for face, mod_name in zip(geometry_blk, mod_names))
+    )
+    for face, modifier in geo_mods:
+        if punched:
+            if isinstance(face, Face) and isinstance(face.type, AirBoundary):
+                continue
+            geo = face.punched_vertices if hasattr(face, 'punched_vertices') \
+                else face.vertices
+        else:
+            geo = face.vertices
+        rad_poly = Polygon(face.identifier, geo, modifier)
+        yield rad_poly.to_radiance(minimal, False, False, precision)
+
+
+def _shade_mesh_to_rtm(shade_mesh, folder, vertex_format='{:.3f}'):
+    """Write a ShadeMesh to a compiled Radiance .rtm mesh file.
+
+    The mesh is first written to a Wavefront .obj file, which is then compiled to
+    a .rtm file with the obj2mesh command and removed. The .rtm file has no
+    modifiers and so the mesh primitive that uses it must have a modifier.
+
+    Args:
+        shade_mesh: A honeybee ShadeMesh.
+        folder: The folder into which the .rtm file will be written.
+        vertex_format: A format string for the vertex coordinates. (Default: {:.3f}).
+
+    Returns:
+        The path to the .rtm file.
+    """
+    obj2mesh = os.path.join(rad_folders.radbin_path, 'obj2mesh') \
+        if rad_folders.radbin_path else None
+    if obj2mesh is not None and os.name == 'nt':
+        obj2mesh += '.exe'
+    if obj2mesh is None or not os.path.isfile(obj2mesh):
+        raise ValueError(
+            'Failed to find the obj2mesh command that is needed to write ShadeMesh '
+            '"{}" as a Radiance mesh. Make sure Radiance is installed or write the '
+            'ShadeMesh as polygons.'.format(shade_mesh.identifier))
+
+    obj_file = os.path.join(folder, '{}.obj'.format(shade_mesh.identifier))
+    rtm_file = os.path.join(folder, '{}.rtm'.format(shade_mesh.identifier))
+    fmt = vertex_format.format
+    with open(obj_file, 'w') as outf:
+        for pt in shade_mesh.vertices:
+            outf.write('v {} {} {}\n'.format(fmt(pt.x), fmt(pt.y), fmt(pt.z)))
+        for face in shade_mesh.faces:
+            outf.write('f {}\n'.format(' '.join(str(v + 1) for v in face)))
+
+    # use relative paths since obj2mesh writes its command into the file header
+    use_shell = True if os.name == 'nt' else False
+    process = subprocess.Popen(
+        [obj2mesh, os.path.basename(obj_file), os.path.basename(rtm_file)],
+        stderr=subprocess.PIPE, shell=use_shell, cwd=folder, env=rad_folders.env)
+    stderr = process.communicate()[1]
+    os.remove(obj_file)
+    if process.returncode != 0:
+        raise RuntimeError('obj2mesh failed to compile ShadeMesh "{}":\n{}'.format(
+            shade_mesh.identifier, stderr.decode('utf-8', 'replace')))
+    return rtm_file
+
+
+def _instance_geometry(
+        geometry, geometry_blk, mod_combs, mod_names, geo_type, instance_count,
+        tolerance, folder=None, dest=None, file_id='shades'):
+    """Write the congruent groups of static shades as Radiance instances.
+
+    The shades are grouped by their parent object and each ShadeMesh is a group
+    of its own. The groups with the same modifier and the same geometry under a
+    translation and a rotation around the Z axis are found with a key of their
+    coordinates relative to their first vertex. The first group of each key with
+    at least instance_count copies is compiled into an octree and all of the
+    copies are written as instances of this octree.
+
+    Args:
+        geometry: A list of geometry objects all with default blk modifiers.
+        geometry_blk: A list of geometry objects with overridden blk modifiers.
+        mod_combs: Dictionary of modifiers from _unique_modifier_blk_combinations.
+        mod_names: Modifier names from _unique_modifier_blk_combinations.
+        geo_type: Text for the type of geometry (either Face3D or Mesh3D).
+        instance_count: Integer for the minimum number of copies of a group for
+            the group to be written as instances.
+        tolerance: The tolerance used to compare the coordinates of the groups.
+        folder: The root of the model folder.
+        dest: The folder of the static file.
+        file_id: The identifier of the static file.
+
+    Returns:
+        A tuple with four items.
+
+        -   geometry: The geometry objects that are not written as instances.
+
+        -   geometry_blk: The geometry_blk objects that are not written as instances.
+
+        -   mod_names: The modifier names of the remaining geometry_blk objects.
+
+        -   instance_strs: A list with the RAD string of each instance.
+    """
+    # collect the groups of geometry that share a parent and a modifier
+    units, parents = [], {}
+    geo_mods = itertools.chain(
+        ((obj, obj.properties.radiance.modifier, None) for obj in geometry),
+        ((obj, mod_combs[mod_name][0], mod_name)
+         for obj, mod_name in zip(geometry_blk, mod_names))
+    )
+    for obj, modifier, mod_name in geo_mods:
+        if geo_type == 'Mesh3D':
+            units.append([(obj, modifier, mod_name)])
+            continue
+        if obj.parent is None:
+            continue  # orphaned shades are never instanced
+        key = (id(obj.parent), obj.is_indoor, modifier.identifier, mod_name)
+        try:
+            parents[key].append((obj, modifier, mod_name))
+        except KeyError:
+            parents[key] = [(obj, modifier, mod_name)]
+            units.append(parents[key])
+
+    # group the congruent units by their geometry key
+    groups, prototypes = {}, []
+    for unit in units:
+        if geo_type == 'Mesh3D':
+            mesh = unit[0][0]
+            points, faces = mesh.vertices, tuple(tuple(f) for f in mesh.faces)
+        else:
+            points = [pt for obj, _, _ in unit for pt in obj.vertices]
+            faces = tuple(len(obj.vertices) for obj, _, _ in unit)
+        if len(faces) < 2:
+            continue  # a single polygon is smaller than an instance
+        key, origin, angle, coords = _congruent_key(points, tolerance)
+        key = (unit[0][1].identifier, unit[0][2], faces, key)
+        try:
+            groups[key].append((unit, origin, angle))
+        except KeyError:
+            groups[key] = [(unit, origin, angle)]
+            prototypes.append((key, coords))
+
+    # write an octree for each group and an instance for each copy
+    instance_strs, instanced, oct_count = [], set(), 0
+    for key, coords in prototypes:
+        copies = groups[key]
+        if len(copies) < instance_count:
+            continue
+        mod_id, faces = key[0], key[2]
+        oct_file = _prototype_to_octree(
+            '{}_{}'.format(file_id, oct_count), mod_id, faces, coords,
+            os.path.join(dest, 'instances'))
+        oct_count += 1
+        oct_path = os.path.relpath(oct_file, folder).replace('\\', '/')
+        for unit, origin, angle in copies:
+            args = [oct_path]
+            if angle != 0:
+                args.extend(('-rz', str(math.degrees(angle))))
+            args.extend(('-t',) + tuple(str(v) for v in origin))
+            instance_strs.append('{} instance {} {} {} 0 0'.format(
+                mod_id, unit[0][0].identifier, len(args), ' '.join(args)))
+            instanced.update(id(obj) for obj, _, _ in unit)
+
+    if not instanced:
+        return geometry, geometry_blk, mod_names, []
+    remaining_blk = [(obj, mod_name) for obj, mod_name in zip(geometry_blk, mod_names)
+                     if id(obj) not in instanced]
+    geometry = [obj for obj in geometry if id(obj) not in instanced]
+    geometry_blk = [obj for obj, _ in remaining_blk]
+    mod_names = [mod_name for _, mod_name in remaining_blk]
+    return geometry, geometry_blk, mod_names, instance_strs
+
+
+def _congruent_key(points, tolerance):
+    """Get a key of points that is the same for copies moved and rotated around Z.
+
+    The points are moved to the first point and rotated so that the direction to
+    the first point that is not directly above or below it is the X axis.
+
+    Args:
+        points: A list of Point3Ds.
+        tolerance: The tolerance to which the coordinates are rounded in the key.
+
+    Returns:
+        A tuple with the key, the first point as an (x, y, z) tuple, the angle in
+        radians to rotate the points around the Z axis and the list of the moved
+        and rotated (x, y, z) coordinates.
+    """
+    ox, oy, oz = points[0].x, points[0].y, points[0].z
+    angle = 0
+    for pt in points:
+        dx, dy = pt.x - ox, pt.y - oy
+        if abs(dx) > tolerance or abs(dy) > tolerance:
+            angle = math.atan2(dy, dx)
+            break
+    cos_a, sin_a = math.cos(angle), math.sin(angle)
+    coords, key = [], []
+    for pt in points:
+        dx, dy = pt.x - ox, pt.y - oy
+        coord = (dx * cos_a + dy * sin_a, dy * cos_a - dx * sin_a, pt.z - oz)
+        coords.append(coord)
+        key.extend(int(round(v / tolerance)) for v in coord)
+    return tuple(key), (ox, oy, oz), angle, coords
+
+
+def _prototype_to_octree(identifier, modifier_id, faces, coords, folder):
+    """Write the geometry of a group of shades to an octree for Radiance instances.
+
+    The octree is compiled with the oconv command from a .rad file that is then
+    removed. The modifier in the octree is only a placeholder since the modifier
+    of each instance overrides the modifiers of the octree.
+
+    Args:
+        identifier: Text for the name of the octree file.
+        modifier_id: The identifier of the modifier of the shades.
+        faces: Either a tuple with the number of vertices of each polygon or a
+            tuple of mesh faces with the index of each vertex.
+        coords: A list of (x, y, z) coordinates for the vertices.
+        folder: The folder into which the octree will be written.
+
+    Returns:
+        The path to the octree file.
+    """
+    oconv = os.path.join(rad_folders.radbin_path, 'oconv') \
+        if rad_folders.radbin_path else None
+    if oconv is not None and os.name == 'nt':
+        oconv += '.exe'
+    if oconv is None or not os.path.isfile(oconv):
+        raise ValueError(
+            'Failed to find the oconv command that is needed to write the shades '
+            'as Radiance instances. Make sure Radiance is installed or write the '
+            'shades as polygons.')
+
+    if not os.path.isdir(folder):
+        preparedir(folder)
+    rad_file = os.path.join(folder, '{}.rad'.format(identifier))
+    oct_file = os.path.join(folder, '{}.oct'.format(identifier))
+    str_coords = tuple(' '.join(str(v) for v in coord) for coord in coords)
+    if isinstance(faces[0], int):  # the number of vertices of each polygon
+        st, polygons = 0, []
+        for count in faces:
+            polygons.append(range(st, st + count))
+            st += count
+    else:
+        polygons = faces
+    with open(rad_file, 'w') as outf:
+        outf.write('void plastic {}\n0\n0\n5 0 0 0 0 0\n'.format(modifier_id))
+        for i, poly in enumerate(polygons):
+            outf.write('{} polygon {}_{} 0 0 {} {}\n'.format(
+                modifier_id, identifier, i, len(poly) * 3,
+                ' '.join(str_coords[v] for v in poly)))
+
+    # use a relative path since oconv writes its command into the octree header
+    use_shell = True if os.name == 'nt' else False
+    with open(oct_file, 'wb') as outf:
+        process = subprocess.Popen(
+            [oconv, '-f', os.path.basename(rad_file)], stdout=outf,
+            stderr=subprocess.PIPE, shell=use_shell, cwd=folder, env=rad_folders.env)
+        stderr = process.communicate()[1]
+    os.remove(rad_file)
+    if process.returncode != 0:
+        raise RuntimeError('oconv failed to compile the octree "{}":\n{}'.format(
+            identifier, stderr.decode('utf-8', 'replace')))
+    return oct_file
+
+
+def _mesh_polygon_strings(shade_mesh, modifier, vertex_format=None, precision=None):
+    """Yield the RAD string of each face of a ShadeMesh as a polygon.
+
+    Args:
+        shade_mesh: A honeybee ShadeMesh.
+        modifier: The modifier of the polygons.
+        vertex_format: An optional format string for the vertex coordinates
+            (eg. {:.3f}). If None, the coordinates will be converted with str.
+        precision: An optional integer for the number of decimal places to which
+            the coordinates are rounded when there is no vertex_format. The
+            coordinates are written without trailing zeros like the ones of
+            the Polygon primitives.
+    """
+    if vertex_format is not None:
+        fmt = vertex_format.format
+    elif precision is not None:
+        def fmt(v):
+            return str(round(v, precision))
+    else:
+        fmt = str
+    str_vertices = tuple(' '.join(fmt(v) for v in pt.to_array())
+                         for pt in shade_mesh.vertices)
+    base_geo = modifier.identifier + ' polygon {}_{} 0 0 {} {}'
+    shd_id = shade_mesh.identifier
+    for fi, f_geo in enumerate(shade_mesh.faces):
+        coords = ' '.join(str_vertices[pt] for pt in f_geo)
+        yield base_geo.format(shd_id, fi, len(f_geo) * 3, coords)
+
+
+def _joined_pieces(strings, separator):
+    """Yield the pieces of separator.join(strings) without building the string.
+
+    Any of the strings can also be a generator of pieces, which are yielded in
+    place of the string.
+    """
+    first = True
+    for string in strings:
+        if first:
+            first = False
+        else:
+            yield separator
+        if isinstance(string, GeneratorType):
+            for piece in string:
+                yield piece
+        else:
+            yield string
+
+
+def _write_pieces(output_file, pieces):
+    """Write an iterable of strings to a file object in bounded buffers."""
+    buffer, size = [], 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= _BUFFER_SIZE:
+            output_file.write(''.join(buffer))
+            buffer, size = [], 0
+    if buffer:
+        output_file.write(''.join(buffer))
+
+
+def _write_file_pieces(folder, file_name, pieces):
+    """Write an iterable of strings to a file like write_to_file_by_name."""
+    if not os.path.isdir(folder):
+        preparedir(folder)
+    file_path = os.path.join(folder, file_name)
+    with open(file_path, 'wb' if sys.version_info < (3, 0) else 'w') as outf:
+        _write_pieces(outf, pieces)
+    return file_path
+
+
 def _unique_modifiers(geometry_objects):
     """Get a list of unique modifiers across an array of geometry objects.
 
@@ -803,14 +1385,15 @@ def _unique_modifiers(geometry_objects):
             Doors, Shades) for which unique modifiers will be determined.
 
     Returns:
-        A list of all unique modifiers across the input geometry_objects
+        A list of all unique modifiers across the input geometry_objects sorted
+        by their identifiers so that the files written with them do not change
+        between processes.
     """
-    modifiers = []
+    modifiers = {}
     for obj in geometry_objects:
         mod = obj.properties.radiance.modifier
-        if not _instance_in_array(mod, modifiers):
-            modifiers.append(mod)
-    return list(set(modifiers))
+        modifiers[id(mod)] = mod
+    return sorted(set(modifiers.values()), key=lambda m: m.identifier)
 
 
 def _unique_modifier_blk_combinations(geometry_objects):
@@ -881,20 +1464,6 @@ def _process_bsdf_modifier(modifier, mod_strs, minimal):
     mod_strs.append(mod_dup.to_radiance(minimal))
 
 
-def _instance_in_array(object_instance, object_array):
-    """Check if a specific object instance is already in an array.
-
-    This can be much faster than  `if object_instance in object_array`
-    when you expect to be testing a lot of the same instance of an object for
-    inclusion in an array since the builtin method uses an == operator to
-    test inclusion.
-    """
-    for val in object_array:
-        if val is object_instance:
-            return True
-    return False
-
-
 def _filter_by_pattern(input_objects, filter, full_match=False):
     """Filter model grids and views based on user input."""
     if not filter or filter == '*':
@@ -946,10 +1515,11 @@ def _group_by_identifier(sensor_grids):
         grids = list(grids)
         if len(grids) > 1:
             # merge grids into one
-            sensors = []
-            for grid in grids:
-                sensors.extend(grid.sensors)
-            joined_grid = SensorGrid(grids[0].identifier, sensors)
+            positions = itertools.chain.from_iterable(grid.positions for grid in grids)
+            directions = itertools.chain.from_iterable(
+                grid.directions for grid in grids)
+            joined_grid = SensorGrid.from_position_and_direction(
+                grids[0].identifier, positions, directions)
             joined_grid.group_identifier = grids[0].group_identifier
             updated_grids.append(joined_grid)
         else:
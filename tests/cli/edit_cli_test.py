@@ -5,7 +5,7 @@ from click.testing import CliRunner
 from honeybee.model import Model
 
 from honeybee_radiance.cli.edit import add_room_sensors, add_face3d_sensors, \
-    mirror_model_sensors, reset_resource_ids
+    mirror_model_sensors, reset_resource_ids, deduplicate_modifiers
 
 
 def test_reset_resource_ids():
@@ -23,6 +23,17 @@ def test_reset_resource_ids():
     assert new_con_set.identifier != old_id
 
 
+def test_deduplicate_modifiers():
+    runner = CliRunner()
+    input_hb_model = './tests/assets/model/shoe_box_mod_set.hbjson'
+
+    result = runner.invoke(deduplicate_modifiers, [input_hb_model])
+    assert result.exit_code == 0
+    model_dict = json.loads(result.output)
+    new_model = Model.from_dict(model_dict)
+    assert len(new_model.properties.radiance.modifiers) == 9
+
+
 def test_add_room_sensors():
     runner = CliRunner()
     input_hb_model = './tests/assets/model/model_radiance_dynamic_states.hbjson'
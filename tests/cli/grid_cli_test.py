@@ -2,9 +2,10 @@
 import os
 import json
 from click.testing import CliRunner
+from ladybug.futil import nukedir
 
 from honeybee_radiance.cli.grid import split_grid, merge_grid, from_rooms, \
-    from_rooms_radial, from_face3ds
+    from_rooms_radial, from_face3ds, sort_grid, restore_order
 from honeybee_radiance.sensorgrid import SensorGrid
 
 
@@ -85,6 +86,33 @@ def test_from_rooms():
     assert all(isinstance(sg, SensorGrid) for sg in new_grids)
 
 
+def test_from_rooms_workers():
+    runner = CliRunner()
+    input_hb_model = './tests/assets/model/model_radiance_dynamic_states.hbjson'
+
+    result = runner.invoke(from_rooms, [input_hb_model, '--write-pts'])
+    assert result.exit_code == 0
+    result_workers = runner.invoke(
+        from_rooms, [input_hb_model, '--write-pts', '--workers', '2'])
+    assert result_workers.exit_code == 0
+    assert result_workers.output == result.output
+
+    output_folder = './tests/assets/temp/room_grids'
+    if not os.path.isdir(output_folder):
+        os.makedirs(output_folder)
+    result = runner.invoke(
+        from_rooms, [input_hb_model, '--write-pts', '--workers', '2',
+                     '--folder', output_folder])
+    assert result.exit_code == 0
+    with open(os.path.join(output_folder, '_info.json')) as inf:
+        grids_info = json.load(inf)
+    assert len(grids_info) == 2
+    for info in grids_info:
+        pts_file = os.path.join(output_folder, info['full_id'] + '.pts')
+        assert SensorGrid.from_file(pts_file).count == info['count']
+    nukedir(output_folder, True)
+
+
 def test_from_rooms_radial():
     runner = CliRunner()
     input_hb_model = './tests/assets/model/model_radiance_dynamic_states.hbjson'
@@ -107,3 +135,28 @@ def test_from_face3ds():
     new_grids = [SensorGrid.from_dict(sg) for sg in sg_dict]
     assert len(new_grids) == 1
     assert all(isinstance(sg, SensorGrid) for sg in new_grids)
+
+
+def test_sort_grid_and_restore_order():
+    runner = CliRunner()
+    input_grid = './tests/assets/grid/sensor_grid_split.pts'
+    output_folder = './tests/assets/temp/sorted_grid'
+    if not os.path.isdir(output_folder):
+        os.makedirs(output_folder)
+    sorted_grid = os.path.join(output_folder, 'sorted.pts')
+    mapping_file = os.path.join(output_folder, 'sorted_order.json')
+
+    result = runner.invoke(
+        sort_grid, [input_grid, '-m', mapping_file, '-f', sorted_grid])
+    assert result.exit_code == 0
+    assert SensorGrid.from_file(sorted_grid).count == 21
+
+    # the sorted grid can be used as a result file to test restoring the order
+    result = runner.invoke(restore_order, [sorted_grid, mapping_file])
+    assert result.exit_code == 0
+    original = SensorGrid.from_file(input_grid)
+    restored = [[float(v) for v in line.split()]
+                for line in result.output.splitlines()]
+    assert restored == [list(p) + list(d) for p, d in
+                        zip(original.positions, original.directions)]
+    nukedir(output_folder, True)
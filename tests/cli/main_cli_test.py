@@ -1,8 +1,10 @@
 """Test cli lib module."""
 from click.testing import CliRunner
-from honeybee_radiance.cli import config
+from honeybee_radiance.cli import config, radiance
 
+import sys
 import json
+import subprocess
 
 
 def test_config():
@@ -13,3 +15,41 @@ def test_config():
     assert result.exit_code == 0
     config_dict = json.loads(result.output)
     assert len(config_dict) >= 6
+
+
+def test_lazy_sub_commands():
+    """Test that the sub-commands are resolved when they are first used."""
+    runner = CliRunner()
+    result = runner.invoke(radiance, ['--help'])
+    assert result.exit_code == 0
+    for cmd_name in ('translate', 'post-process', 'view-factor', 'multi-phase'):
+        assert cmd_name in result.output
+
+    result = runner.invoke(radiance, ['translate', '--help'])
+    assert result.exit_code == 0
+    assert 'model-to-rad-folder' in result.output
+
+
+def test_cli_startup():
+    """Test that the CLI starts without importing the modules of the sub-commands."""
+    heavy_modules = (
+        'honeybee_radiance.cli.translate', 'honeybee_radiance.cli.postprocess',
+        'honeybee_radiance.postprocess', 'honeybee_radiance.lightsource',
+        'ladybug.wea', 'ladybug.epw', 'ladybug.sunpath'
+    )
+    code = 'import sys, click\n' \
+        'import honeybee_radiance.cli as cli\n' \
+        'def loaded():\n' \
+        '    return ",".join(m for m in {} if m in sys.modules)\n' \
+        'before = loaded()\n' \
+        'cli.radiance.get_command(click.Context(cli.radiance), "grid")\n' \
+        'cli_mods = [m for m in sys.modules\n' \
+        '            if m.startswith("honeybee_radiance.cli.")]\n' \
+        'print("{{}}|{{}}|{{}}".format(before, loaded(), ",".join(cli_mods)))\n'.format(
+            heavy_modules)
+    output = subprocess.check_output([sys.executable, '-c', code])
+    before, after, cli_modules = output.decode('utf-8').strip().split('|')
+    assert before == ''
+    # resolving one sub-command only imports the module of this sub-command
+    assert after == ''
+    assert cli_modules == 'honeybee_radiance.cli.grid'
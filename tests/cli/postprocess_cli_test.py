@@ -6,11 +6,39 @@ from click.testing import CliRunner
 
 from ladybug.futil import nukedir
 
-from honeybee_radiance.cli.postprocess import annual_irradiance, leed_illuminance, \
+from honeybee_radiance.cli.postprocess import convert_matrix_to_binary, count_values, \
+    sum_matrix_rows, annual_irradiance, annual_metrics, \
+    threshold_index, annual_metrics_from_index, leed_illuminance, \
     daylight_fatcor_config, point_in_time_config, cumulative_radiation_config, \
     direct_sun_hours_config, sky_view_config
 
 
+def test_convert_to_binary_packed():
+    runner = CliRunner()
+    input_matrix = './tests/assets/irrad_result/TestRoom_1.ill'
+    packed_file = './tests/assets/temp/TestRoom_1_packed.bin'
+    ascii_file = './tests/assets/temp/TestRoom_1_ascii.txt'
+    cmd_args = [input_matrix, '--minimum', '100']
+
+    result = runner.invoke(convert_matrix_to_binary, cmd_args + ['-o', ascii_file])
+    assert result.exit_code == 0
+    result = runner.invoke(
+        convert_matrix_to_binary, cmd_args + ['--packed', '-o', packed_file])
+    assert result.exit_code == 0
+    assert os.path.getsize(packed_file) * 10 < os.path.getsize(ascii_file)
+
+    for command, args in ((count_values, ['--minimum', '1']), (sum_matrix_rows, [])):
+        ascii_result = runner.invoke(command, [ascii_file] + args)
+        packed_result = runner.invoke(command, [packed_file] + args)
+        assert packed_result.exit_code == 0
+        assert packed_result.output == ascii_result.output
+    ones = runner.invoke(count_values, [packed_file, '--minimum', '1']).output
+    zeros = runner.invoke(count_values, [packed_file, '--maximum', '0']).output
+    assert [int(v) + int(z) for v, z in zip(ones.split(), zeros.split())] == [4393] * 4
+    os.remove(packed_file)
+    os.remove(ascii_file)
+
+
 def test_annual_irradiance():
     runner = CliRunner()
     input_folder = './tests/assets/irrad_result'
@@ -39,6 +67,46 @@ def test_annual_irradiance_epw():
     nukedir(result_dir, rmdir=True)
 
 
+def test_annual_daylight_workers():
+    runner = CliRunner()
+    input_folder = './tests/assets/irrad_result'
+    sub_folder = 'metrics'
+    result_dir = os.path.join(input_folder, sub_folder)
+    cmd_args = [input_folder, '--sub_folder', sub_folder, '--workers', '2']
+
+    result = runner.invoke(annual_metrics, cmd_args)
+    assert result.exit_code == 0
+    for grid in ('TestRoom_1', 'TestRoom_2'):
+        assert os.path.isfile(os.path.join(result_dir, 'da', '%s.da' % grid))
+    nukedir(result_dir, rmdir=True)
+
+
+def test_threshold_index():
+    runner = CliRunner()
+    input_folder = './tests/assets/irrad_result'
+    index_dir = os.path.join(input_folder, 'threshold_index')
+    result_dir = os.path.join(input_folder, 'metrics_from_index')
+    metrics_dir = os.path.join(input_folder, 'metrics')
+    existing_file = os.path.join(metrics_dir, 'da', 'TestRoom_1.da')
+    os.makedirs(os.path.dirname(existing_file))
+    with open(existing_file, 'w') as outf:
+        outf.write('existing metrics')
+
+    result = runner.invoke(threshold_index, [input_folder, '--bin-count', '50'])
+    assert result.exit_code == 0
+    assert os.path.isfile(os.path.join(index_dir, 'TestRoom_1.idx'))
+
+    result = runner.invoke(annual_metrics_from_index, [index_dir, '-t', '250'])
+    assert result.exit_code == 0
+    for grid in ('TestRoom_1', 'TestRoom_2'):
+        assert os.path.isfile(os.path.join(result_dir, 'da', '%s.da' % grid))
+    with open(existing_file) as inf:  # the metrics of the results are left alone
+        assert inf.read() == 'existing metrics'
+    nukedir(index_dir, rmdir=True)
+    nukedir(result_dir, rmdir=True)
+    nukedir(metrics_dir, rmdir=True)
+
+
 def test_leed_illuminance():
     runner = CliRunner()
     input_folder = './tests/assets/leed'
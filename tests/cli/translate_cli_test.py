@@ -83,6 +83,10 @@ def test_model_to_rad_folder_model_grid_info():
     with open(info_file) as _info:
         inf = json.load(_info)
 
+    # the size of each sensor file is written next to its count
+    for grid_info in inf:
+        pts_file = "./tests/assets/model/model/grid/{}.pts".format(grid_info["full_id"])
+        assert grid_info.pop("pts_size") == os.path.getsize(pts_file)
     assert inf == [
         {
             "name": "core",
@@ -48,3 +48,11 @@ def test_from_and_to_dict():
     polygon_from_dict = Polygon.from_dict(polygon_dict)
 
     assert polygon_from_dict.to_radiance() == polygon.to_radiance()
+
+
+def test_to_radiance_precision():
+    geo = Polygon('test_polygon', [[0.123456, 1.0, 2.5], [1.0, 0.98765, 2.5],
+                                   [1.0, 1.0, 2.5]])
+    assert geo.to_radiance(minimal=True, precision=2) == \
+        'void polygon test_polygon 0 0 9 0.12 1.0 2.5 1.0 0.99 2.5 1.0 1.0 2.5'
+    assert '0.123456' in geo.to_radiance(minimal=True)
@@ -0,0 +1,66 @@
+"""Test the cost-weighted distribution of sensor grids."""
+import os
+import json
+
+import pytest
+
+from honeybee_radiance_folder.gridutil import restore_original_distribution
+
+from honeybee_radiance.gridutil import redistribute_sensors_by_cost, \
+    load_sensor_weights
+
+
+def _write_grids(folder):
+    grids = {'room_1': 40, 'room_2': 10, 'room_3': 30}
+    for name, count in grids.items():
+        with open(os.path.join(folder, '%s.pts' % name), 'w') as outf:
+            for i in range(count):
+                outf.write('%d 0 0 0 0 1\n' % i)
+    info = [{'full_id': name, 'count': count} for name, count in grids.items()]
+    with open(os.path.join(folder, '_info.json'), 'w') as outf:
+        json.dump(info, outf)
+
+
+def test_redistribute_sensors_by_cost(tmpdir):
+    input_folder = str(tmpdir.mkdir('grids'))
+    output_folder = str(tmpdir.join('split'))
+    _write_grids(input_folder)
+    weights_file = str(tmpdir.join('weights.json'))
+    with open(weights_file, 'w') as outf:
+        json.dump({'room_2': 10, 'room_3': [1] * 29 + [20]}, outf)
+    weights = load_sensor_weights(weights_file)
+
+    grid_count, costs, out_info = redistribute_sensors_by_cost(
+        input_folder, output_folder, 4, weights)
+    assert grid_count == 4
+    assert sum(costs) == 40 + 100 + 49
+    assert max(costs) - min(costs) <= 20
+    assert sum(info['count'] for info in out_info) == 80
+    assert [info['count'] for info in out_info] != [20] * 4
+
+    # the original grids can be restored from the distributed grids
+    restored_folder = str(tmpdir.join('restored'))
+    restore_original_distribution(output_folder, restored_folder, 'pts')
+    for name in ('room_1', 'room_2', 'room_3'):
+        with open(os.path.join(input_folder, name + '.pts')) as inf:
+            original = inf.read()
+        with open(os.path.join(restored_folder, name + '.pts')) as inf:
+            assert inf.read() == original
+
+
+def test_redistribute_sensors_expensive_sensor(tmpdir):
+    input_folder = str(tmpdir.mkdir('grids'))
+    output_folder = str(tmpdir.join('split'))
+    _write_grids(input_folder)
+    weights = {'room_1': [1000] + [1] * 39}
+    grid_count, costs, out_info = redistribute_sensors_by_cost(
+        input_folder, output_folder, 8, weights)
+    # the grids that would not have any sensors are skipped
+    assert grid_count == len(costs) == len(out_info) < 8
+    assert out_info[0]['count'] == 1
+    assert sorted(os.listdir(output_folder)) == \
+        ['%d.pts' % i for i in range(grid_count)] + ['_info.json', '_redist_info.json']
+
+    with pytest.raises(AssertionError):
+        redistribute_sensors_by_cost(
+            input_folder, output_folder, 4, {'room_2': [1, 2]})
@@ -0,0 +1,61 @@
+"""Test the lazy loading of the modifier and modifier set library."""
+import os
+import json
+import pytest
+
+from honeybee_radiance.lib.modifiers import modifier_by_identifier, MODIFIERS, black
+from honeybee_radiance.lib.modifiersets import modifier_set_by_identifier, \
+    MODIFIER_SETS, generic_modifier_set_visible
+from honeybee_radiance.lib._loadmodifiers import cached_folder_index, \
+    index_modifiers_from_folder
+
+
+def test_modifier_by_identifier():
+    assert 'black' in MODIFIERS
+    assert modifier_by_identifier('black') is black
+    with pytest.raises(ValueError):
+        modifier_by_identifier('not_a_library_modifier')
+
+
+def test_modifier_set_by_identifier():
+    identifier = generic_modifier_set_visible.identifier
+    assert identifier in MODIFIER_SETS
+    assert modifier_set_by_identifier(identifier) is generic_modifier_set_visible
+    with pytest.raises(ValueError):
+        modifier_set_by_identifier('not_a_library_modifier_set')
+
+
+def test_cached_folder_index(tmpdir):
+    lib_folder = tmpdir.mkdir('modifiers')
+    lib_folder.join('custom.mat').write(
+        'void plastic custom_wall\n0\n0\n5 0.4 0.4 0.4 0 0\n')
+    index = cached_folder_index(str(lib_folder), index_modifiers_from_folder)
+    assert index['custom_wall'][0] == 'rad'
+    cache_file = os.path.join(str(tmpdir), '.modifiers_cache.json')
+    assert os.path.isfile(cache_file)
+
+    # an up-to-date cache is used without indexing the folder again
+    def fail_index(folder):
+        raise AssertionError('The folder should not be indexed.')
+    assert cached_folder_index(str(lib_folder), fail_index) == index
+
+    # changing the files of the folder invalidates the cache
+    lib_folder.join('custom.json').write(json.dumps(
+        {'type': 'Plastic', 'identifier': 'custom_floor', 'r_reflectance': 0.2,
+         'g_reflectance': 0.2, 'b_reflectance': 0.2}))
+    index = cached_folder_index(str(lib_folder), index_modifiers_from_folder)
+    assert index['custom_floor'][0] == 'json'
+    assert 'custom_wall' in index
+
+
+def test_index_skips_default_identifiers(tmpdir):
+    lib_folder = tmpdir.mkdir('modifiers')
+    lib_folder.join('custom.mat').write(
+        'void plastic black\n0\n0\n5 0.4 0.4 0.4 0 0\n\n'
+        'void plastic custom_wall\n0\n0\n5 0.4 0.4 0.4 0 0\n')
+    lib_folder.join('custom.json').write(json.dumps(
+        {'type': 'Plastic', 'identifier': 'black', 'r_reflectance': 0.2,
+         'g_reflectance': 0.2, 'b_reflectance': 0.2}))
+    with pytest.warns(UserWarning):
+        index = index_modifiers_from_folder(str(lib_folder))
+    assert list(index.keys()) == ['custom_wall']
@@ -139,6 +139,19 @@ def test_with_alternate_material():
     assert mm._dependencies == []
 
 
+def test_rename_alternate_material():
+    alt_mat = Mirror('alt_mat')
+    mm = Mirror('mirror_mat', alternate_material=alt_mat)
+    assert mm.to_radiance(minimal=True, include_dependencies=False) == \
+        'void mirror mirror_mat 1 alt_mat 0 3 1.0 1.0 1.0'
+    mm_hash = hash(mm)
+
+    alt_mat.identifier = 'new_alt_mat'
+    assert mm.to_radiance(minimal=True, include_dependencies=False) == \
+        'void mirror mirror_mat 1 new_alt_mat 0 3 1.0 1.0 1.0'
+    assert hash(mm) != mm_hash
+
+
 def test_from_to_dict_with_alternate_material():
     material_string = """
     void glass glass_alt_mat
@@ -15,13 +15,20 @@ from honeybee_radiance.dynamic import RadianceSubFaceState, RadianceShadeState,
 from honeybee_radiance.modifierset import ModifierSet
 from honeybee_radiance.modifier import Modifier
 from honeybee_radiance.modifier.material import Plastic, Glass, Trans, BSDF
+from honeybee_radiance.writer import read_manifest, model_to_rad_file, \
+    precision_from_tolerance, shade_mesh_to_rad
+from honeybee_radiance.config import folders as rad_folders
+import honeybee_radiance.writer as writer
 
 from honeybee_radiance_folder.folder import ModelFolder
 from ladybug.futil import nukedir
 from ladybug_geometry.geometry3d import Point3D, Vector3D, Plane, Face3D, Mesh3D
 
 import os
+import sys
+import subprocess
 import pytest
+from io import StringIO
 
 
 def test_radiance_properties():
@@ -143,6 +150,44 @@ def test_check_duplicate_modifier_identifiers():
         model.properties.radiance.check_duplicate_modifier_identifiers(True)
 
 
+def test_cache_modifiers():
+    """Test the cache_modifiers and modifier_by_identifier methods."""
+    room = Room.from_box('Tiny_House_Zone', 5, 10, 3)
+    high_ref_ceil = Plastic.from_single_reflectance('CustomModifier', 0.9)
+    room[-1].properties.radiance.modifier = high_ref_ceil
+    shades = []
+    for i in range(20):
+        shade = Shade('Shade_{}'.format(i), Face3D(
+            [Point3D(i, -1, 0), Point3D(i + 1, -1, 0), Point3D(i + 1, -1, 2)]))
+        shade.properties.radiance.modifier = \
+            Plastic.from_single_reflectance('Shade_Mod_{}'.format(i % 5), 0.4)
+        shades.append(shade)
+    model = Model('Tiny_House', [room], orphaned_shades=shades)
+    rad_props = model.properties.radiance
+
+    assert len(rad_props.shade_modifiers) == 5
+    assert rad_props.modifier_by_identifier('CustomModifier') is high_ref_ceil
+    assert rad_props.modifier_by_identifier('black').identifier == 'black'
+    with pytest.raises(ValueError):
+        rad_props.modifier_by_identifier('not_a_modifier')
+
+    with rad_props.cache_modifiers():
+        modifiers = rad_props.modifiers
+        assert set(rad_props.modifiers) == set(modifiers)
+        assert rad_props._modifier_cache['modifiers'] is not modifiers
+        modifiers.append(high_ref_ceil)  # editing the list does not edit the cache
+        assert len(rad_props.modifiers) == len(modifiers) - 1
+        with rad_props.cache_modifiers():  # nested contexts use the same cache
+            assert 'modifiers' in rad_props._modifier_cache
+        assert 'modifiers' in rad_props._modifier_cache
+
+        # changing the modifiers through the properties clears the cache
+        model_dict = model.to_dict()
+        rad_props.apply_properties_from_dict(model_dict)
+        assert rad_props._modifier_cache == {}
+    assert rad_props._modifier_cache is None
+
+
 def check_sensor_grid_rooms_in_model():
     """Test the check_sensor_grid_rooms_in_model."""
     first_floor = Room.from_box('FirstFloor', 10, 10, 3, origin=Point3D(0, 0, 0))
@@ -594,6 +639,257 @@ def test_writer_to_rad_folder():
     nukedir(folder, rmdir=True)
 
 
+def test_writer_to_rad_folder_incremental():
+    """Test the Model to.rad_folder method with incremental writes."""
+    room = Room.from_box('Tiny_House_Zone', 5, 10, 3)
+    garage = Room.from_box('Tiny_Garage', 5, 10, 3, origin=Point3D(5, 0, 0))
+    room[3].apertures_by_ratio(0.4, 0.01)
+    model = Model('Tiny_House', [room, garage])
+    grids = [r.properties.radiance.generate_sensor_grid(1) for r in model.rooms]
+    model.properties.radiance.sensor_grids = grids
+
+    folder = os.path.abspath('./tests/assets/model/rad_folder_incremental')
+    model.to.rad_folder(model, folder, incremental=True)
+    manifest = read_manifest(folder)
+    assert len(manifest['changed']) == len(manifest['files'])
+    assert 'grid/Tiny_Garage.pts' in manifest['files']
+    assert 'room/Tiny_Garage' in manifest['changed_objects']
+
+    # writing the same model again does not change any files
+    model.to.rad_folder(model, folder, incremental=True)
+    manifest = read_manifest(folder)
+    assert manifest['changed'] == []
+    assert manifest['removed'] == []
+    assert manifest['changed_objects'] == []
+
+    # only the files of the changed sensor grid are rewritten
+    grids[1].move(Vector3D(0, 0, 0.1))
+    model.to.rad_folder(model, folder, incremental=True)
+    manifest = read_manifest(folder)
+    assert manifest['changed'] == ['grid/Tiny_Garage.pts']
+    assert manifest['changed_objects'] == ['grid/Tiny_Garage']
+
+    # the files of removed sensor grids are removed from the folder
+    model.properties.radiance.sensor_grids = grids[:1]
+    model.to.rad_folder(model, folder, incremental=True)
+    manifest = read_manifest(folder)
+    assert 'grid/Tiny_Garage.pts' in manifest['removed']
+    model_folder = ModelFolder(folder)
+    assert not os.path.isfile(
+        os.path.join(model_folder.grid_folder(full=True), 'Tiny_Garage.pts'))
+
+    nukedir(folder, rmdir=True)
+
+
+def test_writer_to_rad_folder_incremental_hash_seed():
+    """Test that incremental writes of the same model in new processes match."""
+    room = Room.from_box('Tiny_House_Zone', 5, 10, 3)
+    room[3].apertures_by_ratio(0.4, 0.01)
+    model = Model('Tiny_House', [room])
+    folder = os.path.abspath('./tests/assets/model/rad_folder_hash_seed')
+    if not os.path.isdir(folder):
+        os.makedirs(folder)
+    model_file = model.to_hbjson('Tiny_House', folder)
+
+    script = 'from honeybee.model import Model\n' \
+        'model = Model.from_hbjson({!r})\n' \
+        'model.to.rad_folder(model, {!r}, incremental=True)\n'.format(
+            model_file, folder)
+    for seed in ('1', '2', '3'):
+        env = dict(os.environ, PYTHONHASHSEED=seed)
+        subprocess.check_call([sys.executable, '-c', script], env=env)
+    manifest = read_manifest(folder)
+    assert manifest['changed'] == []
+
+    nukedir(folder, rmdir=True)
+
+
+def _large_shade_mesh_model(count):
+    """Get a Model with a triangulated ShadeMesh of count x count cells."""
+    verts = [Point3D(i, j, 0.5 * i) for i in range(count + 1) for j in range(count + 1)]
+    faces = []
+    for i in range(count):
+        for j in range(count):
+            a, b = i * (count + 1) + j, (i + 1) * (count + 1) + j
+            faces.extend([(a, b, b + 1), (a, b + 1, a + 1)])
+    awning = ShadeMesh('Context_Mesh', Mesh3D(verts, faces))
+    canopy = Shade('Canopy', Face3D([Point3D(0, 0, 5), Point3D(2, 0, 5),
+                                     Point3D(2, 2, 5), Point3D(0, 2, 5)]))
+    return Model('Large_Context', orphaned_shades=[canopy], shade_meshes=[awning])
+
+
+def test_writer_to_rad_streaming():
+    """Test that the streamed RAD files match the RAD strings."""
+    model = _large_shade_mesh_model(10)
+    mesh = model.shade_meshes[0]
+
+    folder = os.path.abspath('./tests/assets/model/rad_folder_streaming')
+    model.to.rad_folder(model, folder)
+    mesh_file = os.path.join(
+        ModelFolder(folder).scene_folder(full=True), 'shade_meshes.rad')
+    with open(mesh_file) as inf:
+        mesh_str = inf.read()
+    vertices = [' '.join('{:.2f}'.format(v) for v in pt) for pt in mesh.vertices]
+    expected = '\n'.join(
+        'generic_context_0.20 polygon Context_Mesh_{} 0 0 9 {}'.format(
+            i, ' '.join(vertices[v] for v in face))
+        for i, face in enumerate(mesh.faces))
+    assert mesh_str == expected
+    nukedir(folder, rmdir=True)
+
+    model_str, modifier_str = model.to.rad(model)
+    output_file = StringIO()
+    model_to_rad_file(model, output_file)
+    assert output_file.getvalue() == '\n\n'.join(
+        ['# ========  MODEL MODIFIERS ========', modifier_str,
+         '# ========  MODEL GEOMETRY ========', model_str])
+    assert 'Context_Mesh_199' in model_str
+
+
+def test_writer_to_rad_precision():
+    """Test writing the Model geometry with a precision derived from the tolerance."""
+    assert precision_from_tolerance(0.01) == 2
+    assert precision_from_tolerance(0.0005) == 4
+    assert precision_from_tolerance(1) == 3
+    shade = Shade('Rounded_Shade', Face3D(
+        [Point3D(0.123456, 0, 3), Point3D(2, 0, 3), Point3D(2, 2.987654, 3)]))
+    mesh = Mesh3D([Point3D(0.123456, 0, 5), Point3D(2, 0, 5), Point3D(2, 2.987654, 5)],
+                  [(0, 1, 2)])
+    shade_mesh = ShadeMesh('Rounded_Mesh', mesh)
+    model = Model('Rounded_Model', orphaned_shades=[shade], shade_meshes=[shade_mesh],
+                  tolerance=0.01)
+    precision = precision_from_tolerance(model.tolerance)
+    model_str, _ = model.to.rad(model, precision=precision)
+    model_str = ' '.join(model_str.split())
+    assert '0.12 0.0 3.0 2.0 0.0 3.0 2.0 2.99 3.0' in model_str
+    assert '0.12 0.0 5.0 2.0 0.0 5.0 2.0 2.99 5.0' in model_str
+    assert shade_mesh_to_rad(shade_mesh, precision=precision).endswith(
+        '0.12 0.0 5.0 2.0 0.0 5.0 2.0 2.99 5.0')
+    full_str, _ = model.to.rad(model)
+    assert len(model_str) < len(full_str)
+
+    folder = os.path.abspath('./tests/assets/model/rad_folder_precision')
+    model.to.rad_folder(model, folder, precision=precision)
+    shade_file = os.path.join(ModelFolder(folder).scene_folder(full=True), 'shades.rad')
+    with open(shade_file) as inf:
+        assert '2.99' in inf.read()
+    mesh_file = os.path.join(
+        ModelFolder(folder).scene_folder(full=True), 'shade_meshes.rad')
+    with open(mesh_file) as inf:
+        assert '2.0 2.99 5.0' in inf.read()
+    nukedir(folder, rmdir=True)
+
+
+def test_writer_to_rad_folder_peak_memory():
+    """Test that the peak memory of writing a large ShadeMesh is below the file size."""
+    tracemalloc = pytest.importorskip('tracemalloc')
+    model = _large_shade_mesh_model(160)
+    folder = os.path.abspath('./tests/assets/model/rad_folder_memory')
+    tracemalloc.start()
+    try:
+        model.to.rad_folder(model, folder)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    mesh_file = os.path.join(
+        ModelFolder(folder).scene_folder(full=True), 'shade_meshes.rad')
+    file_size = os.path.getsize(mesh_file)
+    nukedir(folder, rmdir=True)
+    assert file_size > 4000000
+    assert peak < file_size * 0.75
+
+
+def test_writer_to_rad_folder_rtm():
+    """Test the Model to.rad_folder method with ShadeMeshes written as meshes."""
+    model = _large_shade_mesh_model(10)
+    folder = os.path.abspath('./tests/assets/model/rad_folder_rtm')
+    scene_dir = ModelFolder(folder).scene_folder(full=True)
+    obj2mesh = os.path.join(rad_folders.radbin_path, 'obj2mesh') \
+        if rad_folders.radbin_path else ''
+    if os.path.isfile(obj2mesh) or os.path.isfile(obj2mesh + '.exe'):
+        model.to.rad_folder(model, folder, rtm_face_count=100)
+        with open(os.path.join(scene_dir, 'shade_meshes.rad')) as inf:
+            mesh_str = inf.read()
+        assert mesh_str == 'generic_context_0.20 mesh Context_Mesh 1 ' \
+            'model/scene/Context_Mesh.rtm 0 0'
+        assert os.path.isfile(os.path.join(scene_dir, 'Context_Mesh.rtm'))
+        assert not os.path.isfile(os.path.join(scene_dir, 'Context_Mesh.obj'))
+    else:
+        with pytest.raises(ValueError):
+            model.to.rad_folder(model, folder, rtm_face_count=100)
+
+    # meshes with fewer faces are still written as polygons
+    model.to.rad_folder(model, folder, rtm_face_count=200)
+    with open(os.path.join(scene_dir, 'shade_meshes.rad')) as inf:
+        assert inf.read().count('polygon') == 200
+    nukedir(folder, rmdir=True)
+
+
+def test_writer_to_rad_folder_instances():
+    """Test the Model to.rad_folder method with shades written as instances."""
+    rooms = []
+    for i in range(3):
+        room = Room.from_box('Room_{}'.format(i), 5, 5, 3, origin=Point3D(10 * i, 0, 0))
+        room[3].apertures_by_ratio(0.4, 0.01)
+        room[3].apertures[0].louvers_by_count(4, 0.3, 0.1, 5)
+        room.rotate_xy(30 * i, Point3D(0, 0, 0))
+        rooms.append(room)
+    model = Model('Louvre_Model', rooms, tolerance=0.01)
+    folder = os.path.abspath('./tests/assets/model/rad_folder_instances')
+    scene_dir = ModelFolder(folder).scene_folder(full=True)
+    oconv = os.path.join(rad_folders.radbin_path, 'oconv') \
+        if rad_folders.radbin_path else ''
+    if os.path.isfile(oconv) or os.path.isfile(oconv + '.exe'):
+        model.to.rad_folder(model, folder, instance_count=3)
+        with open(os.path.join(scene_dir, 'shades.rad')) as inf:
+            shade_strs = inf.read().split('\n\n')
+        assert len(shade_strs) == 3
+        assert all(' instance ' in shd_str for shd_str in shade_strs)
+        angles = [float(shd_str.split()[6]) for shd_str in shade_strs]
+        assert (angles[1] - angles[0]) % 360 == pytest.approx(30, abs=1e-6)
+        assert os.path.isfile(os.path.join(scene_dir, 'instances', 'shades_0.oct'))
+        assert not os.path.isfile(os.path.join(scene_dir, 'instances', 'shades_0.rad'))
+    else:
+        with pytest.raises(ValueError):
+            model.to.rad_folder(model, folder, instance_count=3)
+
+    # groups with fewer copies are still written as polygons
+    model.to.rad_folder(model, folder, instance_count=4)
+    with open(os.path.join(scene_dir, 'shades.rad')) as inf:
+        assert inf.read().count('polygon') == 12
+    nukedir(folder, rmdir=True)
+
+
+def test_writer_to_rad_folder_instance_count(monkeypatch):
+    """Test that groups with exactly instance_count copies are written as instances."""
+    rooms = []
+    for i in range(3):
+        room = Room.from_box('Room_{}'.format(i), 5, 5, 3, origin=Point3D(10 * i, 0, 0))
+        room[3].apertures_by_ratio(0.4, 0.01)
+        room[3].apertures[0].louvers_by_count(4, 0.3, 0.1, 5)
+        rooms.append(room)
+    model = Model('Louvre_Model', rooms, tolerance=0.01)
+    folder = os.path.abspath('./tests/assets/model/rad_folder_instance_count')
+    scene_dir = ModelFolder(folder).scene_folder(full=True)
+
+    # compile no octree such that the test does not need the oconv command
+    def prototype_path(name, mod_id, faces, coords, oct_folder):
+        return os.path.join(oct_folder, name + '.oct')
+    monkeypatch.setattr(writer, '_prototype_to_octree', prototype_path)
+
+    model.to.rad_folder(model, folder, instance_count=3)
+    with open(os.path.join(scene_dir, 'shades.rad')) as inf:
+        shade_str = inf.read()
+    assert shade_str.count(' instance ') == 3
+    assert shade_str.count('polygon') == 0
+    model.to.rad_folder(model, folder, instance_count=4)
+    with open(os.path.join(scene_dir, 'shades.rad')) as inf:
+        shade_str = inf.read()
+    assert shade_str.count(' instance ') == 0
+    assert shade_str.count('polygon') == 12
+    nukedir(folder, rmdir=True)
+
+
 def test_writer_to_rad_folder_dynamic():
     """Test the Model to.rad_folder method with dynamic geometry."""
     room = Room.from_box('Tiny_House_Zone', 5, 10, 3)
@@ -926,3 +1222,51 @@ def test_check_duplicate_sensor_grid_identifiers():
     model.properties.radiance.merge_duplicate_identifier_grids()
     assert model.properties.radiance.check_duplicate_sensor_grid_identifiers(False) == ''
     assert len(model.properties.radiance.sensor_grids) == 1
+
+
+def test_deduplicate_modifiers():
+    """Test the deduplicate_modifiers method."""
+    room = Room.from_box('TinyHouseZone', 5, 10, 3)
+    south_face = room[3]
+    south_face.apertures_by_ratio(0.4, 0.01)
+    south_face.apertures[0].overhang(0.5, indoor=False)
+    wall_1 = Plastic.from_single_reflectance('WallCopy_1', 0.4)
+    wall_2 = Plastic.from_single_reflectance('WallCopy_2', 0.4)
+    wall_3 = Plastic.from_single_reflectance('OtherWall', 0.45)
+    glass_1 = Glass.from_single_transmittance('GlassCopy', 0.6)
+    room[1].properties.radiance.modifier = wall_1
+    room[2].properties.radiance.modifier = wall_2
+    room[4].properties.radiance.modifier = wall_3
+    south_face.apertures[0].properties.radiance.modifier = glass_1
+    shade = south_face.apertures[0].outdoor_shades[0]
+    wall_4 = wall_2.duplicate()
+    wall_4.identifier = 'WallCopy_3'
+    shade.properties.radiance.modifier = wall_4
+    shade.properties.radiance.modifier_blk = wall_2
+    mod_set = ModifierSet('SetWithCopies')
+    mod_set.wall_set.interior_modifier = wall_2
+    room.properties.radiance.modifier_set = mod_set
+    model = Model('TinyHouse', [room])
+
+    assert len(model.properties.radiance.modifiers) == 5
+    assert model.properties.radiance.deduplicate_modifiers() == 2
+    assert len(model.properties.radiance.modifiers) == 3
+    assert room[2].properties.radiance.modifier is wall_1
+    assert shade.properties.radiance.modifier is wall_1
+    assert shade.properties.radiance.modifier_blk is wall_1
+    new_set = room.properties.radiance.modifier_set
+    assert new_set.identifier == mod_set.identifier
+    assert new_set.wall_set.interior_modifier is wall_1
+    assert mod_set.wall_set.interior_modifier is wall_2
+    assert room[4].properties.radiance.modifier is wall_3
+    assert south_face.apertures[0].properties.radiance.modifier is glass_1
+    assert model.properties.radiance.deduplicate_modifiers() == 0
+
+    # modifiers with the same content as the defaults use the default modifiers
+    generic_glass = model.properties.radiance.global_modifier_set \
+        .aperture_set.window_modifier
+    glass_2 = generic_glass.duplicate()
+    glass_2.identifier = 'GenericGlassCopy'
+    south_face.apertures[0].properties.radiance.modifier = glass_2
+    assert model.properties.radiance.deduplicate_modifiers() == 1
+    assert south_face.apertures[0].properties.radiance.modifier is generic_glass
@@ -0,0 +1,74 @@
+"""Test the annual daylight post-processing functions."""
+import os
+
+import pytest
+
+from ladybug.futil import nukedir
+
+import honeybee_radiance.postprocess.annualmetrics as annualmetrics
+from honeybee_radiance.postprocess.annualdaylight import metrics, metrics_to_folder
+from honeybee_radiance.postprocess.annual import filter_schedule_by_hours
+
+
+def _read_metric_files(metrics_folder):
+    """Read all of the metric files in a metrics folder into a dictionary."""
+    results = {}
+    for metric in ('da', 'cda', 'udi_lower', 'udi', 'udi_upper'):
+        metric_folder = os.path.join(metrics_folder, metric)
+        for f in sorted(os.listdir(metric_folder)):
+            if f.endswith('.json'):
+                continue
+            with open(os.path.join(metric_folder, f)) as inf:
+                results[(metric, f)] = inf.read()
+    return results
+
+
+def test_metrics():
+    ill_file = './tests/assets/irrad_result/TestRoom_1.ill'
+    with open('./tests/assets/irrad_result/sun-up-hours.txt') as suh_file:
+        sun_up_hours = [float(hour) for hour in suh_file]
+    occ_pattern, total_occ, sun_down_occ = filter_schedule_by_hours(sun_up_hours)
+    da, cda, udi_lower, udi, udi_upper = metrics(
+        ill_file, occ_pattern, 100, 10, 500, total_occ, sun_down_occ)
+
+    assert len(da) == len(cda) == len(udi_lower) == len(udi) == len(udi_upper) == 4
+    for values in zip(udi_lower, udi, udi_upper):
+        assert sum(values) == pytest.approx(100, abs=0.05)
+    for da_v, cda_v in zip(da, cda):
+        assert 0 <= da_v <= cda_v <= 100
+
+
+def test_metrics_numpy_parity():
+    """Test that the numpy and the pure Python engines produce identical results."""
+    pytest.importorskip('numpy')
+    folder = './tests/assets/irrad_result'
+    np_folder = metrics_to_folder(
+        folder, threshold=100, min_t=10, max_t=500, sub_folder='metrics_np')
+    numpy_module = annualmetrics.np
+    try:
+        annualmetrics.np = None
+        py_folder = metrics_to_folder(
+            folder, threshold=100, min_t=10, max_t=500, sub_folder='metrics_py')
+    finally:
+        annualmetrics.np = numpy_module
+
+    np_results = _read_metric_files(np_folder)
+    py_results = _read_metric_files(py_folder)
+    assert len(np_results) == 10
+    assert np_results == py_results
+    nukedir(np_folder, rmdir=True)
+    nukedir(py_folder, rmdir=True)
+
+
+def test_metrics_to_folder_workers():
+    """Test that processing the grids in parallel gives the same results."""
+    folder = './tests/assets/irrad_result'
+    single_folder = metrics_to_folder(
+        folder, threshold=100, min_t=10, max_t=500, sub_folder='metrics_single')
+    multi_folder = metrics_to_folder(
+        folder, threshold=100, min_t=10, max_t=500, sub_folder='metrics_multi',
+        workers=2)
+
+    assert _read_metric_files(single_folder) == _read_metric_files(multi_folder)
+    nukedir(single_folder, rmdir=True)
+    nukedir(multi_folder, rmdir=True)
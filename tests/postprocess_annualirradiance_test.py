@@ -0,0 +1,33 @@
+"""Test the annual irradiance post-processing functions."""
+import json
+import os
+import shutil
+
+from honeybee_radiance.postprocess.annualirradiance import annual_irradiance_to_folder
+from honeybee_radiance.postprocess.matrix import matrix_rows
+
+FOLDER = './tests/assets/irrad_result'
+WEA = './tests/assets/wea/denver.wea'
+
+
+def test_annual_irradiance_to_folder(tmpdir):
+    folder = str(tmpdir.join('irrad_result'))
+    shutil.copytree(FOLDER, folder)
+    metrics_folder = annual_irradiance_to_folder(folder, WEA, workers=2)
+
+    rows = list(matrix_rows(os.path.join(folder, 'TestRoom_1.ill')))
+    for metric in ('average_irradiance', 'peak_irradiance', 'cumulative_radiation'):
+        metric_folder = os.path.join(metrics_folder, metric)
+        assert sorted(os.listdir(metric_folder)) == [
+            'TestRoom_1.res', 'TestRoom_2.res', 'grids_info.json', 'vis_metadata.json']
+        with open(os.path.join(metric_folder, 'grids_info.json')) as inf:
+            assert [g['full_id'] for g in json.load(inf)] == \
+                ['TestRoom_1', 'TestRoom_2']
+
+    with open(os.path.join(metrics_folder, 'peak_irradiance', 'TestRoom_1.res')) as inf:
+        peak = [float(v) for v in inf]
+    assert peak == [max(row) for row in rows]
+    with open(os.path.join(metrics_folder, 'cumulative_radiation',
+                           'TestRoom_1.res')) as inf:
+        cumulative = [float(v) for v in inf]
+    assert cumulative == [sum(row) / 1000 for row in rows]
@@ -0,0 +1,150 @@
+"""Test the single-pass computation of annual metrics."""
+import os
+
+import pytest
+
+from ladybug.futil import nukedir
+
+import honeybee_radiance.postprocess.annualmetrics as annualmetrics
+from honeybee_radiance.postprocess.annualmetrics import DaylightAutonomy, \
+    ContinuousDaylightAutonomy, UsefulDaylightIlluminance, GlareAutonomy, \
+    annual_metrics, annual_metrics_to_files
+from honeybee_radiance.postprocess.en17037 import en17037_to_folder
+from honeybee_radiance.postprocess.annual import filter_schedule_by_hours
+from honeybee_radiance.postprocess.matrix import matrix_rows
+
+ILL_FILE = './tests/assets/irrad_result/TestRoom_1.ill'
+SUN_UP_FILE = './tests/assets/irrad_result/sun-up-hours.txt'
+
+
+def _occupancy():
+    with open(SUN_UP_FILE) as suh_file:
+        sun_up_hours = [float(hour) for hour in suh_file]
+    return filter_schedule_by_hours(sun_up_hours)
+
+
+def _all_metrics():
+    return [
+        DaylightAutonomy(100), DaylightAutonomy(300), DaylightAutonomy(500),
+        ContinuousDaylightAutonomy(100),
+        UsefulDaylightIlluminance(10, 500, 'lower'),
+        UsefulDaylightIlluminance(10, 500, 'udi'),
+        UsefulDaylightIlluminance(10, 500, 'upper'),
+        GlareAutonomy(200)
+    ]
+
+
+def _metrics(values, occ_pattern, threshold, min_t, max_t, total_hours,
+             sun_down_occ_hours):
+    """Compute DA, cDA and UDI for a sensor with a loop over the hourly values."""
+    da, cda, udi_lower, udi, udi_upper = 0, 0, sun_down_occ_hours, 0, 0
+    for is_occ, value in zip(occ_pattern, values):
+        if is_occ == 0:
+            continue
+        if value > threshold:
+            da += 1
+            cda += 1
+        else:
+            cda += value / threshold
+        if min_t > value:
+            udi_lower += 1
+        elif value > max_t:
+            udi_upper += 1
+        else:
+            udi += 1
+    return tuple(round(100.0 * v / total_hours, 2)
+                 for v in (da, cda, udi_lower, udi, udi_upper))
+
+
+def _daylight_autonomy(values, occ_pattern, threshold, total_hours):
+    """Compute DA for a sensor with a loop over the hourly values."""
+    da = sum(1 for is_occ, value in zip(occ_pattern, values)
+             if is_occ != 0 and value > threshold)
+    return round(100.0 * da / total_hours, 2)
+
+
+def _glare_autonomy(values, occ_pattern, glare_threshold, total_hours):
+    """Compute GA for a sensor with a loop over the hourly values."""
+    ga_above = sum(1 for is_occ, value in zip(occ_pattern, values)
+                   if is_occ != 0 and value > glare_threshold)
+    return round(100.0 * (total_hours - ga_above) / total_hours, 2)
+
+
+def _reference_metrics(occ_pattern, total_occ, sun_down_occ):
+    """Compute the metrics of _all_metrics with the original sensor functions."""
+    results = [[] for _ in range(8)]
+    for values in matrix_rows(ILL_FILE):
+        da, cda, udi_lower, udi, udi_upper = _metrics(
+            values, occ_pattern, 100, 10, 500, total_occ, sun_down_occ)
+        sensor_res = [
+            da,
+            _daylight_autonomy(values, occ_pattern, 300, total_occ),
+            _daylight_autonomy(values, occ_pattern, 500, total_occ),
+            cda, udi_lower, udi, udi_upper,
+            _glare_autonomy(values, occ_pattern, 200, total_occ)
+        ]
+        for res, val in zip(results, sensor_res):
+            res.append(val)
+    return tuple(results)
+
+
+def test_metric_repr():
+    assert repr(DaylightAutonomy(300)) == 'DaylightAutonomy: [300]'
+    with pytest.raises(AssertionError):
+        UsefulDaylightIlluminance(100, 3000, 'middle')
+
+
+def test_annual_metrics_python():
+    occ_pattern, total_occ, sun_down_occ = _occupancy()
+    numpy_module = annualmetrics.np
+    try:
+        annualmetrics.np = None
+        results = annual_metrics(
+            ILL_FILE, occ_pattern, _all_metrics(), total_occ, sun_down_occ)
+    finally:
+        annualmetrics.np = numpy_module
+    assert results == _reference_metrics(occ_pattern, total_occ, sun_down_occ)
+
+
+def test_annual_metrics_numpy():
+    pytest.importorskip('numpy')
+    occ_pattern, total_occ, sun_down_occ = _occupancy()
+    results = annual_metrics(
+        ILL_FILE, occ_pattern, _all_metrics(), total_occ, sun_down_occ)
+    assert results == _reference_metrics(occ_pattern, total_occ, sun_down_occ)
+
+
+def test_annual_metrics_to_files():
+    occ_pattern, total_occ, sun_down_occ = _occupancy()
+    folder = './tests/assets/temp/annual_metrics'
+    metrics = [DaylightAutonomy(100), UsefulDaylightIlluminance(10, 500)]
+    output_files = [os.path.join(folder, 'da', 'grid.da'),
+                    os.path.join(folder, 'udi', 'grid.udi')]
+    annual_metrics_to_files(
+        ILL_FILE, occ_pattern, metrics, output_files, total_occ, sun_down_occ)
+    expected = annual_metrics(ILL_FILE, occ_pattern, metrics, total_occ, sun_down_occ)
+    for output_file, values in zip(output_files, expected):
+        with open(output_file) as inf:
+            assert [float(v) for v in inf] == values
+    nukedir(folder, rmdir=True)
+
+
+def test_en17037_to_folder():
+    folder = './tests/assets/irrad_result'
+    schedule = [1] * 4380 + [0] * 4380
+    metrics_folder = en17037_to_folder(folder, schedule, sub_folder='en17037')
+    da_file = os.path.join(
+        metrics_folder, 'target_illuminance', 'minimum', 'da', 'TestRoom_1.da')
+    sda_file = os.path.join(
+        metrics_folder, 'target_illuminance', 'minimum', 'sda', 'TestRoom_1.sda')
+    assert os.path.isfile(da_file)
+    assert os.path.isfile(sda_file)
+
+    with open(SUN_UP_FILE) as suh_file:
+        sun_up_hours = [float(hour) for hour in suh_file]
+    occ_pattern, total_occ, _ = filter_schedule_by_hours(sun_up_hours, schedule)
+    with open(da_file) as inf:
+        assert [float(v) for v in inf] == \
+            [_daylight_autonomy(values, occ_pattern, 300, total_occ)
+             for values in matrix_rows(ILL_FILE)]
+    nukedir(metrics_folder, rmdir=True)
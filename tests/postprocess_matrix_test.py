@@ -0,0 +1,129 @@
+"""Test the functions for reading Radiance matrix files."""
+import os
+import array
+
+import pytest
+
+from honeybee_radiance.postprocess.matrix import matrix_header, matrix_rows, \
+    matrix_blocks, packed_header, pack_row, unpack_row, count_bits, packed_rows
+from honeybee_radiance.postprocess.annualdaylight import metrics
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+ILL_FILE = './tests/assets/irrad_result/TestRoom_1.ill'
+
+
+def _write_binary_matrix(values, file_path, fmt='double'):
+    """Write a list of rows into a binary Radiance matrix with a header."""
+    typecode = 'd' if fmt == 'double' else 'f'
+    folder = os.path.dirname(file_path)
+    if not os.path.isdir(folder):
+        os.makedirs(folder)
+    header = '#?RADIANCE\nrmtxop -f{}\nNROWS={}\nNCOLS={}\nNCOMP=1\nFORMAT={}\n\n'.format(
+        fmt[0], len(values), len(values[0]), fmt)
+    with open(file_path, 'wb') as outf:
+        outf.write(header.encode('ascii'))
+        for row in values:
+            array.array(typecode, row).tofile(outf)
+    return file_path
+
+
+def _write_ascii_matrix(values, file_path):
+    """Write a list of rows into an ASCII Radiance matrix with a header."""
+    header = '#?RADIANCE\nNROWS={}\nNCOLS={}\nNCOMP=1\nFORMAT=ascii\n\n'.format(
+        len(values), len(values[0]))
+    with open(file_path, 'w') as outf:
+        outf.write(header)
+        for row in values:
+            outf.write('\t'.join(str(v) for v in row) + '\n')
+    return file_path
+
+
+def test_matrix_header_headerless():
+    header = matrix_header(ILL_FILE)
+    assert header['format'] == 'ascii'
+    assert header['nrows'] is None
+    assert header['offset'] == 0
+
+
+def test_matrix_rows_ascii():
+    rows = list(matrix_rows(ILL_FILE))
+    assert len(rows) == 4
+    assert all(len(row) == 4393 for row in rows)
+    assert rows[0][0] == 4.7135603e-02
+
+
+def test_matrix_rows_binary():
+    rows = list(matrix_rows(ILL_FILE))
+    double_file = _write_binary_matrix(rows, './tests/assets/temp/mtx_double.ill')
+    float_file = _write_binary_matrix(
+        rows, './tests/assets/temp/mtx_float.ill', 'float')
+    ascii_file = _write_ascii_matrix(rows, './tests/assets/temp/mtx_ascii.ill')
+
+    header = matrix_header(double_file)
+    assert header['format'] == 'double'
+    assert header['nrows'] == 4
+    assert header['ncols'] == 4393
+    assert list(matrix_rows(double_file)) == rows
+    assert list(matrix_rows(ascii_file)) == rows
+    float_rows = list(matrix_rows(float_file))
+    assert len(float_rows) == 4
+    assert float_rows[0][0] == pytest.approx(rows[0][0], rel=1e-6)
+
+    for f in (double_file, float_file, ascii_file):
+        os.remove(f)
+
+
+def test_matrix_blocks():
+    pytest.importorskip('numpy')
+    rows = list(matrix_rows(ILL_FILE))
+    double_file = _write_binary_matrix(rows, './tests/assets/temp/mtx_double.ill')
+    ascii_blocks = list(matrix_blocks(ILL_FILE, block_size=3))
+    binary_blocks = list(matrix_blocks(double_file, block_size=3))
+    assert [b.shape for b in ascii_blocks] == [(3, 4393), (1, 4393)]
+    assert [b.shape for b in binary_blocks] == [(3, 4393), (1, 4393)]
+    for a_block, b_block in zip(ascii_blocks, binary_blocks):
+        assert a_block.tolist() == b_block.tolist()
+    os.remove(double_file)
+
+
+def test_metrics_binary():
+    occ_pattern = [1] * 4393
+    rows = list(matrix_rows(ILL_FILE))
+    double_file = _write_binary_matrix(rows, './tests/assets/temp/mtx_double.ill')
+    assert metrics(double_file, occ_pattern, 100, 10, 500) == \
+        metrics(ILL_FILE, occ_pattern, 100, 10, 500)
+    os.remove(double_file)
+
+
+def test_pack_row():
+    values = [1, 0, 0, 1, 1, 1, 0, 1, 1, 0, 1]
+    data = pack_row(values)
+    assert data == b'\x9d\xa0'
+    assert unpack_row(data, len(values)) == values
+    assert count_bits(data) == 7
+    assert pack_row([]) == b''
+    assert unpack_row(b'', 0) == []
+
+
+def test_matrix_rows_packed():
+    rows = [[1, 0, 1] * 5, [0] * 15, [1] * 15]
+    packed_file = './tests/assets/temp/mtx_packed.bin'
+    with open(packed_file, 'wb') as outf:
+        outf.write(packed_header(15))
+        for row in rows:
+            outf.write(pack_row(row))
+
+    header = matrix_header(packed_file)
+    assert header['format'] == 'bitpacked'
+    assert header['nrows'] == 3
+    assert header['ncols'] == 15
+    assert [count_bits(row) for row in packed_rows(packed_file)] == [10, 0, 15]
+    assert list(matrix_rows(packed_file)) == rows
+    if np is not None:
+        blocks = list(matrix_blocks(packed_file, block_size=2))
+        assert [b.tolist() for b in blocks] == [rows[:2], rows[2:]]
+    os.remove(packed_file)
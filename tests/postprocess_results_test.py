@@ -0,0 +1,61 @@
+"""Test the ResultsFolder class."""
+import pytest
+
+import honeybee_radiance.postprocess.results as results_module
+from honeybee_radiance.postprocess.results import ResultsFolder
+from honeybee_radiance.postprocess.matrix import matrix_rows
+
+FOLDER = './tests/assets/irrad_result'
+
+
+def _to_list(values):
+    return values.tolist() if hasattr(values, 'tolist') else values
+
+
+def test_results_folder():
+    results = ResultsFolder(FOLDER)
+    assert len(results) == 2
+    assert results.grid_ids == ['TestRoom_1', 'TestRoom_2']
+    assert 'TestRoom_1' in results
+    assert len(results.sun_up_hours) == 4393
+    assert [g['full_id'] for g in results.filter_grids('*_2')] == ['TestRoom_2']
+    assert results.grid_file('TestRoom_1').endswith('TestRoom_1.ill')
+
+    rows = list(matrix_rows(results.grid_file('TestRoom_1')))
+    assert _to_list(results.grid('TestRoom_1')) == rows
+    assert _to_list(results.values('TestRoom_1', sensors=[1, 3])) == \
+        [rows[1], rows[3]]
+    assert _to_list(results.values('TestRoom_1', sensors=slice(0, 2), hours=[0, 5])) \
+        == [[rows[0][0], rows[0][5]], [rows[1][0], rows[1][5]]]
+    assert _to_list(results.values('TestRoom_1', hours=slice(10, 12))) == \
+        [row[10:12] for row in rows]
+
+    with pytest.raises(AssertionError):
+        ResultsFolder('./tests/assets/not_a_folder')
+
+
+def test_results_folder_cache():
+    results = ResultsFolder(FOLDER, cache_size=0.2)
+    grid_1 = results.grid('TestRoom_1')
+    assert results.grid('TestRoom_1') is grid_1
+    assert 0 < results.cache_usage <= 0.2
+
+    # the least recently used grid is removed when the budget is exceeded
+    results.cache_size = 0.15
+    results.grid('TestRoom_2')
+    assert results.grid('TestRoom_1') is not grid_1
+    results.clear_cache()
+    assert results.cache_usage == 0
+
+
+def test_results_folder_no_numpy():
+    numpy_module = results_module.np
+    try:
+        results_module.np = None
+        results = ResultsFolder(FOLDER)
+        grid = results.grid('TestRoom_2')
+        assert isinstance(grid, list)
+        assert results.values('TestRoom_2', sensors=[0], hours=[1, 2]) == \
+            [[grid[0][1], grid[0][2]]]
+    finally:
+        results_module.np = numpy_module
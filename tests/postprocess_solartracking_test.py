@@ -0,0 +1,122 @@
+"""Test the solar tracking post-processing."""
+import array
+import os
+import shutil
+
+from ladybug.location import Location
+from ladybug.futil import nukedir
+
+import honeybee_radiance.postprocess.solartracking as solartracking
+from honeybee_radiance.postprocess.solartracking import post_process_solar_tracking
+from honeybee_radiance.postprocess.matrix import matrix_rows
+
+FOLDER = './tests/assets/irrad_result'
+TEMP = './tests/assets/temp/solar_tracking'
+
+
+def _write_states(count):
+    """Write result folders for each state where the values are scaled by the state."""
+    folders = []
+    for st in range(count):
+        state_folder = os.path.join(TEMP, 'state_%d' % st)
+        if not os.path.isdir(state_folder):
+            os.makedirs(state_folder)
+        shutil.copyfile(os.path.join(FOLDER, 'grids_info.json'),
+                        os.path.join(state_folder, 'grids_info.json'))
+        for grid in ('TestRoom_1', 'TestRoom_2'):
+            rows = matrix_rows(os.path.join(FOLDER, '%s.ill' % grid))
+            with open(os.path.join(state_folder, '%s.ill' % grid), 'w') as outf:
+                for row in rows:
+                    outf.write(' '.join(str(v + st) for v in row) + '\n')
+        folders.append(state_folder)
+    return folders
+
+
+def _read_results(folder):
+    return [list(matrix_rows(os.path.join(folder, '%s.ill' % grid)))
+            for grid in ('TestRoom_1', 'TestRoom_2')]
+
+
+def test_post_process_solar_tracking():
+    folders = _write_states(3)
+    location = Location(latitude=40, longitude=-105, time_zone=-7)
+    sun_up_file = os.path.join(FOLDER, 'sun-up-hours.txt')
+    dest = post_process_solar_tracking(
+        folders, sun_up_file, location, tracking_increment=60,
+        destination_folder=os.path.join(TEMP, 'final'))
+    results = _read_results(dest)
+
+    # each hour uses the values of a single state for all of the sensors
+    base = _read_results(FOLDER)
+    used_states = set()
+    for grid_res, grid_base in zip(results, base):
+        assert len(grid_res) == len(grid_base) == 4
+        for hour in range(len(grid_res[0])):
+            states = set(round(res[hour] - b_res[hour], 3)
+                         for res, b_res in zip(grid_res, grid_base))
+            assert len(states) == 1
+            used_states.update(states)
+    assert used_states.issubset({0, 1, 2}) and len(used_states) > 1
+
+    # the pure Python engine and parallel processing produce the same results
+    dest_workers = post_process_solar_tracking(
+        folders, sun_up_file, location, tracking_increment=60,
+        destination_folder=os.path.join(TEMP, 'final_workers'), workers=2)
+    numpy_module = solartracking.np
+    try:
+        solartracking.np = None
+        dest_py = post_process_solar_tracking(
+            folders, sun_up_file, location, tracking_increment=60,
+            destination_folder=os.path.join(TEMP, 'final_py'))
+    finally:
+        solartracking.np = numpy_module
+    assert _read_results(dest_workers) == results
+    assert _read_results(dest_py) == results
+
+    # the values of ASCII files are written with their original text
+    with open(os.path.join(dest, 'TestRoom_1.ill')) as inf:
+        merged = [line.split() for line in inf]
+    state_tokens = []
+    for folder in folders:
+        with open(os.path.join(folder, 'TestRoom_1.ill')) as inf:
+            state_tokens.append([line.split() for line in inf])
+    for sen, row in enumerate(merged):
+        for hour, token in enumerate(row):
+            assert token in [tokens[sen][hour] for tokens in state_tokens]
+    nukedir(TEMP, rmdir=True)
+
+
+def test_post_process_solar_tracking_binary():
+    folders = _write_states(2)
+    for folder in folders:  # convert the results to binary float matrices
+        for grid in ('TestRoom_1', 'TestRoom_2'):
+            ill_file = os.path.join(folder, '%s.ill' % grid)
+            rows = list(matrix_rows(ill_file))
+            header = '#?RADIANCE\nNROWS={}\nNCOLS={}\nNCOMP=1\nFORMAT=float\n\n'.format(
+                len(rows), len(rows[0]))
+            with open(ill_file, 'wb') as outf:
+                outf.write(header.encode('ascii'))
+                for row in rows:
+                    outf.write(array.array('f', row).tobytes())
+    location = Location(latitude=40, longitude=-105, time_zone=-7)
+    sun_up_file = os.path.join(FOLDER, 'sun-up-hours.txt')
+    dest = post_process_solar_tracking(
+        folders, sun_up_file, location, tracking_increment=90,
+        destination_folder=os.path.join(TEMP, 'final'))
+    numpy_module = solartracking.np
+    try:
+        solartracking.np = None
+        dest_py = post_process_solar_tracking(
+            folders, sun_up_file, location, tracking_increment=90,
+            destination_folder=os.path.join(TEMP, 'final_py'))
+    finally:
+        solartracking.np = numpy_module
+
+    # the values of binary files are written with a fixed format
+    with open(os.path.join(dest, 'TestRoom_1.ill')) as inf:
+        merged = inf.read()
+    with open(os.path.join(dest_py, 'TestRoom_1.ill')) as inf:
+        assert inf.read() == merged
+    first_value = merged.split()[0]
+    assert first_value == solartracking.VALUE_FORMAT % float(first_value)
+    nukedir(TEMP, rmdir=True)
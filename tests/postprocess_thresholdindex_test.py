@@ -0,0 +1,136 @@
+"""Test the threshold index of annual results."""
+import os
+
+import pytest
+
+from ladybug.futil import nukedir
+
+import honeybee_radiance.postprocess.thresholdindex as thresholdindex
+from honeybee_radiance.postprocess.thresholdindex import ThresholdIndex, \
+    log_bin_edges, threshold_index_to_folder, metrics_from_threshold_index
+from honeybee_radiance.postprocess.annualdaylight import metrics
+from honeybee_radiance.postprocess.annual import filter_schedule_by_hours
+
+FOLDER = './tests/assets/irrad_result'
+ILL_FILE = './tests/assets/irrad_result/TestRoom_1.ill'
+
+
+def _occ_pattern():
+    with open(os.path.join(FOLDER, 'sun-up-hours.txt')) as suh_file:
+        sun_up_hours = [float(hour) for hour in suh_file]
+    return filter_schedule_by_hours(sun_up_hours)
+
+
+def test_log_bin_edges():
+    edges = log_bin_edges(1, 1000, 3)
+    assert len(edges) == 4
+    assert edges[0] == 1
+    assert edges[-1] == 1000
+    assert edges[1] == pytest.approx(10)
+    assert edges[2] == pytest.approx(100)
+    with pytest.raises(AssertionError):
+        log_bin_edges(0, 1000, 3)
+
+
+def test_threshold_index_from_values():
+    edges = [10, 100, 1000]
+    index = ThresholdIndex.from_values(
+        [[0, 5, 20, 50, 200, 500, 2000, 3000]], edges, total_hours=10,
+        sun_down_occ_hours=2)
+    assert len(index) == 1
+    assert index.occ_hours == 8
+    assert index.total_hours == 10
+    assert not index.is_exact
+    assert repr(index) == 'ThresholdIndex: [1 sensors, 4 bins]'
+
+    # thresholds on the bin edges are exact
+    assert index.daylight_autonomy(100) == [40.0]
+    assert index.error_bound(100) == [0]
+    assert index.continuous_daylight_autonomy(100) == [47.5]
+    assert index.useful_daylight_illuminance(10, 1000) == ([40.0], [40.0], [20.0])
+    assert index.glare_autonomy(1000) == [80.0]
+
+    # thresholds inside a bin are within the error bound
+    exact = ThresholdIndex.from_values(
+        [[0, 5, 20, 50, 200, 500, 2000, 3000]], edges, total_hours=10,
+        sun_down_occ_hours=2, exact=True)
+    assert exact.is_exact
+    for threshold in (20, 300, 2500):
+        bound = index.error_bound(threshold)[0]
+        assert bound > 0
+        assert index.daylight_autonomy(threshold)[0] == \
+            pytest.approx(exact.daylight_autonomy(threshold)[0], abs=bound)
+        assert index.continuous_daylight_autonomy(threshold)[0] == \
+            pytest.approx(exact.continuous_daylight_autonomy(threshold)[0], abs=bound)
+
+
+def test_threshold_index_exact_matches_metrics():
+    occ_pattern, total_occ, sun_down_occ = _occ_pattern()
+    index = ThresholdIndex.from_matrix(
+        ILL_FILE, occ_pattern, log_bin_edges(), total_occ, sun_down_occ, exact=True)
+    for threshold, min_t, max_t in ((100, 10, 500), (300, 100, 3000)):
+        da, cda, udi_lower, udi, udi_upper = metrics(
+            ILL_FILE, occ_pattern, threshold, min_t, max_t, total_occ, sun_down_occ)
+        assert index.daylight_autonomy(threshold) == da
+        assert index.continuous_daylight_autonomy(threshold) == \
+            pytest.approx(cda, abs=0.011)
+        assert index.useful_daylight_illuminance(min_t, max_t) == \
+            (udi_lower, udi, udi_upper)
+
+
+def test_threshold_index_binned_within_bound():
+    occ_pattern, total_occ, sun_down_occ = _occ_pattern()
+    index = ThresholdIndex.from_matrix(
+        ILL_FILE, occ_pattern, log_bin_edges(), total_occ, sun_down_occ)
+    for threshold in (100, 250, 300, 1234):
+        da, cda = metrics(
+            ILL_FILE, occ_pattern, threshold, 100, 3000, total_occ, sun_down_occ)[:2]
+        bounds = index.error_bound(threshold)
+        for values, expected in ((index.daylight_autonomy(threshold), da),
+                                 (index.continuous_daylight_autonomy(threshold), cda)):
+            for value, exp, bound in zip(values, expected, bounds):
+                assert value == pytest.approx(exp, abs=bound + 0.011)
+
+
+def test_threshold_index_numpy_parity():
+    pytest.importorskip('numpy')
+    occ_pattern, total_occ, sun_down_occ = _occ_pattern()
+    np_index = ThresholdIndex.from_matrix(
+        ILL_FILE, occ_pattern, log_bin_edges(), total_occ, sun_down_occ)
+    numpy_module = thresholdindex.np
+    try:
+        thresholdindex.np = None
+        py_index = ThresholdIndex.from_matrix(
+            ILL_FILE, occ_pattern, log_bin_edges(), total_occ, sun_down_occ)
+    finally:
+        thresholdindex.np = numpy_module
+    assert np_index.daylight_autonomy(250) == py_index.daylight_autonomy(250)
+    assert np_index.useful_daylight_illuminance() == \
+        py_index.useful_daylight_illuminance()
+
+
+def test_threshold_index_to_folder():
+    index_folder = threshold_index_to_folder(FOLDER, sub_folder='index_test')
+    assert sorted(os.listdir(index_folder)) == \
+        ['TestRoom_1.idx', 'TestRoom_2.idx', 'grids_info.json']
+    index = ThresholdIndex.from_file(os.path.join(index_folder, 'TestRoom_1.idx'))
+    assert len(index) == 4
+    assert index.bin_edges == tuple(log_bin_edges())
+
+    exact_folder = threshold_index_to_folder(
+        FOLDER, sub_folder='index_exact', exact=True, workers=2)
+    exact = ThresholdIndex.from_file(os.path.join(exact_folder, 'TestRoom_1.idx'))
+    assert exact.is_exact
+    occ_pattern, total_occ, sun_down_occ = _occ_pattern()
+    assert exact.daylight_autonomy(300) == metrics(
+        ILL_FILE, occ_pattern, 300, 100, 3000, total_occ, sun_down_occ)[0]
+
+    output_folder = metrics_from_threshold_index(
+        index_folder, os.path.join(FOLDER, 'index_metrics'))
+    for metric in ('da', 'cda', 'udi_lower', 'udi', 'udi_upper'):
+        files = os.listdir(os.path.join(output_folder, metric))
+        assert len(files) == 4
+        assert 'vis_metadata.json' in files
+
+    for folder in (index_folder, exact_folder, output_folder):
+        nukedir(folder, rmdir=True)
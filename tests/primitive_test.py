@@ -33,6 +33,25 @@ def test_to_radiance():
     assert ' '.join(p.to_radiance().split()) == ' '.join(frit.split())
 
 
+def test_cached_hash_and_radiance():
+    """Test that the cached hash and strings are cleared when the primitive changes."""
+    mod = Plastic('test_plastic', 0.5, 0.5, 0.5)
+    mod.lock()
+    rad_str, mod_hash = mod.to_radiance(), hash(mod)
+    assert mod.to_radiance() == rad_str
+    assert hash(mod) == mod_hash
+    mod.unlock()
+    mod.r_reflectance = 0.2
+    assert mod.to_radiance() != rad_str
+    assert hash(mod) != mod_hash
+
+    sphere = Sphere('test_sphere', modifier=mod)
+    sphere_str = sphere.to_radiance(minimal=True)
+    mod.identifier = 'new_plastic'
+    assert sphere.to_radiance(minimal=True) != sphere_str
+    assert 'new_plastic sphere test_sphere' in sphere.to_radiance(minimal=True)
+
+
 def test_primitive_class_from_type_string():
     assert primitive_class_from_type_string('polygon') == Polygon
     assert primitive_class_from_type_string('sphere') == Sphere
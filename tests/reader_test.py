@@ -1,3 +1,6 @@
+import os
+import json
+
 import honeybee_radiance.reader as reader
 from .rad_string_collection import frit, microshade, metal_cone
 import pytest
@@ -30,6 +33,28 @@ def test_reader_three():
         ' -81.9842 -78.9436 420.9 10.0 20.0'
 
 
+def test_string_to_dicts():
+    objects = reader.string_to_dicts(frit)
+    assert len(objects) == 1
+    assert objects[0]['identifier'] == 'glass_mat'
+    assert objects[0]['modifier']['identifier'] == 'glass_angular_effect'
+    assert objects[0]['dependencies'][0]['identifier'] == 'glass_alt_mat'
+
+    with pytest.raises(ValueError):
+        reader.string_to_dicts('# only a comment\n')
+    with pytest.raises(ValueError):
+        reader.string_to_dicts('missing_mat polygon p 0 0 9 0 0 0 1 0 0 1 1 0')
+
+
+def test_file_to_dicts(tmpdir):
+    rad_file = tmpdir.join('modifiers.rad')
+    rad_file.write(microshade)
+    objects = reader.file_to_dicts(str(rad_file))
+    assert objects == reader.string_to_dicts(microshade)
+    assert reader.parse_from_file(str(rad_file)) == \
+        reader.parse_from_string(microshade)
+
+
 def test_parse_header():
     """Test reader for Radiance header."""
     filepath = './tests/assets/header_reader_test.amb'
@@ -47,3 +72,41 @@ def test_parse_header():
     with pytest.raises(ValueError):
         filepath = './tests/assets/klemsfull.xml'
         reader.parse_header(filepath)
+
+
+def test_parse_sensor_values():
+    values = reader.parse_sensor_values('./tests/assets/test_points.pts')
+    assert len(values) == 18
+    assert list(values[:6]) == [0, 0, 0, 0, 0, 1]
+    assert list(values[12:]) == [-10, -5, 0, -50, -60, -70]
+    assert len(reader.parse_sensor_values(
+        './tests/assets/grid/sensor_grid_split.pts', 2, 11)) == 60
+
+
+def test_sensor_count_cache(tmpdir):
+    pts_file = tmpdir.join('grid.pts')
+    pts_file.write('# comment\n0 0 0 0 0 1\n\n1 1 1 0 0 1\n')
+    assert reader.sensor_count_from_file(str(pts_file)) == 2
+    assert reader.sensor_count_from_file(str(pts_file)) == 2
+
+    # the count of a rewritten file is not taken from the cache
+    stat = os.stat(str(pts_file))
+    pts_file.write('0 0 0 0 0 1\n1 1 1 0 0 1\n2 2 2 0 0 1\n')
+    os.utime(str(pts_file), (stat.st_atime, stat.st_mtime))
+    assert reader.sensor_count_from_file(str(pts_file)) == 3
+
+
+def test_sensor_count_from_info(tmpdir):
+    pts_file = tmpdir.mkdir('group').join('grid.pts')
+    pts_file.write('0 0 0 0 0 1\n1 1 1 0 0 1\n')
+    info = [{'count': 5, 'full_id': 'group/grid', 'pts_size': pts_file.size()}]
+    tmpdir.join('_info.json').write(json.dumps(info))
+    stat = os.stat(str(pts_file))
+    os.utime(str(tmpdir.join('_info.json')), (stat.st_atime, stat.st_mtime + 1))
+    # the count of the _info.json is used without reading the file
+    assert reader.sensor_count_from_file(str(pts_file)) == 5
+
+    # the count is not used once the size of the file does not match
+    pts_file.write('0 0 0 0 0 1\n1 1 1 0 0 1\n2 2 2 0 0 1\n')
+    os.utime(str(pts_file), (stat.st_atime, stat.st_mtime))
+    assert reader.sensor_count_from_file(str(pts_file)) == 3
@@ -0,0 +1,79 @@
+"""Test the RoomIndex class."""
+import pytest
+
+from ladybug_geometry.geometry3d.pointvector import Point3D
+from honeybee.room import Room
+from honeybee.model import Model
+
+from honeybee_radiance.roomindex import RoomIndex
+from honeybee_radiance.sensorgrid import SensorGrid
+
+
+def _rooms():
+    rooms = []
+    for i in range(4):
+        for j in range(3):
+            for k in range(2):
+                origin = Point3D(i * 5, j * 4, k * 3)
+                rooms.append(Room.from_box('Room_%d_%d_%d' % (i, j, k), 5, 4, 3,
+                                           origin=origin))
+    return rooms
+
+
+def _brute_force(rooms, point):
+    for i, room in enumerate(rooms):
+        if room.geometry.is_point_inside(point):
+            return i
+    return -1
+
+
+def test_room_index():
+    rooms = _rooms()
+    index = RoomIndex(rooms)
+    assert len(index) == 24
+    assert index.cell_size == 5
+    assert repr(index) == 'RoomIndex: [24 rooms, 15 cells]'
+    assert index.room(Point3D(12, 1, 1)).identifier == 'Room_2_0_0'
+    assert index.room((12, 1, 4)).identifier == 'Room_2_0_1'
+    assert index.room((-1, 1, 1)) is None
+    assert index.room_index((12, 1, 10)) == -1
+
+    # points on the edges of the rooms are avoided since ray casting is ambiguous
+    points = [Point3D(x * 0.7 - 0.95, y * 0.9 - 0.95, z * 0.8 - 0.45)
+              for x in range(32) for y in range(15) for z in range(9)]
+    assert index.room_indices(points) == [_brute_force(rooms, pt) for pt in points]
+    assert RoomIndex(rooms, cell_size=2.5).room_indices(points) == \
+        index.room_indices(points)
+
+    with pytest.raises(AssertionError):
+        RoomIndex(rooms, cell_size=0)
+
+
+def test_enclosure_info_room_index():
+    rooms = _rooms()
+    model = Model('Tower', rooms)
+    positions = [(x * 0.9 + 0.2, y * 1.1 + 0.3, 1) for x in range(23) for y in range(12)]
+    grid = SensorGrid.from_planar_positions('grid', positions, (0, 0, 1))
+    index = RoomIndex.from_model(model)
+    info = grid.enclosure_info_dict(model, room_index=index)
+    assert info == grid.enclosure_info_dict(model)
+    assert info['has_outdoor'] and info['has_indoor']
+    sensor_rooms = [info['mapper'][i] if i != -1 else None
+                    for i in info['sensor_indices']]
+    expected = [_brute_force(rooms, Point3D(*pos)) for pos in positions]
+    assert sensor_rooms == [rooms[i].identifier if i != -1 else None for i in expected]
+
+
+def test_room_index_model():
+    """Test that a RoomIndex matches the rooms of a model with non-box rooms."""
+    model = Model.from_file('./tests/assets/model/complex.hbjson')
+    rooms = model.rooms
+    min_pt, max_pt = model.min, model.max
+    size_x, size_y, size_z = max_pt.x - min_pt.x, max_pt.y - min_pt.y, max_pt.z - min_pt.z
+    points = [Point3D(min_pt.x + size_x * (i + 0.37) / 12,
+                      min_pt.y + size_y * (j + 0.41) / 12,
+                      min_pt.z + size_z * (k + 0.53) / 6)
+              for i in range(12) for j in range(12) for k in range(6)]
+    room_ids = RoomIndex.from_model(model).room_indices(points)
+    assert room_ids == [_brute_force(rooms, pt) for pt in points]
+    assert len([i for i in room_ids if i != -1]) == 49
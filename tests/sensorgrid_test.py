@@ -1,4 +1,6 @@
 """Test SensorGrid class."""
+import math
+
 from honeybee_radiance.sensor import Sensor
 from honeybee_radiance.sensorgrid import SensorGrid
 import ladybug_geometry.geometry3d.pointvector as pv
@@ -216,3 +218,98 @@ def test_split_grid():
         assert info[i]['count'] == 4
 
     assert info[-1]['count'] == 1
+
+
+def test_array_backed_grid():
+    """Test that grids from positions only create Sensor objects when needed."""
+    positions = [(0, 0, 0), (1, 2, 3), (4, 5, 6)]
+    directions = [(0, 0, 1), (1, 0, 0), (0, 1, 0)]
+    sg = SensorGrid.from_position_and_direction('sg', positions, directions)
+    ref_sg = SensorGrid('sg', [Sensor(p, d) for p, d in zip(positions, directions)])
+    assert sg._sensors is None
+    assert sg.count == len(sg) == 3
+    assert list(sg.positions) == [tuple(float(v) for v in p) for p in positions]
+    assert sg.to_radiance() == ref_sg.to_radiance()
+    assert sg.to_dict() == ref_sg.to_dict()
+    assert hash(sg) == hash(ref_sg)
+    assert sg == ref_sg
+    assert sg._sensors is None
+
+    # transforms on the array match the transforms of the Sensor objects
+    for grid in (sg, ref_sg):
+        grid.move(pv.Vector3D(1, 2, 3))
+        grid.rotate(pv.Vector3D(0, 1, 1), 30, pv.Point3D(1, 0, 2))
+        grid.rotate_xy(45, pv.Point3D(2, 1, 0))
+        grid.reflect(Plane(pv.Vector3D(1, 0, 0), pv.Point3D(1, 0, 0)))
+        grid.scale(2, pv.Point3D(0, 1, 0))
+    assert sg._sensors is None
+    assert sg.to_radiance() == ref_sg.to_radiance()
+
+    # the sensors are created on indexing and can be edited from then on
+    new_sg = sg.duplicate()
+    assert new_sg[1] == ref_sg[1]
+    new_sg[1].move(pv.Vector3D(0, 0, 10))
+    assert new_sg[1].pos[2] == ref_sg[1].pos[2] + 10
+    assert new_sg.to_radiance() != sg.to_radiance()
+
+
+def test_to_radiance_precision():
+    """Test writing a sensor grid with a rounded precision."""
+    positions = [(0.123456, 1, 2), (1.987654, 2, 3)]
+    directions = [(0, 0, 1), (0, 0, 1)]
+    sg = SensorGrid.from_position_and_direction('sg', positions, directions)
+    ref_sg = SensorGrid('sg', [Sensor(p, d) for p, d in zip(positions, directions)])
+    assert sg.to_radiance(precision=3) == \
+        '0.123 1.0 2.0 0.0 0.0 1.0\n1.988 2.0 3.0 0.0 0.0 1.0'
+    assert ref_sg.to_radiance(precision=3) == sg.to_radiance(precision=3)
+    assert sg.to_radiance() == ref_sg.to_radiance()
+
+
+def test_to_radiance_precision_direction():
+    """Test that the directions of the sensors are not rounded with the positions."""
+    angle = math.radians(15)
+    direction = (math.cos(angle), math.sin(angle), 0)
+    sg = SensorGrid.from_position_and_direction('sg', [(0.123456, 1, 2)], [direction])
+    ref_sg = SensorGrid('sg', [Sensor((0.123456, 1, 2), direction)])
+    for grid in (sg, ref_sg):
+        values = grid.to_radiance(precision=1).split()
+        assert values[:3] == ['0.1', '1.0', '2.0']
+        assert tuple(float(v) for v in values[3:]) == pytest.approx(direction)
+
+
+def test_sort_by_hilbert_curve():
+    positions = [(x, y, z) for x in range(4) for z in range(4) for y in range(4)]
+    sg = SensorGrid.from_planar_positions('sg', positions, (0, 0, 1))
+    original = sg.duplicate()
+
+    mapping = sg.sort_by_hilbert_curve()
+    assert sg.count == 64
+    assert sorted(mapping) == list(range(64))
+    # consecutive sensors along the curve are neighbors in space
+    sorted_pos = list(sg.positions)
+    assert all(sum(abs(u - v) for u, v in zip(a, b)) == 1
+               for a, b in zip(sorted_pos, sorted_pos[1:]))
+    assert [sorted_pos[i] for i in mapping] == list(original.positions)
+
+
+def test_sort_by_hilbert_curve_duplicates():
+    positions = [(x, y, 0.8) for y in range(8) for x in range(8)]
+    positions[5] = positions[3]  # an exact duplicate
+    positions[9] = (positions[1][0] + 0.001, positions[1][1], 0.8)  # a near duplicate
+    original = SensorGrid.from_planar_positions('sg', positions, (0, 0, 1))
+
+    sg = original.duplicate()
+    mapping = sg.sort_by_hilbert_curve(tolerance=0)
+    assert sg.count == 63
+    assert mapping[5] == mapping[3]
+    sg = original.duplicate()
+    mapping = sg.sort_by_hilbert_curve(tolerance=0.01)
+    assert sg.count == 62
+    assert mapping[9] == mapping[1]
+    sorted_pos = list(sg.positions)
+    assert [sorted_pos[i] for i in mapping][:9] == list(original.positions)[:9]
+
+    # sensors with different directions are not duplicates
+    sg = SensorGrid.from_positions_radial('sg', [(0, 0, 0), (1, 0, 0)], dir_count=4)
+    sg.sort_by_hilbert_curve(tolerance=0.01)
+    assert sg.count == 8
@@ -2,6 +2,9 @@ from honeybee_radiance.view import View
 import ladybug_geometry.geometry3d.pointvector as pv
 from ladybug_geometry.geometry3d.plane import Plane
 
+import math
+import pytest
+
 
 def test_default_values():
     v = View('test_view')
@@ -20,6 +23,18 @@ def test_default_values():
         ' -vu 0.0 1.0 0.0 -vh 60.0 -vv 60.0'
 
 
+def test_to_radiance_precision():
+    """Test that the direction and up vector are not rounded with the position."""
+    angle = math.radians(15)
+    v = View('test_view', (0.123456, 1, 2), (math.cos(angle), math.sin(angle), 0),
+             (0, 0, 1))
+    values = v.to_radiance(precision=1).split()
+    assert values[values.index('-vp') + 1:values.index('-vp') + 4] == \
+        ['0.1', '1.0', '2.0']
+    vd = values[values.index('-vd') + 1:values.index('-vd') + 4]
+    assert math.degrees(math.atan2(float(vd[1]), float(vd[0]))) == pytest.approx(15)
+
+
 def test_value_assignment():
     v = View(
         'test_view', (0, 0, 10), (0, 1, 0), (0, 0, 1), 'l', 240, 300, -10, -25